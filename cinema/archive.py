@@ -0,0 +1,74 @@
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from cinema.models import ArchivedOrder, ArchivedTicket, Order, Ticket
+
+
+def archivable_orders(cutoff, using=DEFAULT_DB_ALIAS):
+    """Orders with tickets only for sessions shown before ``cutoff``.
+
+    A cutoff in the future is taken as now, so orders of upcoming
+    sessions always stay in the order tables.
+    """
+    cutoff = min(cutoff, timezone.now())
+    tickets = Ticket.objects.using(using).filter(order=OuterRef("pk"))
+    return (
+        Order.objects.using(using)
+        .filter(Exists(tickets))
+        .exclude(Exists(tickets.filter(movie_session__show_time__gte=cutoff)))
+    )
+
+
+def archive_batch(order_ids, using=DEFAULT_DB_ALIAS):
+    """Move the orders ``order_ids`` and their tickets to the archive.
+
+    Rows keep their ids. The batch moves in one transaction, so an
+    interrupted run leaves every order in exactly one of the tables.
+    Returns the number of tickets moved.
+    """
+    with transaction.atomic(using=using):
+        orders = Order.objects.using(using).filter(pk__in=order_ids)
+        tickets = Ticket.objects.using(using).filter(order_id__in=order_ids)
+
+        ArchivedOrder.objects.using(using).bulk_create(
+            ArchivedOrder(**fields)
+            for fields in orders.values("id", "created_at", "user_id")
+        )
+        moved = ArchivedTicket.objects.using(using).bulk_create(
+            ArchivedTicket(**fields)
+            for fields in tickets.values(
+                "id", "movie_session_id", "order_id", "row", "seat"
+            )
+        )
+
+        # moved, not cancelled: unlike release_tickets, the seats are not
+        # announced released
+        tickets.delete()
+        orders.delete()
+    return len(moved)
+
+
+def archive_orders(
+    cutoff, batch_size, max_batches=None, using=DEFAULT_DB_ALIAS
+):
+    """Archive the orders of sessions before ``cutoff`` batch by batch.
+
+    Yields the orders and tickets moved by each committed batch. Every
+    batch is final, so a run that is stopped or limited to
+    ``max_batches`` is resumed by simply running again.
+    """
+    last_id = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        order_ids = list(
+            archivable_orders(cutoff, using)
+            .filter(pk__gt=last_id)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not order_ids:
+            return
+        yield len(order_ids), archive_batch(order_ids, using)
+        last_id = order_ids[-1]
+        batches += 1
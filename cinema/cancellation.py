@@ -0,0 +1,130 @@
+import json
+from tempfile import SpooledTemporaryFile
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Exists, OuterRef
+
+from cinema.models import MovieSession, Order, Ticket
+from cinema.seat_events import RELEASED, publish_seats, seat_events
+
+# bytes of report held in memory before it spills to a temporary file
+REPORT_MEMORY = 1024 * 1024
+
+
+def release_tickets(tickets, using=DEFAULT_DB_ALIAS):
+    """Delete ``tickets`` and announce their seats released on commit.
+
+    Ticket deletions are announced only through here and
+    ``cancel_session``; there is no ``post_delete`` receiver, which
+    would keep cascades from deleting tickets in bulk. Tickets that go
+    with a deleted user or archived order are not announced.
+    """
+    with transaction.atomic(using=using):
+        released = list(
+            tickets.using(using).only("id", "movie_session_id", "row", "seat")
+        )
+        Ticket.objects.using(using).filter(
+            pk__in=[ticket.pk for ticket in released]
+        ).delete()
+        transaction.on_commit(
+            lambda: publish_seats(RELEASED, released), using=using
+        )
+
+
+def cancel_session(movie_session_id, batch_size, using=DEFAULT_DB_ALIAS):
+    """Delete a movie session and its tickets, ``batch_size`` orders at once.
+
+    Yields one entry per affected order: its user, the seats cancelled
+    and whether the order was left without tickets, which deletes it.
+    Each batch is a few set-based statements in its own transaction,
+    instead of the collector loading every ticket; its seats are
+    announced released once committed. The session itself goes last,
+    so an interrupted cancellation is finished by running it again.
+    """
+    tickets = Ticket.objects.using(using).filter(
+        movie_session_id=movie_session_id
+    )
+    while True:
+        with transaction.atomic(using=using):
+            order_ids = list(
+                tickets.order_by("order_id")
+                .values_list("order_id", flat=True)
+                .distinct()[:batch_size]
+            )
+            if not order_ids:
+                break
+
+            batch = tickets.filter(order_id__in=order_ids)
+            seats = {}
+            users = {}
+            rows = batch.order_by("order_id", "row", "seat").values_list(
+                "order_id",
+                "order__user_id",
+                "order__user__email",
+                "row",
+                "seat",
+            )
+            for order_id, user_id, email, row, seat in rows:
+                seats.setdefault(order_id, []).append([row, seat])
+                users[order_id] = (user_id, email)
+
+            # tickets have no delete receivers or dependents, so this is
+            # one DELETE; the batch is announced below in one event
+            batch.delete()
+            orders = Order.objects.using(using).filter(pk__in=order_ids)
+            emptied_ids = set(
+                orders.exclude(
+                    Exists(
+                        Ticket.objects.using(using).filter(
+                            order=OuterRef("pk")
+                        )
+                    )
+                ).values_list("pk", flat=True)
+            )
+            orders.filter(pk__in=emptied_ids).delete()
+
+            released = [seat for taken in seats.values() for seat in taken]
+            transaction.on_commit(
+                lambda released=released: seat_events().publish(
+                    movie_session_id, {"type": RELEASED, "seats": released}
+                ),
+                using=using,
+            )
+
+        for order_id in order_ids:
+            user_id, email = users[order_id]
+            yield {
+                "order": order_id,
+                "user": user_id,
+                "email": email,
+                "seats": seats[order_id],
+                "order_deleted": order_id in emptied_ids,
+            }
+
+    # tickets sold since the last batch go with the session
+    MovieSession.objects.using(using).filter(pk=movie_session_id).delete()
+
+
+def cancellation_report(movie_session_id, batch_size):
+    """Cancel the session and return its report as NDJSON, rewound.
+
+    One line per affected order and a closing summary line. The report
+    is written while the batches run and kept on disk past
+    ``REPORT_MEMORY``, so neither the session size nor a slow client
+    holds the cancellation up or grows the process.
+    """
+    report = SpooledTemporaryFile(max_size=REPORT_MEMORY)
+    summary = {
+        "movie_session": movie_session_id,
+        "orders": 0,
+        "orders_deleted": 0,
+        "tickets": 0,
+    }
+    for entry in cancel_session(movie_session_id, batch_size):
+        report.write(json.dumps(entry).encode() + b"\n")
+        summary["orders"] += 1
+        summary["orders_deleted"] += entry["order_deleted"]
+        summary["tickets"] += len(entry["seats"])
+    report.write(json.dumps({"summary": summary}).encode() + b"\n")
+    report.seek(0)
+    return report
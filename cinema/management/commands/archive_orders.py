@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from cinema.archive import archive_orders
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Move orders whose sessions were all shown before the cutoff, "
+        "with their tickets, to the archive tables in batches. Each "
+        "batch commits on its own; run again to resume."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--before",
+            help="ISO cutoff, ARCHIVE_ORDERS_AFTER ago by default",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--max-batches", type=int)
+
+    def handle(self, *args, **options):
+        if options["before"]:
+            cutoff = parse_datetime(options["before"])
+            if cutoff is None:
+                raise CommandError(f"Invalid --before {options['before']!r}.")
+            if timezone.is_naive(cutoff):
+                cutoff = timezone.make_aware(cutoff)
+            if cutoff > timezone.now():
+                raise CommandError(
+                    "--before must not be in the future; orders of "
+                    "upcoming sessions stay in the order tables."
+                )
+        else:
+            cutoff = timezone.now() - settings.ARCHIVE_ORDERS_AFTER
+
+        orders = tickets = 0
+        for batch_orders, batch_tickets in archive_orders(
+            cutoff, options["batch_size"], options["max_batches"]
+        ):
+            orders += batch_orders
+            tickets += batch_tickets
+            self.stdout.write(
+                f"archived {batch_orders} orders, {batch_tickets} tickets"
+            )
+        self.stdout.write(
+            f"archived {orders} orders and {tickets} tickets of sessions "
+            f"before {cutoff.isoformat()}"
+        )
@@ -0,0 +1,121 @@
+import time
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from cinema.models import CinemaHall, Movie, MovieSession, Order, Ticket
+
+SEATS_PER_SESSION = 100 * 100
+TICKETS_PER_ORDER = 5
+
+SERIES = """
+    WITH RECURSIVE series(n) AS (
+        SELECT 0 UNION ALL SELECT n + 1 FROM series WHERE n + 1 < %s
+    )
+"""
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Fill the ticket table with many rows and time the ticket "
+        "changelist with a default ModelAdmin and with TicketAdmin. "
+        "Benchmark data is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tickets", type=int, default=1000000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            started = time.perf_counter()
+            user = self.seed(options["tickets"])
+            self.stdout.write(
+                f"seeded {options['tickets']} tickets "
+                f"in {time.perf_counter() - started:.1f} s"
+            )
+
+            for name, model_admin in (
+                ("default", admin.ModelAdmin(Ticket, admin.site)),
+                ("TicketAdmin", admin.site._registry[Ticket]),
+            ):
+                self.run_case(name, model_admin, user)
+
+            transaction.set_rollback(True)
+
+    def run_case(self, name, model_admin, user):
+        request = RequestFactory().get(
+            reverse("admin:cinema_ticket_changelist")
+        )
+        request.user = user
+
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = model_admin.changelist_view(request)
+            response.render()
+            elapsed = time.perf_counter() - started
+
+        if response.status_code != 200:
+            raise CommandError(
+                f"{name}: the changelist answered {response.status_code}."
+            )
+        self.stdout.write(
+            f"{name:>11}: {elapsed * 1e3:8.1f} ms, {len(queries)} queries"
+        )
+
+    @staticmethod
+    def seed(tickets):
+        user = get_user_model().objects.create_superuser(
+            username="benchmark-admin", password="benchmark"
+        )
+        movie = Movie.objects.create(
+            title="Benchmark", description="", duration=90
+        )
+        hall = CinemaHall.objects.create(
+            name="Benchmark", rows=100, seats_in_row=100
+        )
+        sessions = MovieSession.objects.bulk_create(
+            MovieSession(
+                movie=movie, cinema_hall=hall, show_time=timezone.now()
+            )
+            for _ in range(-(-tickets // SEATS_PER_SESSION))
+        )
+        first_session = sessions[0].id
+        if [session.id for session in sessions] != list(
+            range(first_session, first_session + len(sessions))
+        ):
+            raise CommandError("Session ids are not consecutive.")
+
+        orders = -(-tickets // TICKETS_PER_ORDER)
+        first_order = Order.objects.create(user=user).id
+        with connection.cursor() as cursor:
+            # the series always has a first row, the order made above
+            cursor.execute(
+                SERIES
+                + f"INSERT INTO {Order._meta.db_table} (created_at, user_id) "
+                "SELECT %s, %s FROM series WHERE n > 0 ORDER BY n",
+                [orders, timezone.now(), user.id],
+            )
+            cursor.execute(
+                SERIES
+                + f"INSERT INTO {Ticket._meta.db_table} "
+                "(movie_session_id, order_id, row, seat) "
+                "SELECT %s + n / %s, %s + n / %s, "
+                "n %% %s / 100 + 1, n %% 100 + 1 FROM series ORDER BY n",
+                [
+                    tickets,
+                    first_session,
+                    SEATS_PER_SESSION,
+                    first_order,
+                    TICKETS_PER_ORDER,
+                    SEATS_PER_SESSION,
+                ],
+            )
+            # the statistics the changelist count is estimated from
+            cursor.execute(f"ANALYZE {Ticket._meta.db_table}")
+        return user
@@ -0,0 +1,110 @@
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from cinema.cancellation import cancellation_report
+from cinema.models import CinemaHall, Movie, MovieSession, Order, Ticket
+
+TICKETS_PER_ORDER = 4
+
+
+def cascade(movie_session_id):
+    MovieSession.objects.get(pk=movie_session_id).delete()
+
+
+def batched(movie_session_id):
+    cancellation_report(
+        movie_session_id, settings.CANCELLATION_BATCH_SIZE
+    ).close()
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Cancel fully sold 30x20 sessions once with Django's cascading "
+        "delete and once with the batched cancellation, and report time, "
+        "queries and peak Python memory. Benchmark data is rolled back "
+        "afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sessions", type=int, default=20)
+
+    def handle(self, *args, **options):
+        for name, cancel in (("cascade", cascade), ("batched", batched)):
+            with transaction.atomic():
+                movie_session_ids = self.seed(options["sessions"])
+                self.run_case(name, cancel, movie_session_ids)
+                transaction.set_rollback(True)
+
+    def run_case(self, name, cancel, movie_session_ids):
+        tracemalloc.start()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for movie_session_id in movie_session_ids:
+                cancel(movie_session_id)
+            elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        left = Ticket.objects.filter(movie_session_id__in=movie_session_ids)
+        if left.exists():
+            raise CommandError(f"{name}: tickets of the sessions are left.")
+        self.stdout.write(
+            f"{name:>8}: {elapsed * 1e3 / len(movie_session_ids):8.1f} "
+            f"ms/session, {len(queries) / len(movie_session_ids):6.1f} "
+            f"queries/session, peak {peak / 1024:8.1f} KiB"
+        )
+
+    @staticmethod
+    def seed(sessions):
+        user = get_user_model().objects.create_user(
+            username="benchmark-cancellation",
+            email="benchmark@example.com",
+            password="benchmark",
+        )
+        movie = Movie.objects.create(
+            title="Benchmark", description="", duration=90
+        )
+        hall = CinemaHall.objects.create(
+            name="Benchmark", rows=30, seats_in_row=20
+        )
+        movie_sessions = MovieSession.objects.bulk_create(
+            MovieSession(
+                show_time=timezone.now() + timezone.timedelta(days=number),
+                movie=movie,
+                cinema_hall=hall,
+            )
+            for number in range(sessions)
+        )
+        seats = [
+            (row, seat)
+            for row in range(1, hall.rows + 1)
+            for seat in range(1, hall.seats_in_row + 1)
+        ]
+        orders_per_session = len(seats) // TICKETS_PER_ORDER
+        orders = Order.objects.bulk_create(
+            Order(user=user) for _ in range(sessions * orders_per_session)
+        )
+        Ticket.objects.bulk_create(
+            (
+                Ticket(
+                    movie_session=movie_session,
+                    order=orders[
+                        number * orders_per_session
+                        + index // TICKETS_PER_ORDER
+                    ],
+                    row=row,
+                    seat=seat,
+                )
+                for number, movie_session in enumerate(movie_sessions)
+                for index, (row, seat) in enumerate(seats)
+            ),
+            batch_size=1000,
+        )
+        return [movie_session.id for movie_session in movie_sessions]
@@ -0,0 +1,103 @@
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from cinema.models import CinemaHall, Movie, MovieSession, Order, Ticket
+from user.authentication import issue_token
+
+TICKETS_PER_ORDER = 4
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Compare the JSON and columnar representations of the movie "
+        "session list and of a full page of orders: payload size and "
+        "time per request. Benchmark data is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sessions", type=int, default=2000)
+        parser.add_argument("--orders", type=int, default=100)
+        parser.add_argument("--requests", type=int, default=20)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = self.seed(options)
+            client = Client(
+                HTTP_AUTHORIZATION=f"Token {issue_token(user).key}"
+            )
+
+            with override_settings(ALLOWED_HOSTS=["testserver"]):
+                for name, url, params in (
+                    ("sessions", reverse("cinema:moviesession-list"), {}),
+                    ("orders", reverse("cinema:order-list"), {
+                        "page_size": options["orders"],
+                    }),
+                ):
+                    for format_name in ("json", "columns"):
+                        self.run_case(
+                            client,
+                            f"{name} {format_name}",
+                            url,
+                            {**params, "format": format_name},
+                            options["requests"],
+                        )
+
+            transaction.set_rollback(True)
+
+    def run_case(self, client, name, url, params, requests):
+        response = client.get(url, params)
+        if response.status_code != 200:
+            raise CommandError(f"{name}: answered {response.status_code}.")
+
+        started = time.perf_counter()
+        for _ in range(requests):
+            client.get(url, params)
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"{name:>16}: {len(response.content) / 1024:8.1f} KiB, "
+            f"{elapsed / requests * 1e3:7.1f} ms/request"
+        )
+
+    @staticmethod
+    def seed(options):
+        user = get_user_model().objects.create_user(
+            username="benchmark-columnar", password="benchmark"
+        )
+        movie, = Movie.objects.bulk_create(
+            [Movie(title="Benchmark", description="", duration=90)]
+        )
+        hall = CinemaHall.objects.create(
+            name="Benchmark", rows=20, seats_in_row=30
+        )
+        start = timezone.now()
+        sessions = MovieSession.objects.bulk_create(
+            MovieSession(
+                movie=movie,
+                cinema_hall=hall,
+                show_time=start + timedelta(hours=number),
+            )
+            for number in range(options["sessions"])
+        )
+
+        orders = Order.objects.bulk_create(
+            Order(user=user) for _ in range(options["orders"])
+        )
+        Ticket.objects.bulk_create(
+            Ticket(
+                movie_session=sessions[number % len(sessions)],
+                order=order,
+                row=number // len(sessions) + 1,
+                seat=seat,
+            )
+            for number, order in enumerate(orders)
+            for seat in range(1, TICKETS_PER_ORDER + 1)
+        )
+        return user
@@ -0,0 +1,78 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from user.authentication import issue_token
+
+
+def full_stack():
+    """The middleware as it ran before BrowserMiddleware scoped it"""
+    middleware = list(settings.MIDDLEWARE)
+    position = middleware.index("cinema_service.middleware.BrowserMiddleware")
+    middleware[position:position + 1] = settings.BROWSER_MIDDLEWARE
+    return middleware
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Time an API request through the full browser middleware stack "
+        "and through the path-scoped one. Benchmark data is rolled back "
+        "afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=5000)
+        parser.add_argument("--rounds", type=int, default=10)
+
+    def handle(self, *args, **options):
+        url = reverse("cinema:genre-list")
+
+        with transaction.atomic():
+            user = get_user_model().objects.create_user(
+                username="benchmark-middleware", password="benchmark"
+            )
+            header = f"Token {issue_token(user).key}"
+
+            clients = {}
+            for name, middleware in (
+                ("full stack", full_stack()),
+                ("path scoped", list(settings.MIDDLEWARE)),
+            ):
+                with override_settings(
+                    MIDDLEWARE=middleware, ALLOWED_HOSTS=["testserver"]
+                ):
+                    # the middleware chain is built on the first request
+                    clients[name] = Client(HTTP_AUTHORIZATION=header)
+                    status_code = clients[name].get(url).status_code
+                    if status_code != 200:
+                        raise CommandError(f"{name}: answered {status_code}.")
+
+            # alternate the cases and keep the best round of each, so
+            # drift in the machine affects both alike
+            timings = dict.fromkeys(clients, float("inf"))
+            per_round = max(1, options["requests"] // options["rounds"])
+            with override_settings(ALLOWED_HOSTS=["testserver"]):
+                for _ in range(options["rounds"]):
+                    for name, client in clients.items():
+                        started = time.perf_counter()
+                        for _ in range(per_round):
+                            client.get(url)
+                        timings[name] = min(
+                            timings[name],
+                            (time.perf_counter() - started) / per_round * 1e6,
+                        )
+
+            for name, timing in timings.items():
+                self.stdout.write(f"{name:>11}: {timing:8.1f} us/request")
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(
+            f"{'saved':>11}: "
+            f"{timings['full stack'] - timings['path scoped']:8.1f} us/request"
+        )
@@ -0,0 +1,106 @@
+import os
+import tempfile
+import threading
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+
+from cinema.management.commands.benchmark_sqlite import (
+    Command as SQLiteBenchmark,
+)
+from cinema.models import Order, Ticket
+from cinema.order_pipeline import OrderPipeline, SeatConflict
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Place orders from concurrent clients against a scratch SQLite "
+        "file, once with a transaction per order and once through the "
+        "batching order pipeline, and report orders/sec and the rate of "
+        "'database is locked' errors."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=16)
+        parser.add_argument("--orders", type=int, default=100)
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            for name in ("per-request", "pipeline"):
+                alias = f"benchmark-{name}"
+                connections.settings[alias] = {
+                    **connections.settings["default"],
+                    "NAME": os.path.join(directory, f"{name}.sqlite3"),
+                    "TEST": {},
+                }
+                try:
+                    self.run_mode(name, alias, options)
+                finally:
+                    connections[alias].close()
+                    del connections.settings[alias]
+
+    def run_mode(self, name, alias, options):
+        call_command("migrate", database=alias, verbosity=0)
+        movie_session, user = SQLiteBenchmark.create_session(alias)
+        connections[alias].close()
+
+        pipeline = OrderPipeline(using=alias)
+        results = {"orders": 0, "conflicts": 0, "locked": 0}
+        lock = threading.Lock()
+        seats = iter(range(10 ** 9))
+
+        def per_request(tickets):
+            with transaction.atomic(using=alias):
+                order = Order.objects.using(alias).create(user=user)
+                Ticket.objects.using(alias).bulk_create(
+                    Ticket(order=order, **ticket) for ticket in tickets
+                )
+
+        def through_pipeline(tickets):
+            pipeline.submit(user.id, tickets)
+
+        place = per_request if name == "per-request" else through_pipeline
+
+        def client():
+            connection = connections[alias]
+            for _ in range(options["orders"]):
+                with lock:
+                    seat = next(seats)
+                tickets = [
+                    {"movie_session": movie_session, "row": seat, "seat": seat}
+                ]
+                try:
+                    place(tickets)
+                    outcome = "orders"
+                except SeatConflict:
+                    outcome = "conflicts"
+                except OperationalError as error:
+                    if "locked" not in str(error):
+                        raise
+                    outcome = "locked"
+                with lock:
+                    results[outcome] += 1
+                # what Django does at the end of every request
+                connection.close_if_unusable_or_obsolete()
+            connection.close()
+
+        threads = [
+            threading.Thread(target=client)
+            for _ in range(options["clients"])
+        ]
+
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        total = sum(results.values())
+        self.stdout.write(
+            f"{name:>11}: {results['orders'] / elapsed:8.0f} orders/s, "
+            f"{results['orders']} placed, "
+            f"{results['locked'] / total:6.1%} locked"
+        )
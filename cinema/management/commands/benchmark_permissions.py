@@ -0,0 +1,94 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from cinema.permissions import IsAdminOrIfAuthenticatedReadOnly
+from cinema.views import ORDER_PERMISSIONS
+from user.authentication import (
+    ExpiringTokenAuthentication,
+    SignedTokenAuthentication,
+)
+from user.signed_tokens import issue_signed_token
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Measure authentication plus permission checks per request, "
+        "with a full User and with the precomputed principal. "
+        "Benchmark data is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = get_user_model().objects.create_user(
+                username="benchmark-permissions", password="benchmark"
+            )
+            token = f"Token {Token.objects.create(user=user).key}"
+
+            cases = (
+                # per-request permission instances and the full User row
+                (
+                    "full user",
+                    TokenAuthentication(),
+                    token,
+                    lambda: (IsAdminOrIfAuthenticatedReadOnly(),),
+                ),
+                (
+                    "principal",
+                    ExpiringTokenAuthentication(),
+                    token,
+                    lambda: ORDER_PERMISSIONS,
+                ),
+                (
+                    "signed",
+                    SignedTokenAuthentication(),
+                    f"Bearer {issue_signed_token(user)}",
+                    lambda: ORDER_PERMISSIONS,
+                ),
+            )
+
+            for case in cases:
+                self.run_case(*case, options["requests"])
+
+            transaction.set_rollback(True)
+
+    def run_case(self, name, authentication, header, permissions, requests):
+        factory = APIRequestFactory()
+
+        def check():
+            request = Request(
+                factory.get("/", HTTP_AUTHORIZATION=header),
+                authenticators=(authentication,),
+            )
+            return all(
+                permission.has_permission(request, None)
+                for permission in permissions()
+            )
+
+        if not check():
+            raise CommandError(f"{name}: the permission check failed.")
+
+        # counted before the timed loop fills the capped query log
+        reset_queries()
+        with CaptureQueriesContext(connection) as queries:
+            check()
+
+        started = time.perf_counter()
+        for _ in range(requests):
+            check()
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"{name:>10}: {elapsed / requests * 1e6:8.1f} us/request, "
+            f"{len(queries)} queries/request"
+        )
@@ -0,0 +1,70 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.management.utils import get_random_secret_key
+
+PROFILES = ("development", "production", "api")
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Run benchmark_requests once per DJANGO_PROFILE, each in its own "
+        "process against a scratch database, to compare the per-request "
+        "overhead of the profiles."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        manage = os.path.join(settings.BASE_DIR, "manage.py")
+
+        with tempfile.TemporaryDirectory() as directory:
+            env = {
+                **os.environ,
+                "DJANGO_DATABASE_NAME": os.path.join(
+                    directory, "db.sqlite3"
+                ),
+                "DJANGO_ALLOWED_HOSTS": "testserver",
+                "DATABASE_REPLICAS": "",
+            }
+            # throwaway keys and a shared cache for the profiles that
+            # refuse to run without them
+            for name in ("DJANGO_SECRET_KEY", "DJANGO_SIGNED_TOKEN_KEY"):
+                env.setdefault(name, get_random_secret_key())
+            if "DJANGO_CACHE_BACKEND" not in env:
+                env["DJANGO_CACHE_BACKEND"] = (
+                    "django.core.cache.backends.filebased.FileBasedCache"
+                )
+                env["DJANGO_CACHE_LOCATION"] = os.path.join(
+                    directory, "cache"
+                )
+            self.run(manage, ["migrate", "-v", "0"], env)
+
+            for profile in PROFILES:
+                self.stdout.write(
+                    self.run(
+                        manage,
+                        [
+                            "benchmark_requests",
+                            "--requests",
+                            str(options["requests"]),
+                        ],
+                        {**env, "DJANGO_PROFILE": profile},
+                    ),
+                    ending="",
+                )
+
+    @staticmethod
+    def run(manage, arguments, env):
+        return subprocess.run(
+            [sys.executable, manage, *arguments],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
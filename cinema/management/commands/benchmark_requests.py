@@ -0,0 +1,54 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from user.authentication import issue_token
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Time authenticated API requests through the full middleware "
+        "stack of the current settings profile. Benchmark data is "
+        "rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--url", default=reverse("cinema:genre-list"))
+
+    def handle(self, *args, **options):
+        with transaction.atomic(), override_settings(
+            ALLOWED_HOSTS=["testserver"]
+        ):
+            user = get_user_model().objects.create_user(
+                username="benchmark-requests", password="benchmark"
+            )
+            client = Client(
+                HTTP_AUTHORIZATION=f"Token {issue_token(user).key}",
+                REMOTE_ADDR="127.0.0.1",
+            )
+
+            response = client.get(options["url"])
+            if response.status_code != 200:
+                raise CommandError(
+                    f"GET {options['url']} answered "
+                    f"{response.status_code}, not 200."
+                )
+
+            started = time.perf_counter()
+            for _ in range(options["requests"]):
+                client.get(options["url"])
+            elapsed = time.perf_counter() - started
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(
+            f"{settings.PROFILE:>11}: "
+            f"{elapsed / options['requests'] * 1e6:8.1f} us/request, "
+            f"{len(settings.MIDDLEWARE)} middleware"
+        )
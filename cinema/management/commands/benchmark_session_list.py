@@ -0,0 +1,114 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count, F
+from django.test import RequestFactory
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.request import Request
+
+from cinema.models import CinemaHall, Movie, MovieSession
+from cinema.serializers import MovieSessionListSerializer
+from cinema.views import MovieSessionViewSet
+
+
+def bytes_read(queryset):
+    """Size of the raw rows the database returns for ``queryset``"""
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    size = 0
+    for row in rows:
+        for value in row:
+            if isinstance(value, str):
+                size += len(value.encode())
+            elif isinstance(value, bytes):
+                size += len(value)
+            elif value is not None:
+                size += 8
+    return size
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Compare the movie session list query loading whole related "
+        "rows with the pruned one the view runs, on movies with long "
+        "descriptions, and report bytes read from the database and "
+        "rows serialized per second. Benchmark data is rolled back "
+        "afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sessions", type=int, default=2000)
+        parser.add_argument("--movies", type=int, default=200)
+        parser.add_argument("--description-length", type=int, default=20000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options)
+
+            request = Request(
+                RequestFactory().get(reverse("cinema:moviesession-list"))
+            )
+            view = MovieSessionViewSet(
+                request=request, action="list", args=(), kwargs={}
+            )
+            querysets = {
+                "whole rows": MovieSession.objects.select_related(
+                    "movie", "cinema_hall"
+                ).annotate(
+                    tickets_available=F("cinema_hall__rows")
+                    * F("cinema_hall__seats_in_row")
+                    - Count("tickets")
+                ),
+                "pruned": view.filter_queryset(view.get_queryset()),
+            }
+
+            for name, queryset in querysets.items():
+                self.run_case(name, queryset, options["repeat"])
+
+            transaction.set_rollback(True)
+
+    def run_case(self, name, queryset, repeat):
+        size = bytes_read(queryset)
+
+        rows = 0
+        started = time.perf_counter()
+        for _ in range(repeat):
+            rows += len(
+                MovieSessionListSerializer(queryset.all(), many=True).data
+            )
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"{name:>10}: {size / 1024:10.1f} KiB read, "
+            f"{rows / elapsed:8.0f} rows/s serialized"
+        )
+
+    @staticmethod
+    def seed(options):
+        movies = Movie.objects.bulk_create(
+            Movie(
+                title=f"Benchmark {number}",
+                description="x" * options["description_length"],
+                duration=90,
+            )
+            for number in range(options["movies"])
+        )
+        hall = CinemaHall.objects.create(
+            name="Benchmark", rows=20, seats_in_row=30
+        )
+        start = timezone.now()
+        MovieSession.objects.bulk_create(
+            MovieSession(
+                movie=movies[number % len(movies)],
+                cinema_hall=hall,
+                show_time=start + timedelta(hours=number),
+            )
+            for number in range(options["sessions"])
+        )
@@ -0,0 +1,152 @@
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+from django.db.models import Count, F
+from django.test import override_settings
+from django.utils import timezone
+
+from cinema.models import CinemaHall, Movie, MovieSession, Order, Ticket
+
+
+# Django's defaults against the profile from settings
+PROFILES = {
+    "defaults": ({}, 0),
+    "tuned": (
+        settings.SQLITE_PRAGMAS,
+        settings.DATABASES["default"].get("CONN_MAX_AGE", 0),
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Run concurrent seat-map reads and order writes against a "
+        "scratch SQLite file, once with Django's defaults and once with "
+        "SQLITE_PRAGMAS and persistent connections, and report "
+        "throughput and the rate of 'database is locked' errors."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--readers", type=int, default=8)
+        parser.add_argument("--writers", type=int, default=4)
+        parser.add_argument("--operations", type=int, default=200)
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            for name, (pragmas, max_age) in PROFILES.items():
+                alias = f"benchmark-{name}"
+                connections.settings[alias] = {
+                    **connections.settings["default"],
+                    "NAME": os.path.join(directory, f"{name}.sqlite3"),
+                    "CONN_MAX_AGE": max_age,
+                    "TEST": {},
+                }
+                try:
+                    with override_settings(SQLITE_PRAGMAS=pragmas):
+                        self.run_profile(name, alias, options)
+                finally:
+                    connections[alias].close()
+                    del connections.settings[alias]
+
+    def run_profile(self, name, alias, options):
+        call_command("migrate", database=alias, verbosity=0)
+        movie_session, user = self.create_session(alias)
+        connections[alias].close()
+
+        results = {"reads": 0, "writes": 0, "locked": 0}
+        lock = threading.Lock()
+        seats = iter(range(10 ** 9))
+
+        def read():
+            sessions = MovieSession.objects.using(alias).annotate(
+                tickets_available=(
+                    F("cinema_hall__rows") * F("cinema_hall__seats_in_row")
+                    - Count("tickets")
+                )
+            )
+            list(sessions)
+            list(
+                Ticket.objects.using(alias)
+                .filter(movie_session=movie_session)
+                .values_list("row", "seat")
+            )
+            return "reads"
+
+        def write():
+            with lock:
+                seat = next(seats)
+            with transaction.atomic(using=alias):
+                order = Order.objects.using(alias).create(user=user)
+                Ticket.objects.using(alias).bulk_create([
+                    Ticket(
+                        movie_session=movie_session,
+                        order=order,
+                        row=seat,
+                        seat=seat,
+                    )
+                ])
+            return "writes"
+
+        def worker(operation):
+            connection = connections[alias]
+            for _ in range(options["operations"]):
+                try:
+                    outcome = operation()
+                except OperationalError as error:
+                    if "locked" not in str(error):
+                        raise
+                    outcome = "locked"
+                with lock:
+                    results[outcome] += 1
+                # what Django does at the end of every request
+                connection.close_if_unusable_or_obsolete()
+            connection.close()
+
+        threads = [
+            threading.Thread(target=worker, args=(read,))
+            for _ in range(options["readers"])
+        ] + [
+            threading.Thread(target=worker, args=(write,))
+            for _ in range(options["writers"])
+        ]
+
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        total = sum(results.values())
+        self.stdout.write(
+            f"{name:>8}: {total / elapsed:8.0f} ops/s, "
+            f"{results['reads']} reads, {results['writes']} writes, "
+            f"{results['locked'] / total:6.1%} locked"
+        )
+
+    @staticmethod
+    def create_session(alias):
+        # bulk_create keeps the catalogue change log, which lives on the
+        # default database, out of it
+        movie, = Movie.objects.using(alias).bulk_create(
+            [Movie(title="Benchmark", description="", duration=90)]
+        )
+        user = get_user_model().objects.db_manager(alias).create_user(
+            username="benchmark-sqlite", password="benchmark"
+        )
+        movie_session = MovieSession.objects.using(alias).create(
+            show_time=timezone.now() + timedelta(days=1),
+            movie=movie,
+            cinema_hall=CinemaHall.objects.using(alias).create(
+                name="Benchmark", rows=10, seats_in_row=10
+            ),
+        )
+        return movie_session, user
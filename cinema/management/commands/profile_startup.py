@@ -0,0 +1,157 @@
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.core.management.utils import get_random_secret_key
+
+# modules a worker should not need before its first request
+DEFERRED_MODULES = (
+    "cinema.serializers",
+    "cinema.views",
+    "user.views",
+    "user.provisioning",
+    "concurrent.futures.process",
+    "debug_toolbar",
+)
+
+# packages whose modules a worker loads by its first request are counted;
+# unlike timings the counts do not vary with the machine or its load
+COUNTED_PACKAGES = ("cinema", "cinema_service", "user", "rest_framework")
+
+# runs in a fresh interpreter, times every AppConfig.ready() and the
+# URLconf and reports which deferred modules were imported anyway by
+# the time a URL is resolved, and how many modules of each counted
+# package are loaded by then
+CHILD = """
+import json, sys, time
+
+started = time.perf_counter()
+import django
+from django.apps.config import AppConfig
+
+ready = {}
+create = AppConfig.create.__func__
+
+
+def timed_create(cls, entry):
+    app_config = create(cls, entry)
+    original = app_config.ready
+
+    def timed_ready():
+        begun = time.perf_counter()
+        original()
+        ready[app_config.label] = time.perf_counter() - begun
+
+    app_config.ready = timed_ready
+    return app_config
+
+
+AppConfig.create = classmethod(timed_create)
+django.setup()
+setup = time.perf_counter() - started
+
+from django.urls import get_resolver
+
+begun = time.perf_counter()
+get_resolver().url_patterns
+urls = time.perf_counter() - begun
+
+# resolving loads every included URLconf, as a worker's first request
+# would before calling the view
+get_resolver().resolve("/api/cinema/movies/")
+imported = [name for name in %r if name in sys.modules]
+loaded = {
+    package: sum(name.split(".")[0] == package for name in sys.modules)
+    for package in %r
+}
+
+print(json.dumps({
+    "setup": setup,
+    "urls": urls,
+    "ready": ready,
+    "imported": imported,
+    "loaded": loaded,
+}))
+""" % (DEFERRED_MODULES, COUNTED_PACKAGES)
+
+
+def measure_startup(profile=None):
+    """Start-up timings of a fresh worker and its per-module import times"""
+    env = dict(os.environ)
+    if profile:
+        env["DJANGO_PROFILE"] = profile
+    # throwaway keys for profiles that refuse to boot without them
+    for name in ("DJANGO_SECRET_KEY", "DJANGO_SIGNED_TOKEN_KEY"):
+        env.setdefault(name, get_random_secret_key())
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    report = json.loads(result.stdout.splitlines()[-1])
+
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        own, cumulative, module = line[len("import time:"):].split("|")
+        imports.append((module.strip(), int(own), int(cumulative)))
+    report["imports"] = imports
+    return report
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Start a fresh interpreter the way a worker boots and report "
+        "django.setup(), each AppConfig.ready(), URLconf loading and the "
+        "import time per package and module."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--profile", help="DJANGO_PROFILE to boot with")
+        parser.add_argument("--top", type=int, default=15)
+
+    def handle(self, *args, **options):
+        report = measure_startup(options["profile"])
+
+        self.stdout.write(
+            f"django.setup(): {report['setup'] * 1e3:7.1f} ms\n"
+            f"url patterns:   {report['urls'] * 1e3:7.1f} ms"
+        )
+
+        self.stdout.write("\nAppConfig.ready():")
+        for label, seconds in sorted(
+            report["ready"].items(), key=lambda item: -item[1]
+        ):
+            self.stdout.write(f"  {label:<30} {seconds * 1e3:7.1f} ms")
+
+        packages = defaultdict(int)
+        for module, own, _ in report["imports"]:
+            packages[module.split(".")[0]] += own
+        self.stdout.write("\nimport time by package:")
+        for package, own in sorted(
+            packages.items(), key=lambda item: -item[1]
+        )[: options["top"]]:
+            self.stdout.write(f"  {package:<30} {own / 1e3:7.1f} ms")
+
+        self.stdout.write("\nslowest imports (cumulative):")
+        for module, _, cumulative in sorted(
+            report["imports"], key=lambda item: -item[2]
+        )[: options["top"]]:
+            self.stdout.write(f"  {module:<50} {cumulative / 1e3:7.1f} ms")
+
+        self.stdout.write("\nmodules loaded by the first request:")
+        for package, count in report["loaded"].items():
+            self.stdout.write(f"  {package:<30} {count:7d}")
+
+        if report["imported"]:
+            self.stdout.write(
+                "\nimported before the first request: "
+                + ", ".join(report["imported"])
+            )
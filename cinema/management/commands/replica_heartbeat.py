@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from cinema.replicas import beat
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Stamp the heartbeat row on the primary every few seconds. "
+        "Replicas are only read from while their copy of it is fresh."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval", type=float, default=1.0)
+        parser.add_argument("--once", action="store_true")
+
+    def handle(self, *args, **options):
+        while True:
+            beat()
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
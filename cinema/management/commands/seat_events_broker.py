@@ -0,0 +1,67 @@
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from cinema.seat_events import MAX_BROKER_MESSAGE
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Relay seat map events between worker processes, a local "
+        "stand-in for a message broker. Workers connect to it when "
+        "DJANGO_SEAT_EVENTS_BROKER names its address. Messages are "
+        "relayed as opaque bytes to peers holding "
+        "DJANGO_SEAT_EVENTS_BROKER_KEY."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=7655)
+
+    def handle(self, *args, **options):
+        if not settings.SEAT_EVENTS_BROKER_KEY:
+            raise CommandError("DJANGO_SEAT_EVENTS_BROKER_KEY must be set.")
+        listener = Listener(
+            (options["host"], options["port"]),
+            authkey=settings.SEAT_EVENTS_BROKER_KEY.encode(),
+        )
+        self.stdout.write(f"relaying seat events on {listener.address}")
+        self.serve(listener)
+
+    def serve(self, listener):
+        connections = set()
+        lock = threading.Lock()
+
+        def relay(connection):
+            try:
+                while True:
+                    message = connection.recv_bytes(MAX_BROKER_MESSAGE)
+                    with lock:
+                        for subscriber in list(connections):
+                            try:
+                                subscriber.send_bytes(message)
+                            except OSError:
+                                connections.discard(subscriber)
+            except (EOFError, OSError):
+                pass
+            finally:
+                with lock:
+                    connections.discard(connection)
+                connection.close()
+
+        while True:
+            try:
+                connection = listener.accept()
+            except AuthenticationError:
+                continue
+            except OSError:
+                # the listener was closed
+                return
+            with lock:
+                connections.add(connection)
+            threading.Thread(
+                target=relay, args=(connection,), daemon=True
+            ).start()
@@ -0,0 +1,31 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from cinema.replicas import beat
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Copy the SQLite primary over every SQLite replica, standing in "
+        "for replication when running locally."
+    )
+
+    def handle(self, *args, **options):
+        primary = connections[DEFAULT_DB_ALIAS]
+        if primary.vendor != "sqlite":
+            raise CommandError("sync_replica only copies SQLite databases.")
+
+        beat()
+        primary.ensure_connection()
+        for alias in settings.REPLICA_DATABASES:
+            replica = connections[alias]
+            replica.close()
+            target = sqlite3.connect(replica.settings_dict["NAME"])
+            try:
+                primary.connection.backup(target)
+            finally:
+                target.close()
+            self.stdout.write(f"copied {DEFAULT_DB_ALIAS} to {alias}")
@@ -0,0 +1,20 @@
+# Generated by Django 4.1 on 2026-10-19 14:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cinema", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="moviesession",
+            index=models.Index(
+                fields=["cinema_hall", "show_time"],
+                name="cinema_movi_cinema__fedb89_idx",
+            ),
+        ),
+    ]
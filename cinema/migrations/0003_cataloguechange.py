@@ -0,0 +1,65 @@
+# Generated by Django 4.1 on 2026-10-19 14:26
+
+from django.db import migrations, models
+
+
+def seed_catalogue_changes(apps, schema_editor):
+    catalogue_change = apps.get_model("cinema", "CatalogueChange")
+    db_alias = schema_editor.connection.alias
+
+    for object_type in ("genre", "actor", "movie"):
+        model = apps.get_model("cinema", object_type)
+        catalogue_change.objects.using(db_alias).bulk_create(
+            catalogue_change(
+                object_type=object_type,
+                object_id=object_id,
+                action="created",
+            )
+            for object_id in model.objects.using(db_alias).values_list(
+                "id", flat=True
+            )
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cinema", "0002_moviesession_hall_show_time_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CatalogueChange",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("object_type", models.CharField(max_length=32)),
+                ("object_id", models.BigIntegerField()),
+                (
+                    "action",
+                    models.CharField(
+                        choices=[
+                            ("created", "Created"),
+                            ("updated", "Updated"),
+                            ("deleted", "Deleted"),
+                        ],
+                        max_length=7,
+                    ),
+                ),
+                ("changed_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "ordering": ["id"],
+            },
+        ),
+        migrations.RunPython(
+            seed_catalogue_changes, migrations.RunPython.noop
+        ),
+    ]
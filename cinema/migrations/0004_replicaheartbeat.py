@@ -0,0 +1,28 @@
+# Generated by Django 4.1 on 2026-10-19 14:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cinema", "0003_cataloguechange"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReplicaHeartbeat",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("beat_at", models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.1 on 2026-10-19 16:08
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cinema', '0005_archivedorder_archivedticket'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='archivedticket',
+            unique_together={('movie_session', 'row', 'seat')},
+        ),
+    ]
@@ -0,0 +1,536 @@
+import hashlib
+import json
+from itertools import chain
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import BooleanField, Value, prefetch_related_objects
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.renderers import JSONRenderer
+from rest_framework.relations import ManyRelatedField
+from rest_framework.response import Response
+
+from cinema.renderers import ColumnarJSONRenderer
+from cinema.replicas import primary_reads
+from cinema.sync import catalogue_generation
+from cinema_service.middleware import gzip_compress
+from cinema.serializers import PreloadedPrimaryKeyRelatedField
+from cinema.signals import bulk_created
+
+
+class BulkCreateModelMixin:
+    """Create every object of a list payload with a single insert.
+
+    All items are validated before anything is written, related
+    objects are resolved with one lookup per relation and the response
+    carries the errors of every invalid item.
+    """
+
+    def create(self, request, *args, **kwargs):
+        if isinstance(request.data, list):
+            return self.bulk_create(request)
+
+        return super().create(request, *args, **kwargs)
+
+    def bulk_create(self, request):
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.context["bulk"] = True
+        serializer.context["preloaded"] = self.preload_related(
+            serializer.child, request.data
+        )
+        serializer.is_valid(raise_exception=True)
+
+        with transaction.atomic():
+            errors = self.validate_bulk(serializer.validated_data)
+            if any(errors):
+                return Response(
+                    [
+                        {"non_field_errors": [error]} if error else {}
+                        for error in errors
+                    ],
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            instances = self.perform_bulk_create(serializer.validated_data)
+
+        return Response(
+            self.get_serializer(instances, many=True).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+    @staticmethod
+    def preload_related(child, items):
+        """Fetch every object referenced by the payload, per model"""
+        wanted = {}
+        for name, field in child.fields.items():
+            relation = getattr(field, "child_relation", field)
+            if field.read_only or not isinstance(
+                relation, PreloadedPrimaryKeyRelatedField
+            ):
+                continue
+
+            pks = wanted.setdefault(relation.get_queryset().model, set())
+            for item in items:
+                if not isinstance(item, dict) or name not in item:
+                    continue
+                refs = item[name]
+                if not isinstance(field, ManyRelatedField):
+                    refs = [refs]
+                elif not isinstance(refs, list):
+                    continue
+                for ref in refs:
+                    try:
+                        pks.add(int(ref))
+                    except (TypeError, ValueError):
+                        continue
+
+        return {
+            model: model._default_manager.in_bulk(pks)
+            for model, pks in wanted.items()
+        }
+
+    def validate_bulk(self, validated_data):
+        """Cross-item checks, one error message or ``None`` per item"""
+        model = self.get_serializer_class().Meta.model
+        errors = [None] * len(validated_data)
+
+        for field in model._meta.fields:
+            if not field.unique or field.primary_key:
+                continue
+            seen = set()
+            for index, attrs in enumerate(validated_data):
+                if field.name not in attrs:
+                    continue
+                if attrs[field.name] in seen:
+                    errors[index] = (
+                        f"{field.name} is repeated within the payload."
+                    )
+                seen.add(attrs[field.name])
+
+        return errors
+
+    def perform_bulk_create(self, validated_data):
+        model = self.get_serializer_class().Meta.model
+        m2m_fields = [
+            field
+            for field in model._meta.many_to_many
+            if any(field.name in attrs for attrs in validated_data)
+        ]
+        links = [
+            {field.name: attrs.pop(field.name, []) for field in m2m_fields}
+            for attrs in validated_data
+        ]
+
+        instances = model._default_manager.bulk_create(
+            model(**attrs) for attrs in validated_data
+        )
+
+        created_links = {}
+        for field in m2m_fields:
+            through = field.remote_field.through
+            source = f"{field.m2m_field_name()}_id"
+            target = f"{field.m2m_reverse_field_name()}_id"
+            created_links[through] = [
+                (instance.pk, related.pk)
+                for instance, link in zip(instances, links)
+                for related in dict.fromkeys(link[field.name])
+            ]
+            through._default_manager.bulk_create(
+                through(**{source: instance_pk, target: related_pk})
+                for instance_pk, related_pk in created_links[through]
+            )
+
+        # bulk_create skips post_save and m2m_changed
+        bulk_created.send(
+            sender=model, instances=instances, links=created_links
+        )
+
+        if m2m_fields:
+            prefetch_related_objects(
+                instances, *(field.name for field in m2m_fields)
+            )
+
+        return instances
+
+
+def related_paths(tree, prefix=""):
+    """Flatten ``Query.select_related`` into ``select_related()`` paths"""
+    for name, subtree in tree.items():
+        if subtree:
+            yield from related_paths(subtree, f"{prefix}{name}__")
+        else:
+            yield prefix + name
+
+
+class SparseFieldsMixin:
+    """Serialize only the fields a read asks for, and load only those.
+
+    ``?fields=a,b`` keeps the listed fields and ``?omit=a,b`` drops
+    them. Every read is pruned to the serialized fields: ``only()`` the
+    model fields they read, ``select_related()`` and
+    ``prefetch_related()`` just the relations they use, and an entry of
+    ``field_annotations`` is annotated only when its field is serialized.
+    """
+
+    field_annotations = {}
+
+    def get_sparse_fields(self):
+        """Names of the requested fields, ``None`` to serialize all"""
+        if self.request.method not in SAFE_METHODS:
+            return None
+
+        params = self.request.query_params
+        if "fields" in params and "omit" in params:
+            raise ParseError("Use either fields or omit, not both.")
+
+        wanted = params.get("fields", params.get("omit"))
+        if wanted is None:
+            return None
+
+        names = {name.strip() for name in wanted.split(",")} - {""}
+        declared = self.get_serializer_class().Meta.fields
+        unknown = names.difference(declared)
+        if unknown:
+            raise ParseError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+        keep = "fields" in params
+        fields = tuple(name for name in declared if (name in names) == keep)
+        if not fields:
+            raise ParseError("No fields left to serialize.")
+        return fields
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            kwargs["fields"] = fields
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        serializer_class = self.get_serializer_class()
+        fields = self.get_sparse_fields()
+        if fields is None:
+            fields = serializer_class.Meta.fields
+
+        annotations = {
+            name: expression
+            for name, expression in self.field_annotations.items()
+            if name in fields
+        }
+        if annotations:
+            queryset = queryset.annotate(**annotations)
+
+        # writes save the instance they load, so it is loaded whole
+        if self.request.method not in SAFE_METHODS:
+            return queryset
+
+        columns = serializer_class.read_columns(fields)
+        used = set(fields).union(column.split("__")[0] for column in columns)
+
+        if isinstance(queryset.query.select_related, dict):
+            paths = [
+                path
+                for path in related_paths(queryset.query.select_related)
+                if path.split("__")[0] in used
+            ]
+            queryset = queryset.select_related(None)
+            # select_related() without paths would follow every relation
+            if paths:
+                queryset = queryset.select_related(*paths)
+
+        if queryset._prefetch_related_lookups:
+            lookups = [
+                lookup
+                for lookup in queryset._prefetch_related_lookups
+                if getattr(lookup, "prefetch_to", lookup).split("__")[0]
+                in used
+            ]
+            queryset = queryset.prefetch_related(None).prefetch_related(
+                *lookups
+            )
+
+        return queryset.only("pk", *columns)
+
+
+class ColumnarListMixin:
+    """List as ``{"columns": [...], "rows": [[...], ...]}`` on request.
+
+    Key names are sent once instead of in every object. ``columns`` maps
+    each column to the lookup or expression it reads, and the rows come
+    straight from ``values_list()`` without model instances or per-row
+    dicts. Paginated views page over the primary keys first, so a
+    column of a multi-valued relation yields one row per related object
+    and still a full page of objects.
+    """
+
+    columns = {}
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        if self.action == "list":
+            renderers.append(ColumnarJSONRenderer())
+        return renderers
+
+    def get_columns(self):
+        if isinstance(self, SparseFieldsMixin):
+            fields = self.get_sparse_fields()
+            if fields is not None:
+                return {
+                    name: lookup
+                    for name, lookup in self.columns.items()
+                    if name in fields
+                }
+        return self.columns
+
+    def list(self, request, *args, **kwargs):
+        if request.accepted_renderer.format != ColumnarJSONRenderer.format:
+            return super().list(request, *args, **kwargs)
+
+        columns = self.get_columns()
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(
+            None
+        )
+
+        page = self.paginate_queryset(queryset.values_list("pk", flat=True))
+        if page is not None:
+            queryset = queryset.filter(pk__in=page)
+
+        table = {
+            "columns": list(columns),
+            "rows": list(queryset.values_list(*columns.values())),
+        }
+        if page is not None:
+            return self.get_paginated_response(table)
+        return Response(table)
+
+
+class ArchiveListMixin:
+    """List the rows of a table and of its archive as one collection.
+
+    ``get_archive_queryset()`` returns the archived counterpart of
+    ``get_queryset()``: a model with the same field and relation names
+    whose rows kept their primary keys. A page is cut from the union of
+    both tables' keys in ``archive_ordering``, then each table loads
+    only its own rows of the page, so the serializer, and the columns
+    of ``ColumnarListMixin``, read either model unchanged.
+    """
+
+    archive_ordering = ()
+
+    def get_archive_queryset(self):
+        raise NotImplementedError
+
+    def list(self, request, *args, **kwargs):
+        querysets = (
+            self.filter_queryset(self.get_queryset()),
+            self.filter_queryset(self.get_archive_queryset()),
+        )
+        keys = ["pk", *(name.lstrip("-") for name in self.archive_ordering)]
+        history = (
+            querysets[0]
+            .annotate(archived=Value(False, output_field=BooleanField()))
+            .order_by()
+            .values_list(*keys, "archived")
+            .union(
+                querysets[1]
+                .annotate(archived=Value(True, output_field=BooleanField()))
+                .order_by()
+                .values_list(*keys, "archived"),
+                all=True,
+            )
+            .order_by(*self.archive_ordering, "-pk")
+        )
+
+        page = self.paginate_queryset(history)
+        entries = list(history) if page is None else page
+        # the primary keys of the two tables never collide
+        position = {entry[0]: index for index, entry in enumerate(entries)}
+        tables = [
+            (queryset, [pk for pk, *_, flag in entries if flag == archived])
+            for archived, queryset in zip((False, True), querysets)
+        ]
+
+        if request.accepted_renderer.format == ColumnarJSONRenderer.format:
+            columns = self.get_columns()
+            rows = chain.from_iterable(
+                queryset.prefetch_related(None)
+                .filter(pk__in=pks)
+                .values_list("pk", *columns.values())
+                for queryset, pks in tables
+                if pks
+            )
+            # sorted() is stable, the rows of an object keep their order
+            data = {
+                "columns": list(columns),
+                "rows": [
+                    row[1:]
+                    for row in sorted(rows, key=lambda row: position[row[0]])
+                ],
+            }
+        else:
+            instances = chain.from_iterable(
+                queryset.filter(pk__in=pks) for queryset, pks in tables if pks
+            )
+            data = self.get_serializer(
+                sorted(instances, key=lambda instance: position[instance.pk]),
+                many=True,
+            ).data
+
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+
+class CachedCatalogueListMixin:
+    """Serve catalogue lists from the cache, rendered and gzipped once.
+
+    Entries are keyed by the catalogue generation, which every committed
+    catalogue change bumps, and by the full path and media type, so
+    filters, sparse fieldsets and formats are cached apart. Only
+    authenticated reads get this far, and the catalogue is the same for
+    every user; the browsable API is not cached, as its pages name the
+    user. ``CompressionMiddleware`` sends the stored gzip body.
+    """
+
+    def get_list_cache_key(self, request):
+        path = hashlib.md5(
+            request.get_full_path().encode(), usedforsecurity=False
+        ).hexdigest()
+        return (
+            f"cinema:catalogue-list:{catalogue_generation()}:"
+            f"{request.accepted_renderer.media_type}:{path}"
+        )
+
+    def list(self, request, *args, **kwargs):
+        timeout = settings.CATALOGUE_CACHE_TIMEOUT
+        if not timeout or not isinstance(
+            request.accepted_renderer, JSONRenderer
+        ):
+            return super().list(request, *args, **kwargs)
+
+        key = self.get_list_cache_key(request)
+        entry = cache.get(key)
+        if entry is not None:
+            content_type, content, gzip_content = entry
+            response = HttpResponse(content, content_type=content_type)
+            response.gzip_content = gzip_content
+            return response
+
+        def store(response):
+            if response.status_code != 200:
+                return
+            # compressed once for many requests, so at the highest level
+            response.gzip_content = gzip_compress(response.content, level=9)
+            cache.set(
+                key,
+                (
+                    response["Content-Type"],
+                    response.content,
+                    response.gzip_content,
+                ),
+                timeout,
+            )
+
+        with primary_reads():
+            response = super().list(request, *args, **kwargs)
+        response.add_post_render_callback(store)
+        return response
+
+
+class IdempotentCreateMixin:
+    """Replay the response of a create retried with its Idempotency-Key.
+
+    The first request with a key claims it for ``IDEMPOTENCY_CLAIM_TTL``
+    and runs as usual; its rendered response is then kept for
+    ``IDEMPOTENCY_KEY_TTL``. A retry by the same user gets that
+    response back without validating or writing anything. Keys are
+    scoped per user and bound to the payload they were first used with.
+    Failed creates are not kept, so a corrected request may reuse the
+    key. Keys live in the default cache, which outside development is
+    shared by every worker, so a retry landing on another process is
+    still recognised.
+    """
+
+    idempotency_header = "Idempotency-Key"
+
+    def get_idempotency_cache_key(self, request, key):
+        digest = hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+        return f"cinema:idempotency:{request.user.id}:{digest}"
+
+    def create(self, request, *args, **kwargs):
+        key = request.headers.get(self.idempotency_header)
+        if key is None:
+            return super().create(request, *args, **kwargs)
+        if not key or len(key) > 255:
+            raise ParseError(
+                f"{self.idempotency_header} must be 1 to 255 characters."
+            )
+
+        cache_key = self.get_idempotency_cache_key(request, key)
+        fingerprint = hashlib.md5(
+            json.dumps(request.data, sort_keys=True, default=str).encode(),
+            usedforsecurity=False,
+        ).hexdigest()
+        timeout = settings.IDEMPOTENCY_KEY_TTL.total_seconds()
+
+        # claimed atomically, so concurrent retries cannot both proceed;
+        # the claim of a worker that dies mid-request soon lapses
+        if not cache.add(
+            cache_key,
+            (fingerprint, None),
+            settings.IDEMPOTENCY_CLAIM_TTL.total_seconds(),
+        ):
+            entry = cache.get(cache_key)
+            if entry is not None:
+                return self.replay(key, fingerprint, *entry)
+
+        def store(response):
+            cache.set(
+                cache_key,
+                (
+                    fingerprint,
+                    (
+                        response.status_code,
+                        response["Content-Type"],
+                        response.content,
+                    ),
+                ),
+                timeout,
+            )
+
+        try:
+            response = super().create(request, *args, **kwargs)
+        except Exception:
+            # the view turns it into an error response, which is not kept
+            cache.delete(cache_key)
+            raise
+        response.add_post_render_callback(store)
+        return response
+
+    def replay(self, key, fingerprint, stored_fingerprint, stored):
+        if stored_fingerprint != fingerprint:
+            return Response(
+                {
+                    "detail": f"{self.idempotency_header} {key!r} was used "
+                    f"with a different request."
+                },
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        if stored is None:
+            return Response(
+                {
+                    "detail": f"A request with {self.idempotency_header} "
+                    f"{key!r} is in progress."
+                },
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        status_code, content_type, content = stored
+        response = HttpResponse(
+            content, status=status_code, content_type=content_type
+        )
+        response["Idempotent-Replayed"] = "true"
+        return response
@@ -49,6 +49,37 @@ class Movie(models.Model):
         return self.title
 
 
+class CatalogueChange(models.Model):
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+    ACTION_CHOICES = (
+        (CREATED, "Created"),
+        (UPDATED, "Updated"),
+        (DELETED, "Deleted"),
+    )
+
+    object_type = models.CharField(max_length=32)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=7, choices=ACTION_CHOICES)
+    changed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self):
+        return f"{self.object_type} {self.object_id} {self.action}"
+
+
+class ReplicaHeartbeat(models.Model):
+    """A single row stamped on the primary to measure replica lag"""
+
+    beat_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"heartbeat at {self.beat_at}"
+
+
 class MovieSession(models.Model):
     show_time = models.DateTimeField()
     movie = models.ForeignKey(Movie, on_delete=models.CASCADE)
@@ -56,6 +87,7 @@ class MovieSession(models.Model):
 
     class Meta:
         ordering = ["-show_time"]
+        indexes = [models.Index(fields=["cinema_hall", "show_time"])]
 
     def __str__(self):
         return self.movie.title + " " + str(self.show_time)
@@ -101,6 +133,16 @@ class Ticket(models.Model):
                     }
                 )
 
+    @staticmethod
+    def validate_not_archived(movie_session, row, seat, error_to_raise):
+        """Archived tickets are not in this table's unique constraint"""
+        if ArchivedTicket.objects.filter(
+            movie_session=movie_session, row=row, seat=seat
+        ).exists():
+            raise error_to_raise(
+                {"seat": "This seat is taken by an archived order."}
+            )
+
     def clean(self):
         Ticket.validate_ticket(
             self.row,
@@ -108,6 +150,9 @@ class Ticket(models.Model):
             self.movie_session.cinema_hall,
             ValidationError,
         )
+        Ticket.validate_not_archived(
+            self.movie_session, self.row, self.seat, ValidationError
+        )
 
     def save(
         self,
@@ -128,3 +173,48 @@ class Ticket(models.Model):
     class Meta:
         unique_together = ("movie_session", "row", "seat")
         ordering = ["row", "seat"]
+
+
+class ArchivedOrder(models.Model):
+    """An order for past sessions only, moved out of ``Order``.
+
+    Keeps the id it had, so the order history can list both tables.
+    """
+
+    id = models.BigIntegerField(primary_key=True)  # noqa: VNE003
+    created_at = models.DateTimeField()
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="archived_orders",
+    )
+
+    def __str__(self):
+        return str(self.created_at)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+
+class ArchivedTicket(models.Model):
+    """A ticket of an ``ArchivedOrder``, named like ``Ticket``'s fields"""
+
+    id = models.BigIntegerField(primary_key=True)  # noqa: VNE003
+    movie_session = models.ForeignKey(
+        MovieSession,
+        on_delete=models.CASCADE,
+        related_name="archived_tickets",
+    )
+    order = models.ForeignKey(
+        ArchivedOrder, on_delete=models.CASCADE, related_name="tickets"
+    )
+    row = models.IntegerField()
+    seat = models.IntegerField()
+
+    def __str__(self):
+        return (f"{str(self.movie_session)} "
+                f"(row: {self.row}, seat: {self.seat})")
+
+    class Meta:
+        unique_together = ("movie_session", "row", "seat")
+        ordering = ["row", "seat"]
@@ -0,0 +1,107 @@
+from array import array
+from bisect import bisect_left
+from threading import Lock
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+from cinema.models import Movie
+
+
+class MovieRelationIndex:
+    """Inverted index from a genre or actor id to its sorted movie ids.
+
+    The index lives in process memory, is built lazily from the M2M
+    table and is kept up to date from ``m2m_changed``. Every change
+    bumps a generation counter in the default cache. Other processes
+    notice the mismatch and rebuild on their next read only if that
+    cache is shared between them, which the system checks require
+    outside development; with a per-process cache they would keep
+    serving their own copy.
+    """
+
+    def __init__(self, field_name):
+        self.field_name = field_name
+        self.generation_key = f"cinema:movie-index:{field_name}"
+        self._postings = None
+        self._generation = None
+        self._lock = Lock()
+
+    def movie_ids(self, related_ids):
+        """Ids of the movies linked to any of ``related_ids``"""
+        postings = self._current_postings()
+        found = set()
+        for related_id in related_ids:
+            found.update(postings.get(related_id, ()))
+        return found
+
+    def add(self, links):
+        self._apply(links, self._insert)
+
+    def remove(self, links):
+        self._apply(links, self._delete)
+
+    def invalidate(self):
+        self._apply((), None)
+
+    def _current_postings(self):
+        generation = cache.get(self.generation_key, 0)
+        with self._lock:
+            if self._postings is None or self._generation != generation:
+                self._postings = self._build()
+                self._generation = generation
+            return self._postings
+
+    def _build(self):
+        field = Movie._meta.get_field(self.field_name)
+        through = field.remote_field.through
+        # the index must not be rebuilt from a lagging replica
+        links = through.objects.using(DEFAULT_DB_ALIAS).order_by(
+            f"{field.m2m_field_name()}_id"
+        ).values_list(
+            f"{field.m2m_reverse_field_name()}_id",
+            f"{field.m2m_field_name()}_id",
+        )
+
+        postings = {}
+        for related_id, movie_id in links.iterator():
+            postings.setdefault(related_id, array("q")).append(movie_id)
+        return postings
+
+    def _apply(self, links, operation):
+        cache.add(self.generation_key, 0, timeout=None)
+        generation = cache.incr(self.generation_key)
+
+        with self._lock:
+            # keep the local copy only if no other change slipped in
+            if (
+                operation is None
+                or self._postings is None
+                or self._generation != generation - 1
+            ):
+                self._postings = None
+                return
+
+            for movie_id, related_id in links:
+                operation(self._postings, related_id, movie_id)
+            self._generation = generation
+
+    @staticmethod
+    def _insert(postings, related_id, movie_id):
+        movie_ids = postings.setdefault(related_id, array("q"))
+        index = bisect_left(movie_ids, movie_id)
+        if index == len(movie_ids) or movie_ids[index] != movie_id:
+            movie_ids.insert(index, movie_id)
+
+    @staticmethod
+    def _delete(postings, related_id, movie_id):
+        movie_ids = postings.get(related_id)
+        if movie_ids is None:
+            return
+        index = bisect_left(movie_ids, movie_id)
+        if index < len(movie_ids) and movie_ids[index] == movie_id:
+            del movie_ids[index]
+
+
+genre_index = MovieRelationIndex("genres")
+actor_index = MovieRelationIndex("actors")
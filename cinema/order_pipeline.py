@@ -0,0 +1,208 @@
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from queue import Empty, SimpleQueue
+
+from django.conf import settings
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    DatabaseError,
+    IntegrityError,
+    connections,
+    transaction,
+)
+
+from cinema.models import Order, Ticket
+from cinema.seat_events import TAKEN, publish_seats
+
+
+class SeatConflict(Exception):
+    """Seats of an order are taken, by an earlier order or by itself"""
+
+    def __init__(self, seats):
+        self.seats = seats
+        super().__init__(
+            "Seats already taken: "
+            + ", ".join(
+                f"session {movie_session_id} row {row} seat {seat}"
+                for movie_session_id, row, seat in seats
+            )
+            + "."
+        )
+
+
+class OrderTimeout(Exception):
+    """An order waited ``ORDER_PIPELINE_TIMEOUT`` and was withdrawn.
+
+    It was never written and never will be, so it is safe to retry.
+    """
+
+
+class PendingOrder:
+    def __init__(self, user_id, tickets):
+        self.user_id = user_id
+        self.tickets = tickets
+        self.future = Future()
+
+    @property
+    def seats(self):
+        return [
+            (ticket["movie_session"].id, ticket["row"], ticket["seat"])
+            for ticket in self.tickets
+        ]
+
+
+class OrderPipeline:
+    """Commit the orders of many requests together, a batch at a time.
+
+    Requests hand their validated orders to a single committer thread
+    and wait for the outcome of their own. The committer takes every
+    order queued while it was busy, up to ``ORDER_PIPELINE_BATCH_SIZE``,
+    settles seat conflicts in memory against the seats already taken
+    and writes the accepted orders in one transaction, so concurrent
+    requests stop contending for the write lock one commit each.
+
+    Batches only form while requests wait on threads of their own, as
+    under WSGI with a threaded server. The ASGI entry point runs sync
+    views thread-sensitively, all on one thread, so requests would
+    reach the pipeline one after another and every batch would hold a
+    single order: leave the pipeline off there.
+    """
+
+    def __init__(self, using=DEFAULT_DB_ALIAS):
+        self.using = using
+        self._queue = SimpleQueue()
+        self._committer = None
+        self._lock = threading.Lock()
+
+    def submit(self, user_id, tickets):
+        """Queue an order and wait until its batch is committed.
+
+        ``tickets`` are validated ticket data; returns the new order or
+        raises ``SeatConflict``. An order still queued after
+        ``ORDER_PIPELINE_TIMEOUT`` is withdrawn and ``OrderTimeout``
+        raised; one whose batch is already being written is waited for,
+        so the caller always learns whether it was placed.
+        """
+        pending = PendingOrder(user_id, tickets)
+        self._queue.put(pending)
+        self._start()
+        try:
+            return pending.future.result(
+                settings.ORDER_PIPELINE_TIMEOUT.total_seconds()
+            )
+        except FutureTimeout:
+            if pending.future.cancel():
+                raise OrderTimeout("The order was not placed in time.")
+            return pending.future.result()
+
+    def _start(self):
+        with self._lock:
+            if self._committer is None or not self._committer.is_alive():
+                self._committer = threading.Thread(
+                    target=self._run, daemon=True
+                )
+                self._committer.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < settings.ORDER_PIPELINE_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except Empty:
+                    break
+
+            self.commit(batch)
+            # what Django does at the end of every request
+            connections[self.using].close_if_unusable_or_obsolete()
+
+    def commit(self, batch):
+        """Write the orders of ``batch`` and settle every future.
+
+        Orders withdrawn by a timed out ``submit`` are skipped.
+        """
+        batch = [
+            pending
+            for pending in batch
+            if pending.future.set_running_or_notify_cancel()
+        ]
+        if batch:
+            self._commit(batch)
+
+    def _commit(self, batch):
+        try:
+            with transaction.atomic(using=self.using):
+                accepted, conflicts = self._write(batch)
+        except DatabaseError as error:
+            # a seat taken outside the pipeline fails the whole batch;
+            # one by one, only the order that clashes fails
+            if len(batch) > 1:
+                for pending in batch:
+                    self._commit([pending])
+                return
+            if isinstance(error, IntegrityError):
+                taken = self._taken_seats(batch)
+                clashes = [seat for seat in batch[0].seats if seat in taken]
+                if clashes:
+                    error = SeatConflict(clashes)
+            batch[0].future.set_exception(error)
+            return
+        except Exception as error:
+            for pending in batch:
+                pending.future.set_exception(error)
+            return
+
+        for pending, conflict in conflicts:
+            pending.future.set_exception(conflict)
+        for pending, order, _ in accepted:
+            pending.future.set_result(order)
+        publish_seats(
+            TAKEN, [ticket for _, _, tickets in accepted for ticket in tickets]
+        )
+
+    def _taken_seats(self, batch):
+        return set(
+            Ticket.objects.using(self.using)
+            .filter(
+                movie_session_id__in={
+                    movie_session_id
+                    for pending in batch
+                    for movie_session_id, _, _ in pending.seats
+                }
+            )
+            .values_list("movie_session_id", "row", "seat")
+        )
+
+    def _write(self, batch):
+        taken = self._taken_seats(batch)
+
+        accepted = []
+        conflicts = []
+        for pending in batch:
+            seats = pending.seats
+            clashes = [
+                seat
+                for index, seat in enumerate(seats)
+                if seat in taken or seat in seats[:index]
+            ]
+            if clashes:
+                conflicts.append((pending, SeatConflict(clashes)))
+                continue
+            taken.update(seats)
+            accepted.append(pending)
+
+        orders = Order.objects.using(self.using).bulk_create(
+            Order(user_id=pending.user_id) for pending in accepted
+        )
+        tickets = [
+            [Ticket(order=order, **ticket) for ticket in pending.tickets]
+            for pending, order in zip(accepted, orders)
+        ]
+        Ticket.objects.using(self.using).bulk_create(
+            ticket for order_tickets in tickets for ticket in order_tickets
+        )
+
+        return list(zip(accepted, orders, tickets)), conflicts
+
+
+order_pipeline = OrderPipeline()
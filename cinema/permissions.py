@@ -2,12 +2,12 @@ from rest_framework.permissions import SAFE_METHODS, BasePermission
 
 
 class IsAdminOrIfAuthenticatedReadOnly(BasePermission):
+    """Reads only ``is_authenticated`` and ``is_staff`` of the principal"""
 
     def has_permission(self, request, view):
-        return bool(
-            request.method in SAFE_METHODS
-            and request.user
-            and request.user.is_authenticated
-        ) or (
-            request.user and request.user.is_staff
-        )
+        user = request.user
+
+        if not (user and user.is_authenticated):
+            return False
+
+        return request.method in SAFE_METHODS or user.is_staff
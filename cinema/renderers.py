@@ -0,0 +1,12 @@
+from rest_framework.renderers import JSONRenderer
+
+
+class ColumnarJSONRenderer(JSONRenderer):
+    """JSON for ``{"columns": [...], "rows": [[...], ...]}`` list bodies.
+
+    Picked with ``?format=columns`` or by accepting its media type on
+    views with ``ColumnarListMixin``.
+    """
+
+    media_type = "application/vnd.cinema.columns+json"
+    format = "columns"  # noqa: VNE003
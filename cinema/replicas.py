@@ -0,0 +1,181 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from itertools import cycle
+from threading import Lock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError
+from django.utils import timezone
+
+from cinema.models import ReplicaHeartbeat
+
+
+# apps whose reads always go to the primary: tokens, revocations and
+# accounts must be visible right after login, logout or registration
+PRIMARY_APPS = {"auth", "authtoken", "contenttypes", "sessions", "user"}
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_request = ContextVar("replica_request", default=None)
+
+
+def sticky_key(user_id):
+    return f"cinema:replica-sticky:{user_id}"
+
+
+@contextmanager
+def primary_reads():
+    """Send the reads made inside the block to the primary"""
+    token = _request.set(None)
+    try:
+        yield
+    finally:
+        _request.reset(token)
+
+
+def beat():
+    """Record on the primary that it was written to just now"""
+    ReplicaHeartbeat.objects.using(DEFAULT_DB_ALIAS).update_or_create(
+        pk=1, defaults={"beat_at": timezone.now()}
+    )
+
+
+def replica_lag(alias):
+    """How far ``alias`` trails the primary, ``None`` if unknown.
+
+    The primary heartbeat is refreshed continuously by the
+    ``replica_heartbeat`` command, so the age of the copy a replica
+    holds is how far behind it is.
+    """
+    try:
+        beat_at = (
+            ReplicaHeartbeat.objects.using(alias)
+            .filter(pk=1)
+            .values_list("beat_at", flat=True)
+            .first()
+        )
+    except DatabaseError:
+        return None
+
+    if beat_at is None:
+        return None
+    return max(timezone.now() - beat_at, timezone.timedelta(0))
+
+
+class ReplicaSet:
+    """The replicas that are currently close enough to the primary.
+
+    Lag is measured from the heartbeat row at most once per
+    ``REPLICA_LAG_CHECK_INTERVAL``; replicas further behind than
+    ``REPLICA_MAX_LAG``, or that cannot be reached, are skipped until
+    the next check. Healthy replicas are used in turn.
+    """
+
+    def __init__(self):
+        self._healthy = []
+        self._turns = cycle(())
+        self._checked_at = None
+        self._lock = Lock()
+
+    def choose(self):
+        """A replica alias to read from, ``None`` for the primary"""
+        with self._lock:
+            now = time.monotonic()
+            interval = settings.REPLICA_LAG_CHECK_INTERVAL.total_seconds()
+            if self._checked_at is None or now - self._checked_at > interval:
+                self._check()
+                self._checked_at = now
+
+            return next(self._turns, None)
+
+    def reset(self):
+        with self._lock:
+            self._checked_at = None
+
+    def _check(self):
+        self._healthy = []
+        for alias in settings.REPLICA_DATABASES:
+            lag = replica_lag(alias)
+            if lag is not None and lag <= settings.REPLICA_MAX_LAG:
+                self._healthy.append(alias)
+        self._turns = cycle(self._healthy)
+
+
+replicas = ReplicaSet()
+
+
+class ReplicaRouter:
+    """Send reads of safe-method requests to a replica.
+
+    Outside a request, for unsafe methods, for models of
+    ``PRIMARY_APPS`` and for users who wrote recently, reads stay on the
+    primary. Writes always go to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        request = _request.get()
+        if request is None or model._meta.app_label in PRIMARY_APPS:
+            return None
+
+        if not hasattr(request, "_replica_alias"):
+            request._replica_alias = self._alias_for(request)
+        return request._replica_alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.REPLICA_DATABASES
+
+    @staticmethod
+    def _alias_for(request):
+        if not settings.REPLICA_DATABASES:
+            return None
+
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            if cache.get(sticky_key(user.id)):
+                return None
+        return replicas.choose()
+
+
+class ReplicaMiddleware:
+    """Route safe-method requests to replicas, pin writers to the primary.
+
+    After a successful write by an authenticated user, that user reads
+    from the primary for ``REPLICA_STICKY_FOR`` so they see their own
+    orders straight away. The pin is kept in the default cache, so it
+    reaches the user's next request on another worker only when that
+    cache is shared, as the system checks require outside development.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method not in SAFE_METHODS:
+            response = self.get_response(request)
+            if response.status_code < 400:
+                self.pin(request)
+            return response
+
+        token = _request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            _request.reset(token)
+
+    @staticmethod
+    def pin(request):
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            cache.set(
+                sticky_key(user.id),
+                True,
+                settings.REPLICA_STICKY_FOR.total_seconds(),
+            )
@@ -0,0 +1,164 @@
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import F, Max
+
+from cinema.models import CinemaHall, Movie, MovieSession
+
+
+def session_end(show_time, duration):
+    return show_time + timedelta(minutes=duration)
+
+
+class HallSchedule:
+    """Sessions of one cinema hall kept sorted by start time.
+
+    A lookup bisects to the new start and walks outwards: forwards over
+    the sessions starting before its end, backwards over those that
+    started at most the longest stored session earlier. Stored sessions
+    may overlap each other, e.g. when added outside the API, so every
+    one in that range is checked rather than the nearest only.
+    """
+
+    def __init__(self):
+        self._starts = []
+        self._slots = []
+        self._longest = timedelta(0)
+
+    def __len__(self):
+        return len(self._starts)
+
+    def add(self, start, end, key=None):
+        index = bisect_left(self._starts, start)
+        self._starts.insert(index, start)
+        self._slots.insert(index, (end, key))
+        self._longest = max(self._longest, end - start)
+
+    def conflicts(self, start, end, exclude=None):
+        """Keys of the stored sessions overlapping ``[start, end)``"""
+        conflicting = []
+        index = bisect_left(self._starts, start)
+
+        for position in range(index - 1, -1, -1):
+            if self._starts[position] + self._longest <= start:
+                break
+            slot_end, key = self._slots[position]
+            if slot_end > start and key != exclude:
+                conflicting.append(key)
+        conflicting.reverse()
+
+        for position in range(index, len(self._starts)):
+            if self._starts[position] >= end:
+                break
+            slot_end, key = self._slots[position]
+            if key != exclude:
+                conflicting.append(key)
+
+        return conflicting
+
+
+def longest_movie_duration():
+    return Movie.objects.aggregate(longest=Max("duration"))["longest"] or 0
+
+
+def load_schedules(hall_ids, window_start, window_end, longest=None):
+    """Build schedules for ``hall_ids`` covering the given time window.
+
+    Only sessions that may reach into the window are read; the
+    lookup is served by the (cinema_hall, show_time) index.
+    """
+    if longest is None:
+        longest = longest_movie_duration()
+
+    schedules = defaultdict(HallSchedule)
+    sessions = MovieSession.objects.filter(
+        cinema_hall_id__in=hall_ids,
+        show_time__gt=window_start - timedelta(minutes=longest),
+        show_time__lt=window_end,
+    ).values_list("id", "cinema_hall_id", "show_time", "movie__duration")
+
+    for session_id, hall_id, show_time, duration in sessions:
+        schedules[hall_id].add(
+            show_time, session_end(show_time, duration), session_id
+        )
+
+    return schedules
+
+
+def lock_halls(hall_ids):
+    """Serialise schedule changes of ``hall_ids`` until the transaction ends.
+
+    The hall rows are locked on the primary, so two requests cannot
+    both find the same slot free and fill it. Backends without
+    ``SELECT ... FOR UPDATE`` get a no-op update instead, which takes
+    SQLite's write lock up front the same way.
+    """
+    halls = (
+        CinemaHall.objects.using(DEFAULT_DB_ALIAS)
+        .filter(pk__in=hall_ids)
+        .order_by("pk")
+    )
+    if connections[DEFAULT_DB_ALIAS].features.has_select_for_update:
+        list(halls.select_for_update().values_list("pk", flat=True))
+    else:
+        halls.update(name=F("name"))
+
+
+def find_conflicts(cinema_hall, movie, show_time, exclude=None):
+    """Ids of the sessions in ``cinema_hall`` overlapping a new one"""
+    end = session_end(show_time, movie.duration)
+    longest = max(longest_movie_duration(), movie.duration)
+    schedules = load_schedules([cinema_hall.id], show_time, end, longest)
+
+    return schedules[cinema_hall.id].conflicts(show_time, end, exclude)
+
+
+def validate_programme(sessions):
+    """Check a batch of new sessions against the stored ones and itself.
+
+    ``sessions`` is a list of dicts with ``movie``, ``cinema_hall`` and
+    ``show_time`` model values. Returns a list with an error message or
+    ``None`` for every entry, in the same order.
+    """
+    errors = [None] * len(sessions)
+    if not sessions:
+        return errors
+
+    intervals = [
+        (
+            attrs["show_time"],
+            session_end(attrs["show_time"], attrs["movie"].duration),
+        )
+        for attrs in sessions
+    ]
+    longest = max(
+        longest_movie_duration(),
+        max(attrs["movie"].duration for attrs in sessions),
+    )
+    schedules = load_schedules(
+        {attrs["cinema_hall"].id for attrs in sessions},
+        min(start for start, _ in intervals),
+        max(end for _, end in intervals),
+        longest,
+    )
+
+    for index, (attrs, (start, end)) in enumerate(zip(sessions, intervals)):
+        schedule = schedules[attrs["cinema_hall"].id]
+        conflicting = schedule.conflicts(start, end)
+        if conflicting:
+            errors[index] = overlap_message(conflicting)
+            continue
+        schedule.add(start, end, ("item", index))
+
+    return errors
+
+
+def overlap_message(conflicting):
+    described = ", ".join(
+        f"programme item {key[1]}" if isinstance(key, tuple)
+        else f"session {key}"
+        for key in conflicting
+    )
+    return f"Session overlaps with {described} in this cinema hall."
@@ -0,0 +1,321 @@
+import asyncio
+import json
+import re
+import threading
+from functools import lru_cache
+from io import BytesIO
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signals
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.module_loading import import_string
+
+from cinema.models import MovieSession, Ticket
+
+TAKEN = "taken"
+RELEASED = "released"
+
+# undelivered events a subscriber may fall behind by
+SUBSCRIBER_BACKLOG = 1000
+
+# bytes of one message through the seat_events_broker, larger ones drop
+# the connection
+MAX_BROKER_MESSAGE = 1024 * 1024
+
+
+class Subscription:
+    """Events of one movie session for one client, on its event loop"""
+
+    def __init__(self, movie_session_id):
+        self.movie_session_id = movie_session_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(SUBSCRIBER_BACKLOG)
+
+    def offer(self, event):
+        # runs on the subscriber's loop
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # a client this far behind starts over from a new snapshot
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+    async def get(self):
+        """The next event, ``None`` once the client has fallen behind"""
+        return await self.queue.get()
+
+
+class LocalSeatEvents:
+    """In-process pub/sub of seat map changes per movie session.
+
+    Publishing is safe from any thread; subscribers receive events on
+    their own event loop. Only subscribers of this process are reached.
+    """
+
+    def __init__(self):
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, movie_session_id):
+        subscription = Subscription(movie_session_id)
+        with self._lock:
+            self._subscriptions.setdefault(movie_session_id, set()).add(
+                subscription
+            )
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(
+                subscription.movie_session_id, set()
+            )
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self._subscriptions.pop(subscription.movie_session_id, None)
+
+    def publish(self, movie_session_id, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(movie_session_id, ()))
+        for subscription in subscriptions:
+            subscription.loop.call_soon_threadsafe(subscription.offer, event)
+
+
+class BrokerSeatEvents(LocalSeatEvents):
+    """Pub/sub across worker processes through ``seat_events_broker``.
+
+    Events are sent to the broker, which relays them to every connected
+    process, this one included; a listener thread hands them to the
+    local subscribers. While the broker is unreachable events only reach
+    the subscribers of the publishing process. Messages are JSON, never
+    pickles, so a peer can send data but not code.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._connection = None
+        self._connect_lock = threading.Lock()
+        self._send_lock = threading.Lock()
+
+    def subscribe(self, movie_session_id):
+        try:
+            self._connect()
+        except OSError:
+            pass
+        return super().subscribe(movie_session_id)
+
+    def publish(self, movie_session_id, event):
+        try:
+            connection = self._connect()
+            with self._send_lock:
+                connection.send_bytes(
+                    json.dumps([movie_session_id, event]).encode()
+                )
+        except OSError:
+            self._connection = None
+            super().publish(movie_session_id, event)
+
+    def _connect(self):
+        from multiprocessing.connection import Client
+
+        with self._connect_lock:
+            if self._connection is None:
+                connection = Client(
+                    settings.SEAT_EVENTS_BROKER,
+                    authkey=settings.SEAT_EVENTS_BROKER_KEY.encode(),
+                )
+                threading.Thread(
+                    target=self._listen, args=(connection,), daemon=True
+                ).start()
+                self._connection = connection
+            return self._connection
+
+    def _listen(self, connection):
+        try:
+            while True:
+                message = connection.recv_bytes(MAX_BROKER_MESSAGE)
+                try:
+                    movie_session_id, event = json.loads(message)
+                except ValueError:
+                    continue
+                LocalSeatEvents.publish(self, movie_session_id, event)
+        except (EOFError, OSError):
+            with self._connect_lock:
+                if self._connection is connection:
+                    self._connection = None
+
+
+@lru_cache(maxsize=None)
+def _backend(path):
+    return import_string(path)()
+
+
+def seat_events():
+    """The ``SEAT_EVENTS_BACKEND`` of this process"""
+    return _backend(settings.SEAT_EVENTS_BACKEND)
+
+
+def publish_seats(action, tickets):
+    """Announce seats of ``tickets`` as taken or released, per session"""
+    seats = {}
+    for ticket in tickets:
+        seats.setdefault(ticket.movie_session_id, []).append(
+            [ticket.row, ticket.seat]
+        )
+    for movie_session_id, session_seats in seats.items():
+        seat_events().publish(
+            movie_session_id, {"type": action, "seats": session_seats}
+        )
+
+
+def server_sent_event(name, data):
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+def open_stream(scope, movie_session_id):
+    """Authenticate the client and read the seats taken so far.
+
+    Returns the status code and, on success, the taken seats or else
+    the error body.
+    """
+    # the publishing side is loaded with the signal receivers at start-up
+    from django.core.handlers.asgi import ASGIRequest
+    from rest_framework.exceptions import APIException, NotAuthenticated
+    from rest_framework.request import Request
+    from rest_framework.settings import api_settings
+
+    signals.request_started.send(sender=SeatEventsApplication, scope=scope)
+    try:
+        request = Request(
+            ASGIRequest(scope, BytesIO()),
+            authenticators=[
+                authentication()
+                for authentication in (
+                    api_settings.DEFAULT_AUTHENTICATION_CLASSES
+                )
+            ],
+        )
+        try:
+            if not request.user.is_authenticated:
+                raise NotAuthenticated()
+        except APIException as error:
+            return error.status_code, {"detail": str(error.detail)}
+
+        # the snapshot must not miss seats a lagging replica lacks
+        if not MovieSession.objects.using(DEFAULT_DB_ALIAS).filter(
+            pk=movie_session_id
+        ).exists():
+            return 404, {"detail": "Not found."}
+        return 200, [
+            list(seat)
+            for seat in Ticket.objects.using(DEFAULT_DB_ALIAS)
+            .filter(movie_session_id=movie_session_id)
+            .values_list("row", "seat")
+        ]
+    finally:
+        signals.request_finished.send(sender=SeatEventsApplication)
+
+
+class SeatEventsApplication:
+    """Serve seat map Server-Sent Events, pass everything else on.
+
+    ``GET .../movie_sessions/<id>/seat_events/`` opens a stream that
+    starts with a ``snapshot`` of the taken seats, followed by ``taken``
+    and ``released`` deltas as orders are placed and cancelled. Streams
+    are held open on the event loop, not in a worker thread.
+    """
+
+    def __init__(self, application):
+        self.application = application
+        self.path = re.compile(
+            rf"^{re.escape(settings.API_PATH_PREFIX)}"
+            r"cinema/movie_sessions/(?P<pk>\d+)/seat_events/$"
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] == "GET":
+            match = self.path.match(scope["path"])
+            if match:
+                return await self.stream(
+                    int(match["pk"]), scope, receive, send
+                )
+        return await self.application(scope, receive, send)
+
+    async def stream(self, movie_session_id, scope, receive, send):
+        # subscribed before the snapshot is read, so no change falls in
+        # between; a repeated delta is harmless to apply twice
+        subscription = seat_events().subscribe(movie_session_id)
+        try:
+            status, body = await sync_to_async(open_stream)(
+                scope, movie_session_id
+            )
+            if status != 200:
+                await self.send_json(send, status, body)
+                return
+
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/event-stream"),
+                    (b"cache-control", b"no-cache"),
+                    (b"x-accel-buffering", b"no"),
+                ],
+            })
+            await self.send_body(
+                send,
+                b"retry: 3000\n"
+                + server_sent_event("snapshot", {"taken": body}),
+            )
+
+            tasks = [
+                asyncio.ensure_future(self.forward(subscription, send)),
+                asyncio.ensure_future(self.wait_for_disconnect(receive)),
+            ]
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in tasks:
+                task.cancel()
+            await send({"type": "http.response.body", "body": b""})
+        except OSError:
+            # the client went away mid-send
+            pass
+        finally:
+            seat_events().unsubscribe(subscription)
+
+    async def forward(self, subscription, send):
+        keepalive = settings.SEAT_EVENTS_KEEPALIVE.total_seconds()
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), keepalive)
+            except asyncio.TimeoutError:
+                await self.send_body(send, b": keepalive\n\n")
+                continue
+            if event is None:
+                return
+            await self.send_body(
+                send, server_sent_event(event["type"], event["seats"])
+            )
+
+    @staticmethod
+    async def wait_for_disconnect(receive):
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+    @staticmethod
+    async def send_body(send, body):
+        await send(
+            {"type": "http.response.body", "body": body, "more_body": True}
+        )
+
+    @staticmethod
+    async def send_json(send, status, data):
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json")],
+        })
+        await send({
+            "type": "http.response.body",
+            "body": json.dumps(data).encode(),
+        })
@@ -1,5 +1,7 @@
+from django.conf import settings
 from django.db import transaction
-from rest_framework import serializers
+from rest_framework import exceptions, serializers, status
+from rest_framework.settings import api_settings
 
 from cinema.models import (
     Genre,
@@ -10,27 +12,91 @@ from cinema.models import (
     Ticket,
     Order,
 )
+from cinema.scheduling import (
+    find_conflicts,
+    lock_halls,
+    overlap_message,
+)
+from cinema.seat_events import TAKEN, publish_seats
+
+
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Looks related objects up in the ones preloaded for a bulk payload"""
+
+    def to_internal_value(self, data):
+        preloaded = self.context.get("preloaded", {})
+        model = self.get_queryset().model
+
+        if model not in preloaded:
+            return super().to_internal_value(data)
+
+        try:
+            if isinstance(data, bool):
+                raise TypeError
+            return preloaded[model][int(data)]
+        except KeyError:
+            self.fail("does_not_exist", pk_value=data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+
+class SparseFieldsSerializer(serializers.ModelSerializer):
+    """Takes ``fields=`` to serialize only some of the declared fields.
 
+    ``field_columns`` names the model fields read by serializer fields
+    that are not model fields of the same name, so that a view can load
+    only what the kept fields need.
+    """
 
-class GenreSerializer(serializers.ModelSerializer):
+    field_columns = {}
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def read_columns(cls, fields):
+        """Model fields to load with ``only()`` to serialize ``fields``"""
+        model_fields = {
+            field.name for field in cls.Meta.model._meta.concrete_fields
+        }
+        columns = []
+        for name in fields:
+            if name in cls.field_columns:
+                columns.extend(cls.field_columns[name])
+            elif name in model_fields:
+                columns.append(name)
+        return columns
+
+
+class GenreSerializer(SparseFieldsSerializer):
     class Meta:
         model = Genre
         fields = ("id", "name")
 
 
-class ActorSerializer(serializers.ModelSerializer):
+class ActorSerializer(SparseFieldsSerializer):
+    field_columns = {"full_name": ("first_name", "last_name")}
+
     class Meta:
         model = Actor
         fields = ("id", "first_name", "last_name", "full_name")
 
 
-class CinemaHallSerializer(serializers.ModelSerializer):
+class CinemaHallSerializer(SparseFieldsSerializer):
+    field_columns = {"capacity": ("rows", "seats_in_row")}
+
     class Meta:
         model = CinemaHall
         fields = ("id", "name", "rows", "seats_in_row", "capacity")
 
 
-class MovieSerializer(serializers.ModelSerializer):
+class MovieSerializer(SparseFieldsSerializer):
+    serializer_related_field = PreloadedPrimaryKeyRelatedField
+
     class Meta:
         model = Movie
         fields = ("id", "title", "description", "duration", "genres", "actors")
@@ -54,7 +120,53 @@ class MovieDetailSerializer(MovieSerializer):
         fields = ("id", "title", "description", "duration", "genres", "actors")
 
 
-class MovieSessionSerializer(serializers.ModelSerializer):
+class MovieSessionSerializer(SparseFieldsSerializer):
+    serializer_related_field = PreloadedPrimaryKeyRelatedField
+
+    def create(self, validated_data):
+        with transaction.atomic():
+            self.check_schedule(validated_data)
+            return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        with transaction.atomic():
+            self.check_schedule(validated_data)
+            return super().update(instance, validated_data)
+
+    def check_schedule(self, attrs):
+        """Refuse a session overlapping another one in its cinema hall.
+
+        Runs in the transaction that saves the session, with the hall
+        locked, so a concurrent request cannot take the slot between
+        the check and the insert.
+        """
+        # a whole programme is checked in one pass by the view
+        if self.context.get("bulk"):
+            return
+
+        movie = attrs.get("movie", getattr(self.instance, "movie", None))
+        cinema_hall = attrs.get(
+            "cinema_hall", getattr(self.instance, "cinema_hall", None)
+        )
+        show_time = attrs.get(
+            "show_time", getattr(self.instance, "show_time", None)
+        )
+        lock_halls([cinema_hall.id])
+        conflicts = find_conflicts(
+            cinema_hall,
+            movie,
+            show_time,
+            exclude=getattr(self.instance, "pk", None),
+        )
+        if conflicts:
+            raise serializers.ValidationError(
+                {
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        overlap_message(conflicts)
+                    ]
+                }
+            )
+
     class Meta:
         model = MovieSession
         fields = ("id", "show_time", "movie", "cinema_hall")
@@ -70,6 +182,15 @@ class MovieSessionListSerializer(MovieSessionSerializer):
     )
     tickets_available = serializers.IntegerField(read_only=True)
 
+    field_columns = {
+        "movie_title": ("movie__title",),
+        "cinema_hall_name": ("cinema_hall__name",),
+        "cinema_hall_capacity": (
+            "cinema_hall__rows",
+            "cinema_hall__seats_in_row",
+        ),
+    }
+
     class Meta:
         model = MovieSession
         fields = (
@@ -86,7 +207,16 @@ class TicketSerializer(serializers.ModelSerializer):
     def validate(self, attrs):
         data = super(TicketSerializer, self).validate(attrs=attrs)
         Ticket.validate_ticket(
-            attrs["row"], attrs["seat"], attrs["movie_session"]
+            attrs["row"],
+            attrs["seat"],
+            attrs["movie_session"].cinema_hall,
+            serializers.ValidationError,
+        )
+        Ticket.validate_not_archived(
+            attrs["movie_session"],
+            attrs["row"],
+            attrs["seat"],
+            serializers.ValidationError,
         )
         return data
 
@@ -117,6 +247,17 @@ class MovieSessionDetailSerializer(MovieSessionSerializer):
         fields = ("id", "show_time", "movie", "cinema_hall", "taken_places")
 
 
+class OrderNotPlaced(exceptions.APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = (
+        "The order was not placed in time and was withdrawn; retry it, "
+        "with the same Idempotency-Key if one was sent."
+    )
+    default_code = "order_not_placed"
+    # seconds for Retry-After
+    wait = 1
+
+
 class OrderSerializer(serializers.ModelSerializer):
     tickets = TicketSerializer(many=True, read_only=False, allow_empty=False)
 
@@ -125,11 +266,30 @@ class OrderSerializer(serializers.ModelSerializer):
         fields = ("id", "tickets", "created_at")
 
     def create(self, validated_data):
+        if settings.ORDER_PIPELINE:
+            from cinema.order_pipeline import (
+                OrderTimeout,
+                SeatConflict,
+                order_pipeline,
+            )
+
+            try:
+                return order_pipeline.submit(
+                    validated_data["user_id"], validated_data["tickets"]
+                )
+            except SeatConflict as conflict:
+                raise serializers.ValidationError({"tickets": [str(conflict)]})
+            except OrderTimeout:
+                raise OrderNotPlaced()
+
         with transaction.atomic():
             tickets_data = validated_data.pop("tickets")
             order = Order.objects.create(**validated_data)
-            for ticket_data in tickets_data:
+            tickets = [
                 Ticket.objects.create(order=order, **ticket_data)
+                for ticket_data in tickets_data
+            ]
+            transaction.on_commit(lambda: publish_seats(TAKEN, tickets))
             return order
 
 
@@ -0,0 +1,150 @@
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver, Signal
+
+from cinema.models import Actor, CatalogueChange, Genre, Movie
+from cinema.movie_index import actor_index, genre_index
+from cinema.sync import log_changes
+
+
+# sent with the ``instances`` inserted with bulk_create and the
+# ``links`` (through model -> list of pk pairs) added for them
+bulk_created = Signal()
+
+INDEXES = {
+    Movie.genres.through: genre_index,
+    Movie.actors.through: actor_index,
+}
+
+MOVIE_LINKS = {
+    Movie.genres.through: "genre",
+    Movie.actors.through: "actor",
+}
+
+SYNCED_TYPES = {
+    Genre: "genre",
+    Actor: "actor",
+    Movie: "movie",
+}
+
+
+@receiver(m2m_changed, sender=Movie.genres.through)
+@receiver(m2m_changed, sender=Movie.actors.through)
+def update_movie_index(sender, instance, action, reverse, pk_set, **kwargs):
+    index = INDEXES[sender]
+
+    if action == "post_clear":
+        transaction.on_commit(index.invalidate)
+        return
+    if action not in ("post_add", "post_remove"):
+        return
+
+    if reverse:
+        links = [(movie_id, instance.pk) for movie_id in pk_set]
+    else:
+        links = [(instance.pk, related_id) for related_id in pk_set]
+    operation = index.add if action == "post_add" else index.remove
+    transaction.on_commit(lambda: operation(links))
+
+
+@receiver(post_delete, sender=Movie)
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Actor)
+def drop_movie_index(sender, **kwargs):
+    if sender in (Movie, Genre):
+        transaction.on_commit(genre_index.invalidate)
+    if sender in (Movie, Actor):
+        transaction.on_commit(actor_index.invalidate)
+
+
+def linked_movie_ids(through, related_name, related_id):
+    return list(
+        through.objects.filter(
+            **{f"{related_name}_id": related_id}
+        ).values_list("movie_id", flat=True)
+    )
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Actor)
+@receiver(post_save, sender=Movie)
+def log_saved(sender, instance, created, **kwargs):
+    object_type = SYNCED_TYPES[sender]
+    log_changes(
+        object_type,
+        [instance.pk],
+        CatalogueChange.CREATED if created else CatalogueChange.UPDATED,
+    )
+
+    # movies list genre and actor names, so a rename changes them too
+    if not created and sender is not Movie:
+        through = getattr(Movie, f"{object_type}s").through
+        log_changes(
+            "movie",
+            linked_movie_ids(through, object_type, instance.pk),
+            CatalogueChange.UPDATED,
+        )
+
+
+@receiver(pre_delete, sender=Genre)
+@receiver(pre_delete, sender=Actor)
+def log_unlinked_movies(sender, instance, **kwargs):
+    object_type = SYNCED_TYPES[sender]
+    through = getattr(Movie, f"{object_type}s").through
+    log_changes(
+        "movie",
+        linked_movie_ids(through, object_type, instance.pk),
+        CatalogueChange.UPDATED,
+    )
+
+
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Actor)
+@receiver(post_delete, sender=Movie)
+def log_deleted(sender, instance, **kwargs):
+    log_changes(
+        SYNCED_TYPES[sender], [instance.pk], CatalogueChange.DELETED
+    )
+
+
+@receiver(m2m_changed, sender=Movie.genres.through)
+@receiver(m2m_changed, sender=Movie.actors.through)
+def log_relinked(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            log_changes("movie", [instance.pk], CatalogueChange.UPDATED)
+        return
+
+    if action == "pre_clear":
+        movie_ids = linked_movie_ids(
+            sender, MOVIE_LINKS[sender], instance.pk
+        )
+    elif action in ("post_add", "post_remove"):
+        movie_ids = pk_set
+    else:
+        return
+    log_changes("movie", movie_ids, CatalogueChange.UPDATED)
+
+
+@receiver(bulk_created)
+def update_movie_index_in_bulk(sender, links, **kwargs):
+    for through, pairs in links.items():
+        if through in INDEXES and pairs:
+            transaction.on_commit(
+                lambda index=INDEXES[through], pairs=pairs: index.add(pairs)
+            )
+
+
+@receiver(bulk_created)
+def log_bulk_created(sender, instances, **kwargs):
+    if sender in SYNCED_TYPES:
+        log_changes(
+            SYNCED_TYPES[sender],
+            [instance.pk for instance in instances],
+            CatalogueChange.CREATED,
+        )
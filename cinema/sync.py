@@ -0,0 +1,87 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from cinema.models import Actor, CatalogueChange, Genre, Movie
+
+SYNC_PAGE_SIZE = 500
+
+CATALOGUE_GENERATION_KEY = "cinema:catalogue-generation"
+
+# serializers are named rather than imported: the change log receivers
+# import this module while the apps load, long before the first request
+SYNCED_MODELS = {
+    "genre": (Genre.objects.all(), "cinema.serializers.GenreSerializer"),
+    "actor": (Actor.objects.all(), "cinema.serializers.ActorSerializer"),
+    "movie": (
+        Movie.objects.prefetch_related("genres", "actors"),
+        "cinema.serializers.MovieListSerializer",
+    ),
+}
+
+
+def catalogue_generation():
+    """Counter bumped whenever a catalogue change is committed"""
+    return cache.get(CATALOGUE_GENERATION_KEY, 0)
+
+
+def bump_catalogue_generation():
+    cache.add(CATALOGUE_GENERATION_KEY, 0, timeout=None)
+    cache.incr(CATALOGUE_GENERATION_KEY)
+
+
+def log_changes(object_type, object_ids, action):
+    CatalogueChange.objects.bulk_create(
+        CatalogueChange(
+            object_type=object_type, object_id=object_id, action=action
+        )
+        for object_id in object_ids
+    )
+    transaction.on_commit(bump_catalogue_generation)
+
+
+def changes_since(cursor, limit=SYNC_PAGE_SIZE):
+    """Objects changed after ``cursor``, collapsed to their last state.
+
+    Returns the new cursor, whether more changes are pending and, per
+    object type, the serialized upserted objects and the deleted ids.
+    """
+    changes = list(
+        CatalogueChange.objects.filter(id__gt=cursor).values_list(
+            "id", "object_type", "object_id", "action"
+        )[: limit + 1]
+    )
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    last_actions = {}
+    for _, object_type, object_id, action in changes:
+        last_actions[object_type, object_id] = action
+
+    feed = {}
+    for object_type, (queryset, serializer_path) in SYNCED_MODELS.items():
+        upserted = sorted(
+            object_id
+            for (changed_type, object_id), action in last_actions.items()
+            if changed_type == object_type
+            and action != CatalogueChange.DELETED
+        )
+        deleted = sorted(
+            object_id
+            for (changed_type, object_id), action in last_actions.items()
+            if changed_type == object_type
+            and action == CatalogueChange.DELETED
+        )
+        instances = queryset.filter(pk__in=upserted) if upserted else []
+        feed[f"{object_type}s"] = {
+            "upserted": import_string(serializer_path)(
+                instances, many=True
+            ).data,
+            "deleted": deleted,
+        }
+
+    return {
+        "cursor": changes[-1][0] if changes else cursor,
+        "has_more": has_more,
+        **feed,
+    }
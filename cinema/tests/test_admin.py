@@ -0,0 +1,130 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from cinema.admin import EstimatedCountPaginator
+from cinema.models import Order, Ticket
+from cinema.tests.test_movie_session_api import sample_movie_session
+from user.tests.test_user_api import create_user
+
+TICKET_CHANGELIST_URL = reverse("admin:cinema_ticket_changelist")
+
+
+class TicketAdminTests(TestCase):
+    def setUp(self):
+        self.admin = create_user(
+            username="admin",
+            password="testpass",
+            is_staff=True,
+            is_superuser=True,
+        )
+        self.client.force_login(self.admin)
+        self.movie_session = sample_movie_session()
+        self.order = Order.objects.create(user=self.admin)
+
+    def add_tickets(self, count, start=1):
+        Ticket.objects.bulk_create(
+            Ticket(
+                movie_session=self.movie_session,
+                order=self.order,
+                row=1,
+                seat=seat,
+            )
+            for seat in range(start, start + count)
+        )
+
+    def changelist_queries(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(TICKET_CHANGELIST_URL, params)
+        self.assertEqual(res.status_code, 200)
+        return len(queries), res
+
+    def test_queries_do_not_grow_with_rows(self):
+        self.add_tickets(2)
+        self.changelist_queries()
+        few, _ = self.changelist_queries()
+
+        self.add_tickets(10, start=3)
+        many, _ = self.changelist_queries()
+
+        self.assertEqual(few, many)
+
+    def test_search_by_exact_id(self):
+        self.add_tickets(3)
+        ticket = Ticket.objects.exclude(
+            id__in=[self.order.id, self.movie_session.id]
+        ).first()
+
+        _, res = self.changelist_queries(q=str(ticket.id))
+        self.assertEqual(list(res.context["cl"].result_list), [ticket])
+
+        _, res = self.changelist_queries(q="Inception")
+        self.assertEqual(list(res.context["cl"].result_list), [])
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    def setUp(self):
+        user = create_user(username="user", password="testpass")
+        Order.objects.bulk_create(Order(user=user) for _ in range(5))
+        Order.objects.filter(
+            id__in=Order.objects.order_by("id").values("id")[:2]
+        ).delete()
+
+    def paginator(self, queryset, count_limit):
+        paginator = EstimatedCountPaginator(queryset, 2)
+        paginator.count_limit = count_limit
+        return paginator
+
+    def analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {Order._meta.db_table}")
+
+    def test_estimates_large_unfiltered_table(self):
+        self.analyze()
+        paginator = self.paginator(Order.objects.all(), count_limit=2)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(paginator.count, 3)
+
+    def test_estimate_is_not_thrown_off_by_deleted_rows(self):
+        self.analyze()
+        Order.objects.bulk_create(
+            Order(user=Order.objects.first().user) for _ in range(5)
+        )
+        Order.objects.filter(
+            id__in=Order.objects.order_by("-id").values("id")[:5]
+        ).delete()
+        paginator = self.paginator(Order.objects.all(), count_limit=2)
+
+        self.assertEqual(paginator.count, 3)
+
+    def test_counts_up_to_the_limit_without_statistics(self):
+        paginator = self.paginator(Order.objects.all(), count_limit=2)
+
+        self.assertEqual(paginator.count, 2)
+
+    def test_exact_count_of_small_table(self):
+        paginator = self.paginator(Order.objects.all(), count_limit=100)
+
+        self.assertEqual(paginator.count, 3)
+
+    def test_filtered_count_is_capped(self):
+        paginator = self.paginator(
+            Order.objects.filter(user__username="user"), count_limit=2
+        )
+
+        self.assertEqual(paginator.count, 2)
+
+
+class BenchmarkAdminCommandTests(TestCase):
+    def test_reports_both_admins(self):
+        out = StringIO()
+
+        call_command("benchmark_admin", tickets=20, stdout=out)
+
+        self.assertIn("default", out.getvalue())
+        self.assertIn("TicketAdmin", out.getvalue())
@@ -0,0 +1,213 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from cinema.archive import archive_orders
+from cinema.models import (
+    ArchivedOrder,
+    ArchivedTicket,
+    MovieSession,
+    Order,
+    Ticket,
+)
+from cinema.seat_events import seat_events
+from cinema.tests.test_movie_session_api import sample_movie_session
+from user.tests.test_user_api import create_user
+
+ORDER_URL = reverse("cinema:order-list")
+
+
+class ArchiveTestCase(TestCase):
+    def setUp(self):
+        self.user = create_user(username="user", password="testpass")
+        self.now = timezone.now()
+        self.past_session = sample_movie_session(
+            show_time=self.now - timedelta(days=60)
+        )
+        self.future_session = MovieSession.objects.create(
+            movie=self.past_session.movie,
+            cinema_hall=self.past_session.cinema_hall,
+            show_time=self.now + timedelta(days=1),
+        )
+
+    def order(self, *tickets, created_at=None):
+        order = Order.objects.create(user=self.user)
+        for movie_session, seat in tickets:
+            order.tickets.create(movie_session=movie_session, row=1, seat=seat)
+        if created_at:
+            Order.objects.filter(pk=order.pk).update(created_at=created_at)
+        return order
+
+    def archive(self):
+        cutoff = self.now - timedelta(days=30)
+        return list(archive_orders(cutoff, batch_size=10))
+
+
+@override_settings(
+    SEAT_EVENTS_BACKEND="cinema.tests.test_seat_events.RecordingSeatEvents"
+)
+class ArchiveOrdersTests(ArchiveTestCase):
+    def test_moves_orders_of_past_sessions_only(self):
+        past = self.order((self.past_session, 1), (self.past_session, 2))
+        mixed = self.order((self.past_session, 3), (self.future_session, 1))
+        upcoming = self.order((self.future_session, 2))
+        ticket_ids = set(past.tickets.values_list("id", flat=True))
+        seat_events().published.clear()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            batches = self.archive()
+
+        self.assertEqual(batches, [(1, 2)])
+        self.assertEqual(
+            set(Order.objects.values_list("id", flat=True)),
+            {mixed.id, upcoming.id},
+        )
+        archived = ArchivedOrder.objects.get()
+        self.assertEqual(
+            (archived.id, archived.created_at, archived.user_id),
+            (past.id, past.created_at, self.user.id),
+        )
+        self.assertEqual(
+            set(archived.tickets.values_list("id", flat=True)), ticket_ids
+        )
+        self.assertEqual(Ticket.objects.count(), 3)
+        # archived seats are not released
+        self.assertEqual(seat_events().published, [])
+
+    def test_resumes_where_a_limited_run_stopped(self):
+        for seat in range(1, 4):
+            self.order((self.past_session, seat))
+        cutoff = self.now - timedelta(days=30)
+
+        first = list(archive_orders(cutoff, batch_size=1, max_batches=1))
+        rest = list(archive_orders(cutoff, batch_size=1))
+
+        self.assertEqual(first, [(1, 1)])
+        self.assertEqual(rest, [(1, 1), (1, 1)])
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(ArchivedTicket.objects.count(), 3)
+
+    def test_command(self):
+        self.order((self.past_session, 1))
+        self.order((self.past_session, 2))
+        out = StringIO()
+
+        call_command("archive_orders", batch_size=1, stdout=out)
+
+        self.assertIn("archived 2 orders and 2 tickets", out.getvalue())
+        self.assertEqual(ArchivedOrder.objects.count(), 2)
+
+    def test_upcoming_sessions_stay_hot_whatever_the_cutoff(self):
+        upcoming = self.order((self.future_session, 1))
+
+        list(archive_orders(self.now + timedelta(days=2), batch_size=10))
+
+        self.assertEqual(list(Order.objects.all()), [upcoming])
+        self.assertFalse(ArchivedOrder.objects.exists())
+
+    def test_command_rejects_a_future_cutoff(self):
+        with self.assertRaisesMessage(CommandError, "in the future"):
+            call_command(
+                "archive_orders",
+                before=(self.now + timedelta(days=2)).isoformat(),
+            )
+
+    def test_archived_seats_cannot_be_sold_again(self):
+        self.order((self.past_session, 1))
+        self.archive()
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        def order_seat(seat):
+            return client.post(
+                ORDER_URL,
+                {
+                    "tickets": [
+                        {
+                            "row": 1,
+                            "seat": seat,
+                            "movie_session": self.past_session.id,
+                        }
+                    ]
+                },
+                format="json",
+            )
+
+        self.assertEqual(
+            order_seat(1).status_code, status.HTTP_400_BAD_REQUEST
+        )
+        self.assertEqual(order_seat(2).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            list(Ticket.objects.values_list("seat", flat=True)), [2]
+        )
+
+    def test_saving_an_archived_seat_is_refused(self):
+        self.order((self.past_session, 1))
+        self.archive()
+
+        with self.assertRaises(ValidationError):
+            self.order((self.past_session, 1))
+
+
+class OrderHistoryTests(ArchiveTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.archived = self.order(
+            (self.past_session, 5), created_at=self.now - timedelta(days=61)
+        )
+        self.archive()
+        self.hot = self.order((self.future_session, 6))
+
+    def test_history_merges_hot_and_archived_orders(self):
+        res = self.client.get(ORDER_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["count"], 2)
+        self.assertEqual(
+            [
+                (order["id"], order["tickets"][0]["seat"])
+                for order in res.data["results"]
+            ],
+            [(self.hot.id, 6), (self.archived.id, 5)],
+        )
+        self.assertEqual(
+            res.data["results"][1]["tickets"][0]["movie_session"]["id"],
+            self.past_session.id,
+        )
+
+    def test_pages_span_both_tables(self):
+        res = self.client.get(ORDER_URL, {"page_size": 1, "page": 2})
+
+        self.assertEqual(
+            [order["id"] for order in res.data["results"]],
+            [self.archived.id],
+        )
+
+    def test_columnar_history(self):
+        res = self.client.get(ORDER_URL, {"format": "columns"})
+
+        table = res.json()["results"]
+        rows = [dict(zip(table["columns"], row)) for row in table["rows"]]
+        self.assertEqual(
+            [(row["id"], row["seat"]) for row in rows],
+            [(self.hot.id, 6), (self.archived.id, 5)],
+        )
+
+    def test_other_users_archive_is_hidden(self):
+        other = APIClient()
+        other.force_authenticate(
+            create_user(username="other", password="testpass")
+        )
+
+        res = other.get(ORDER_URL)
+
+        self.assertEqual(res.data["count"], 0)
@@ -0,0 +1,65 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from user.tests.test_user_api import create_user
+
+GENRE_URL = reverse("cinema:genre-list")
+ADMIN_LOGIN_URL = reverse("admin:login")
+
+
+class BrowserMiddlewareTests(TestCase):
+    def test_api_skips_browser_middleware(self):
+        client = APIClient()
+        client.force_authenticate(
+            create_user(username="user", password="testpass")
+        )
+
+        res = client.get(GENRE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(hasattr(res.wsgi_request, "session"))
+        self.assertNotIn("X-Frame-Options", res)
+
+    def test_admin_keeps_browser_middleware(self):
+        res = self.client.get(ADMIN_LOGIN_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(hasattr(res.wsgi_request, "session"))
+        self.assertEqual(res["X-Frame-Options"], "DENY")
+        self.assertIn("csrftoken", res.cookies)
+
+    def test_admin_enforces_csrf(self):
+        client = Client(enforce_csrf_checks=True)
+
+        res = client.post(
+            ADMIN_LOGIN_URL, {"username": "admin", "password": "x"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_admin_login(self):
+        create_user(username="admin", password="testpass", is_staff=True)
+
+        self.assertTrue(
+            self.client.login(username="admin", password="testpass")
+        )
+        res = self.client.get(reverse("admin:index"))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+
+class BenchmarkMiddlewareCommandTests(TestCase):
+    def test_reports_saving(self):
+        out = StringIO()
+
+        call_command(
+            "benchmark_middleware", requests=10, rounds=2, stdout=out
+        )
+
+        self.assertIn("saved", out.getvalue())
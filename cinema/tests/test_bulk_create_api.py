@@ -0,0 +1,161 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from cinema.models import Genre, Actor, CinemaHall, Movie, MovieSession
+from cinema.tests.test_actor_api import sample_actor
+from cinema.tests.test_cinema_hall_api import sample_cinema_hall
+from cinema.tests.test_movie_api import sample_movie
+from user.tests.test_user_api import create_user
+
+GENRE_URL = reverse("cinema:genre-list")
+ACTOR_URL = reverse("cinema:actor-list")
+CINEMA_HALL_URL = reverse("cinema:cinemahall-list")
+MOVIE_URL = reverse("cinema:movie-list")
+MOVIE_SESSION_URL = reverse("cinema:moviesession-list")
+
+
+class PrivateBulkCreateApiTests(TestCase):
+    def setUp(self):
+        self.user = create_user(username="user", password="testpass")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_bulk_create_forbidden(self):
+        response = self.client.post(
+            GENRE_URL, [{"name": "Drama"}], format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class AdminBulkCreateApiTests(TestCase):
+    def setUp(self):
+        self.user = create_user(
+            username="test_admin", password="testpass", is_staff=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_bulk_create_genres(self):
+        payload = [{"name": "Drama"}, {"name": "Comedy"}]
+
+        response = self.client.post(GENRE_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [genre["name"] for genre in response.data], ["Drama", "Comedy"]
+        )
+        self.assertEqual(Genre.objects.count(), 2)
+
+    def test_bulk_create_actors_and_cinema_halls(self):
+        response = self.client.post(
+            ACTOR_URL,
+            [
+                {"first_name": "Tom", "last_name": "Hanks"},
+                {"first_name": "Meg", "last_name": "Ryan"},
+            ],
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data[1]["full_name"], "Meg Ryan")
+
+        response = self.client.post(
+            CINEMA_HALL_URL,
+            [{"name": "Blue", "rows": 10, "seats_in_row": 12}],
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data[0]["capacity"], 120)
+        self.assertEqual(Actor.objects.count(), 2)
+        self.assertEqual(CinemaHall.objects.count(), 1)
+
+    def test_bulk_create_reports_errors_per_item(self):
+        payload = [{"name": "Drama"}, {}, {"name": "Drama"}]
+
+        response = self.client.post(GENRE_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn("name", response.data[1])
+        self.assertEqual(Genre.objects.count(), 0)
+
+    def test_bulk_create_repeated_unique_value(self):
+        payload = [{"name": "Drama"}, {"name": "Drama"}]
+
+        response = self.client.post(GENRE_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn("non_field_errors", response.data[1])
+        self.assertEqual(Genre.objects.count(), 0)
+
+    def test_bulk_create_movies_resolves_relations_once(self):
+        genres = [Genre.objects.create(name=f"Genre {i}") for i in range(3)]
+        actors = [sample_actor(first_name=f"Actor {i}") for i in range(3)]
+        payload = [
+            {
+                "title": f"Movie {i}",
+                "description": "Description",
+                "duration": 90,
+                "genres": [genre.id for genre in genres[: i + 1]],
+                "actors": [actors[i].id],
+            }
+            for i in range(3)
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(MOVIE_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data[2]["genres"], [g.id for g in genres])
+        self.assertEqual(Movie.objects.count(), 3)
+        self.assertEqual(
+            list(Movie.objects.get(title="Movie 1").actors.all()),
+            [actors[1]],
+        )
+        self.assertLess(len(queries), 12)
+
+    def test_bulk_create_movie_unknown_relation(self):
+        payload = [
+            {
+                "title": "Movie",
+                "description": "Description",
+                "duration": 90,
+                "genres": [999],
+                "actors": [],
+            }
+        ]
+
+        response = self.client.post(MOVIE_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("genres", response.data[0])
+        self.assertEqual(Movie.objects.count(), 0)
+
+    def test_bulk_create_movie_sessions(self):
+        movie = sample_movie()
+        cinema_hall = sample_cinema_hall()
+        payload = [
+            {
+                "movie": movie.id,
+                "cinema_hall": cinema_hall.id,
+                "show_time": f"2022-09-0{day}T18:00:00Z",
+            }
+            for day in range(1, 4)
+        ]
+
+        response = self.client.post(MOVIE_SESSION_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(MovieSession.objects.count(), 3)
+
+    def test_single_object_create_still_supported(self):
+        response = self.client.post(GENRE_URL, {"name": "Drama"})
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["name"], "Drama")
@@ -0,0 +1,150 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from cinema.models import MovieSession, Order, Ticket
+from cinema.seat_events import seat_events
+from cinema.tests.test_movie_session_api import sample_movie_session
+from user.tests.test_user_api import create_user
+
+
+def cancel_url(movie_session_id):
+    return reverse("cinema:moviesession-cancel", args=[movie_session_id])
+
+
+@override_settings(
+    SEAT_EVENTS_BACKEND="cinema.tests.test_seat_events.RecordingSeatEvents"
+)
+class CancelMovieSessionTests(TestCase):
+    def setUp(self):
+        seat_events().published.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            create_user(username="admin", password="testpass", is_staff=True)
+        )
+        self.user = create_user(
+            username="user", email="user@test.com", password="testpass"
+        )
+        self.movie_session = sample_movie_session()
+        self.other_session = MovieSession.objects.create(
+            movie=self.movie_session.movie,
+            cinema_hall=self.movie_session.cinema_hall,
+            show_time=self.movie_session.show_time,
+        )
+
+    def order(self, *tickets):
+        order = Order.objects.create(user=self.user)
+        for movie_session, row, seat in tickets:
+            order.tickets.create(movie_session=movie_session, row=row, seat=seat)
+        return order
+
+    def cancel(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(cancel_url(self.movie_session.id))
+        lines = b"".join(res.streaming_content).decode().splitlines()
+        return res, [json.loads(line) for line in lines]
+
+    def test_cancel_reports_every_order(self):
+        whole = self.order(
+            (self.movie_session, 1, 1), (self.movie_session, 1, 2)
+        )
+        partly = self.order(
+            (self.movie_session, 2, 1), (self.other_session, 2, 1)
+        )
+
+        res, report = self.cancel()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        self.assertEqual(
+            report,
+            [
+                {
+                    "order": whole.id,
+                    "user": self.user.id,
+                    "email": "user@test.com",
+                    "seats": [[1, 1], [1, 2]],
+                    "order_deleted": True,
+                },
+                {
+                    "order": partly.id,
+                    "user": self.user.id,
+                    "email": "user@test.com",
+                    "seats": [[2, 1]],
+                    "order_deleted": False,
+                },
+                {
+                    "summary": {
+                        "movie_session": self.movie_session.id,
+                        "orders": 2,
+                        "orders_deleted": 1,
+                        "tickets": 3,
+                    }
+                },
+            ],
+        )
+        self.assertFalse(
+            MovieSession.objects.filter(pk=self.movie_session.id).exists()
+        )
+        self.assertEqual(list(Order.objects.all()), [partly])
+        self.assertEqual(Ticket.objects.get().movie_session, self.other_session)
+
+    @override_settings(CANCELLATION_BATCH_SIZE=1)
+    def test_each_batch_releases_its_seats_once(self):
+        self.order((self.movie_session, 1, 1), (self.movie_session, 1, 2))
+        self.order((self.movie_session, 3, 3))
+        seat_events().published.clear()
+
+        _, report = self.cancel()
+
+        self.assertEqual(len(report), 3)
+        self.assertEqual(
+            seat_events().published,
+            [
+                (
+                    self.movie_session.id,
+                    {"type": "released", "seats": [[1, 1], [1, 2]]},
+                ),
+                (
+                    self.movie_session.id,
+                    {"type": "released", "seats": [[3, 3]]},
+                ),
+            ],
+        )
+
+    def test_staff_only(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        res = client.post(cancel_url(self.movie_session.id))
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertTrue(
+            MovieSession.objects.filter(pk=self.movie_session.id).exists()
+        )
+
+
+class BenchmarkCancellationCommandTests(TestCase):
+    def test_reports_both_strategies(self):
+        out = StringIO()
+
+        call_command("benchmark_cancellation", sessions=1, stdout=out)
+
+        self.assertIn("cascade", out.getvalue())
+        self.assertIn("batched", out.getvalue())
+        self.assertFalse(MovieSession.objects.exists())
+
+    def test_runs_on_a_populated_database(self):
+        movie_session = sample_movie_session()
+        Order.objects.create(
+            user=create_user(username="user", password="testpass")
+        ).tickets.create(movie_session=movie_session, row=1, seat=1)
+
+        call_command("benchmark_cancellation", sessions=1, stdout=StringIO())
+
+        self.assertEqual(Ticket.objects.get().movie_session, movie_session)
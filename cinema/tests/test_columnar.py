@@ -0,0 +1,121 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from cinema.models import Ticket
+from cinema.renderers import ColumnarJSONRenderer
+from cinema.serializers import MovieSessionListSerializer
+from cinema.tests.test_movie_session_api import (
+    sample_movie_session,
+    detail_url,
+)
+from cinema.tests.test_order_api import sample_order
+from user.tests.test_user_api import create_user
+
+MOVIE_SESSION_URL = reverse("cinema:moviesession-list")
+ORDER_URL = reverse("cinema:order-list")
+
+
+class ColumnarApiTests(TestCase):
+    def setUp(self):
+        self.user = create_user(
+            username="test_user",
+            email="test@test.com",
+            password="testpass",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_session_rows_match_objects(self):
+        sample_movie_session()
+        objects = self.client.get(MOVIE_SESSION_URL).json()
+
+        res = self.client.get(MOVIE_SESSION_URL, {"format": "columns"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], ColumnarJSONRenderer.media_type)
+        table = res.json()
+        self.assertEqual(
+            [dict(zip(table["columns"], row)) for row in table["rows"]],
+            objects,
+        )
+
+    def test_chosen_by_accept_header(self):
+        sample_movie_session()
+
+        res = self.client.get(
+            MOVIE_SESSION_URL, HTTP_ACCEPT=ColumnarJSONRenderer.media_type
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("rows", res.json())
+
+    def test_columns_follow_sparse_fields(self):
+        movie_session = sample_movie_session()
+
+        res = self.client.get(
+            MOVIE_SESSION_URL, {"format": "columns", "fields": "id"}
+        )
+
+        self.assertEqual(
+            res.json(), {"columns": ["id"], "rows": [[movie_session.id]]}
+        )
+
+    def test_empty_field_set_is_rejected(self):
+        sample_movie_session()
+
+        every_field = ",".join(MovieSessionListSerializer.Meta.fields)
+
+        for params in ({"fields": ""}, {"omit": every_field}):
+            res = self.client.get(
+                MOVIE_SESSION_URL, {"format": "columns", **params}
+            )
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_only_for_lists(self):
+        movie_session = sample_movie_session()
+
+        res = self.client.get(
+            detail_url(movie_session.id), {"format": "columns"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_order_pages_hold_whole_orders(self):
+        movie_session = sample_movie_session()
+        for row in range(1, 4):
+            order = sample_order(self.user)
+            for seat in (1, 2):
+                Ticket.objects.create(
+                    movie_session=movie_session, order=order, row=row, seat=seat
+                )
+
+        res = self.client.get(ORDER_URL, {"format": "columns", "page_size": 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        body = res.json()
+        self.assertEqual(body["count"], 3)
+        rows = body["results"]["rows"]
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(len({row[0] for row in rows}), 2)
+
+
+class BenchmarkColumnarCommandTests(TestCase):
+    def test_reports_both_formats(self):
+        out = StringIO()
+
+        call_command(
+            "benchmark_columnar",
+            sessions=5,
+            orders=5,
+            requests=1,
+            stdout=out,
+        )
+
+        self.assertIn("json", out.getvalue())
+        self.assertIn("columns", out.getvalue())
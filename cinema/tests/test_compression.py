@@ -0,0 +1,130 @@
+import gzip
+import json
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from cinema.models import Genre
+from cinema_service.middleware import accepts_gzip, gzip_compress
+from user.tests.test_user_api import create_user
+
+GENRE_URL = reverse("cinema:genre-list")
+ADMIN_LOGIN_URL = reverse("admin:login")
+
+
+def sample_genres(count):
+    Genre.objects.bulk_create(
+        Genre(name=f"Genre number {number}") for number in range(count)
+    )
+
+
+class AcceptsGzipTests(TestCase):
+    def test_negotiation(self):
+        self.assertTrue(accepts_gzip("gzip, deflate, br"))
+        self.assertTrue(accepts_gzip("br;q=1.0, gzip;q=0.5"))
+        self.assertTrue(accepts_gzip("*"))
+        self.assertFalse(accepts_gzip(""))
+        self.assertFalse(accepts_gzip("identity"))
+        self.assertFalse(accepts_gzip("gzip;q=0"))
+        self.assertFalse(accepts_gzip("gzip;q=0, *"))
+
+
+class CompressionMiddlewareTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            create_user(username="user", password="testpass")
+        )
+
+    def test_large_api_response_is_gzipped(self):
+        sample_genres(100)
+
+        res = self.client.get(GENRE_URL, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", res["Vary"])
+        self.assertEqual(len(json.loads(gzip.decompress(res.content))), 100)
+
+    def test_small_response_is_not_gzipped(self):
+        sample_genres(1)
+
+        res = self.client.get(GENRE_URL, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertNotIn("Content-Encoding", res)
+
+    def test_refused_encoding(self):
+        sample_genres(100)
+
+        res = self.client.get(GENRE_URL, HTTP_ACCEPT_ENCODING="gzip;q=0")
+
+        self.assertNotIn("Content-Encoding", res)
+        self.assertIn("Accept-Encoding", res["Vary"])
+        self.assertEqual(len(res.json()), 100)
+
+    def test_outside_api(self):
+        res = self.client.get(ADMIN_LOGIN_URL, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn("Content-Encoding", res)
+
+
+@override_settings(CATALOGUE_CACHE_TIMEOUT=60)
+class CachedCatalogueListTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            create_user(
+                username="admin",
+                password="testpass",
+                is_staff=True,
+            )
+        )
+        sample_genres(100)
+
+    def get(self, url=GENRE_URL, **extra):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip", **extra)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res, len(queries)
+
+    def test_served_precompressed_from_cache(self):
+        first, _ = self.get()
+        second, queries = self.get()
+
+        self.assertEqual(queries, 0)
+        self.assertEqual(second["Content-Encoding"], "gzip")
+        self.assertEqual(second.content, first.content)
+        plain = gzip.decompress(second.content)
+        self.assertEqual(second.content, gzip_compress(plain, level=9))
+
+    def test_query_strings_are_cached_apart(self):
+        self.get()
+
+        res, queries = self.get(f"{GENRE_URL}?fields=id")
+
+        self.assertGreater(queries, 0)
+        self.assertEqual(set(res.json()[0]), {"id"})
+
+    def test_catalogue_change_retires_entries(self):
+        self.get()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(GENRE_URL, {"name": "Western"})
+        res, queries = self.get()
+
+        self.assertGreater(queries, 0)
+        self.assertEqual(len(json.loads(gzip.decompress(res.content))), 101)
+
+    def test_browsable_api_is_not_cached(self):
+        self.get(HTTP_ACCEPT="text/html")
+
+        _, queries = self.get(HTTP_ACCEPT="text/html")
+
+        self.assertGreater(queries, 0)
@@ -0,0 +1,121 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from cinema.models import Order
+from cinema.tests.test_movie_session_api import sample_movie_session
+from cinema.views import OrderViewSet
+from user.tests.test_user_api import create_user
+
+ORDER_URL = reverse("cinema:order-list")
+
+
+class IdempotentOrderCreateTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_user(username="user", password="testpass")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.movie_session = sample_movie_session()
+
+    def order(self, key, seat=1, client=None):
+        return (client or self.client).post(
+            ORDER_URL,
+            {
+                "tickets": [
+                    {
+                        "row": 1,
+                        "seat": seat,
+                        "movie_session": self.movie_session.id,
+                    }
+                ]
+            },
+            format="json",
+            HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def test_retry_replays_the_stored_response(self):
+        first = self.order("retry-1")
+
+        with CaptureQueriesContext(connection) as queries:
+            retry = self.order("retry-1")
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.content, first.content)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertFalse(
+            any("cinema_ticket" in query["sql"] for query in queries)
+        )
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_other_keys_create_other_orders(self):
+        self.order("first")
+        res = self.order("second", seat=2)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("Idempotent-Replayed", res)
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_key_reused_with_another_payload(self):
+        self.order("reused")
+
+        res = self.order("reused", seat=2)
+
+        self.assertEqual(
+            res.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_keys_are_scoped_per_user(self):
+        self.order("shared")
+        other = APIClient()
+        other.force_authenticate(
+            create_user(username="other", password="testpass")
+        )
+
+        res = self.order("shared", seat=2, client=other)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("Idempotent-Replayed", res)
+
+    def test_failed_create_is_not_kept(self):
+        invalid = self.order("fix-and-retry", seat=100)
+        res = self.order("fix-and-retry")
+
+        self.assertEqual(invalid.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_request_in_progress(self):
+        self.order("in-flight")
+        cache_key = OrderViewSet().get_idempotency_cache_key(
+            SimpleNamespace(user=self.user), "in-flight"
+        )
+        fingerprint, _ = cache.get(cache_key)
+        # as claimed by a request that has not finished yet
+        cache.set(cache_key, (fingerprint, None))
+
+        res = self.order("in-flight")
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+
+    def test_only_the_stored_response_is_kept_long(self):
+        with mock.patch("cinema.mixins.cache", wraps=cache) as spy:
+            self.order("claimed")
+
+        # a claim left by a worker that died lapses within a minute
+        self.assertEqual(spy.add.call_args.args[2], 60)
+        self.assertEqual(spy.set.call_args.args[2], 24 * 60 * 60)
+
+    def test_overlong_key(self):
+        res = self.order("k" * 256)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Order.objects.exists())
@@ -0,0 +1,100 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from cinema.models import Genre, Actor, Movie
+from cinema.movie_index import actor_index, genre_index
+from cinema.tests.test_movie_api import sample_movie
+from user.tests.test_user_api import create_user
+
+MOVIE_URL = reverse("cinema:movie-list")
+
+
+class MovieFilterApiTests(TestCase):
+    def setUp(self):
+        genre_index.invalidate()
+        actor_index.invalidate()
+
+        self.user = create_user(
+            username="test_admin", password="testpass", is_staff=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.drama = Genre.objects.create(name="Drama")
+            self.comedy = Genre.objects.create(name="Comedy")
+            self.actor = Actor.objects.create(
+                first_name="Tom", last_name="Hanks"
+            )
+
+            self.first = sample_movie(title="First")
+            self.first.genres.add(self.drama, self.comedy)
+            self.first.actors.add(self.actor)
+            self.second = sample_movie(title="Second")
+            self.second.genres.add(self.drama)
+            self.third = sample_movie(title="Third")
+            self.third.genres.add(self.comedy)
+
+    def titles(self, **params):
+        response = self.client.get(MOVIE_URL, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [movie["title"] for movie in response.data]
+
+    def test_filter_by_genres(self):
+        self.assertEqual(
+            self.titles(genres=f"{self.drama.id}"), ["First", "Second"]
+        )
+        self.assertEqual(
+            self.titles(genres=f"{self.drama.id},{self.comedy.id}"),
+            ["First", "Second", "Third"],
+        )
+
+    def test_filter_by_genres_and_actors(self):
+        self.assertEqual(
+            self.titles(genres=f"{self.comedy.id}", actors=f"{self.actor.id}"),
+            ["First"],
+        )
+        self.assertEqual(
+            self.titles(genres=f"{self.drama.id}", title="sec"), ["Second"]
+        )
+
+    def test_filter_by_unknown_genre(self):
+        self.assertEqual(self.titles(genres="999"), [])
+
+    def test_index_follows_m2m_changes(self):
+        self.assertEqual(self.titles(actors=f"{self.actor.id}"), ["First"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.actor.movie_set.add(self.third)
+            self.first.actors.remove(self.actor)
+
+        with self.assertNumQueries(1):
+            actor_movie_ids = actor_index.movie_ids([self.actor.id])
+            list(Movie.objects.filter(pk__in=actor_movie_ids))
+        self.assertEqual(self.titles(actors=f"{self.actor.id}"), ["Third"])
+
+    def test_index_follows_bulk_create(self):
+        self.assertEqual(self.titles(genres=f"{self.drama.id}"), [
+            "First", "Second"
+        ])
+        payload = [
+            {
+                "title": "Fourth",
+                "description": "Description",
+                "duration": 90,
+                "genres": [self.drama.id],
+                "actors": [self.actor.id],
+            }
+        ]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(MOVIE_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            self.titles(genres=f"{self.drama.id}", actors=f"{self.actor.id}"),
+            ["First", "Fourth"],
+        )
@@ -0,0 +1,160 @@
+import datetime
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from cinema.models import MovieSession
+from cinema.scheduling import HallSchedule
+from cinema.tests.test_cinema_hall_api import sample_cinema_hall
+from cinema.tests.test_movie_api import sample_movie
+from cinema.tests.test_movie_session_api import detail_url
+from user.tests.test_user_api import create_user
+
+MOVIE_SESSION_URL = reverse("cinema:moviesession-list")
+SCHEDULE_URL = reverse("cinema:moviesession-schedule")
+
+
+def show_time(hour, minute=0, day=2):
+    return datetime.datetime(
+        2022, 9, day, hour, minute, tzinfo=timezone.utc
+    )
+
+
+class HallScheduleTests(TestCase):
+    def test_conflicts_with_neighbours_only(self):
+        schedule = HallSchedule()
+        schedule.add(show_time(10), show_time(12), 1)
+        schedule.add(show_time(14), show_time(16), 2)
+
+        self.assertEqual(schedule.conflicts(show_time(12), show_time(14)), [])
+        self.assertEqual(
+            schedule.conflicts(show_time(11), show_time(15)), [1, 2]
+        )
+        self.assertEqual(
+            schedule.conflicts(show_time(11), show_time(13), exclude=1), []
+        )
+
+    def test_conflicts_with_every_earlier_overlapping_session(self):
+        schedule = HallSchedule()
+        schedule.add(show_time(10), show_time(16), 1)
+        schedule.add(show_time(11), show_time(12), 2)
+
+        self.assertEqual(
+            schedule.conflicts(show_time(13), show_time(14)), [1]
+        )
+        self.assertEqual(
+            schedule.conflicts(show_time(11, 30), show_time(17)), [1, 2]
+        )
+
+
+class AdminMovieSessionScheduleTests(TestCase):
+    def setUp(self):
+        self.user = create_user(
+            username="test_admin",
+            email="test@test.com",
+            password="testpass",
+            is_staff=True,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.movie = sample_movie(duration=120)
+        self.cinema_hall = sample_cinema_hall()
+        self.session = MovieSession.objects.create(
+            movie=self.movie,
+            cinema_hall=self.cinema_hall,
+            show_time=show_time(18),
+        )
+
+    def payload(self, hour, minute=0, day=2, cinema_hall=None):
+        return {
+            "movie": self.movie.id,
+            "cinema_hall": (cinema_hall or self.cinema_hall).id,
+            "show_time": show_time(hour, minute, day).isoformat(),
+        }
+
+    def test_create_overlapping_session_rejected(self):
+        response = self.client.post(MOVIE_SESSION_URL, self.payload(19))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("non_field_errors", response.data)
+
+    def test_create_checks_sessions_overlapping_each_other(self):
+        MovieSession.objects.create(
+            movie=sample_movie(title="Short", duration=30),
+            cinema_hall=self.cinema_hall,
+            show_time=show_time(18, 30),
+        )
+
+        response = self.client.post(MOVIE_SESSION_URL, self.payload(19))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(
+            f"session {self.session.id}",
+            response.data["non_field_errors"][0],
+        )
+
+    def test_create_adjacent_session_allowed(self):
+        response = self.client.post(MOVIE_SESSION_URL, self.payload(20))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_create_in_other_hall_allowed(self):
+        response = self.client.post(
+            MOVIE_SESSION_URL,
+            self.payload(18, cinema_hall=sample_cinema_hall(name="Red")),
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_update_does_not_conflict_with_itself(self):
+        response = self.client.patch(
+            detail_url(self.session.id),
+            {"show_time": show_time(19).isoformat()},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_schedule_programme(self):
+        programme = [self.payload(10, day=day) for day in range(3, 10)]
+
+        response = self.client.post(SCHEDULE_URL, programme, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 7)
+        self.assertEqual(MovieSession.objects.count(), 8)
+
+    def test_schedule_reports_conflicts_per_item(self):
+        programme = [
+            self.payload(10),
+            self.payload(11),
+            self.payload(17),
+            self.payload(20, 30),
+        ]
+
+        response = self.client.post(SCHEDULE_URL, programme, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn("programme item 0", response.data[1]["non_field_errors"][0])
+        self.assertIn(
+            f"session {self.session.id}",
+            response.data[2]["non_field_errors"][0],
+        )
+        self.assertEqual(response.data[3], {})
+        self.assertEqual(MovieSession.objects.count(), 1)
+
+    def test_schedule_forbidden_for_regular_user(self):
+        self.client.force_authenticate(
+            user=create_user(username="regular", password="testpass")
+        )
+
+        response = self.client.post(
+            SCHEDULE_URL, [self.payload(10)], format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
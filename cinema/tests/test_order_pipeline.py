@@ -0,0 +1,210 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from cinema.models import Order, Ticket
+from cinema.order_pipeline import (
+    OrderPipeline,
+    OrderTimeout,
+    PendingOrder,
+    SeatConflict,
+)
+from cinema.tests.test_movie_session_api import sample_movie_session
+from user.tests.test_user_api import create_user
+
+ORDER_URL = reverse("cinema:order-list")
+
+
+def submit_inline(pipeline, user_id, tickets):
+    # the committer thread would not see the test's transaction
+    pending = PendingOrder(user_id, tickets)
+    pipeline.commit([pending])
+    return pending.future.result()
+
+
+class OrderPipelineCommitTests(TestCase):
+    def setUp(self):
+        self.user = create_user(username="user", password="testpass")
+        self.movie_session = sample_movie_session()
+        self.pipeline = OrderPipeline()
+
+    def pending(self, *seats):
+        return PendingOrder(
+            self.user.id,
+            [
+                {"movie_session": self.movie_session, "row": row, "seat": seat}
+                for row, seat in seats
+            ],
+        )
+
+    def test_batch_is_written_together(self):
+        first = self.pending((1, 1), (1, 2))
+        second = self.pending((2, 1))
+
+        with self.assertNumQueries(5):
+            self.pipeline.commit([first, second])
+
+        order = first.future.result()
+        self.assertEqual(
+            list(order.tickets.values_list("row", "seat")), [(1, 1), (1, 2)]
+        )
+        self.assertEqual(second.future.result().tickets.count(), 1)
+
+    def test_later_order_of_a_batch_conflicts(self):
+        first = self.pending((1, 1))
+        second = self.pending((1, 2), (1, 1))
+
+        self.pipeline.commit([first, second])
+
+        self.assertIsInstance(first.future.result(), Order)
+        with self.assertRaises(SeatConflict) as conflict:
+            second.future.result()
+        self.assertEqual(
+            conflict.exception.seats, [(self.movie_session.id, 1, 1)]
+        )
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_seat_taken_before_conflicts(self):
+        order = Order.objects.create(user=self.user)
+        order.tickets.create(movie_session=self.movie_session, row=3, seat=3)
+        pending = self.pending((3, 3))
+
+        self.pipeline.commit([pending])
+
+        with self.assertRaises(SeatConflict):
+            pending.future.result()
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_seat_taken_behind_the_pipeline_conflicts(self):
+        order = Order.objects.create(user=self.user)
+        order.tickets.create(movie_session=self.movie_session, row=3, seat=3)
+        pending = self.pending((3, 3), (3, 4))
+        taken = self.pipeline._taken_seats([pending])
+
+        # the seat is taken after the pipeline read the taken seats, so
+        # the unique constraint catches it
+        with mock.patch.object(
+            self.pipeline, "_taken_seats", side_effect=[set(), taken]
+        ):
+            self.pipeline.commit([pending])
+
+        with self.assertRaises(SeatConflict) as conflict:
+            pending.future.result()
+        self.assertEqual(
+            conflict.exception.seats, [(self.movie_session.id, 3, 3)]
+        )
+
+    @override_settings(ORDER_PIPELINE_TIMEOUT=timedelta(0))
+    def test_order_queued_too_long_is_withdrawn(self):
+        tickets = self.pending((5, 5)).tickets
+
+        with mock.patch.object(self.pipeline, "_start"):
+            with self.assertRaises(OrderTimeout):
+                self.pipeline.submit(self.user.id, tickets)
+        # the committer gets to it only now
+        self.pipeline.commit([self.pipeline._queue.get_nowait()])
+
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_seat_repeated_within_an_order_conflicts(self):
+        pending = self.pending((4, 4), (4, 4))
+
+        self.pipeline.commit([pending])
+
+        with self.assertRaises(SeatConflict):
+            pending.future.result()
+
+
+@override_settings(ORDER_PIPELINE=True)
+@mock.patch.object(OrderPipeline, "submit", submit_inline)
+class OrderPipelineApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            create_user(username="user", password="testpass")
+        )
+        self.movie_session = sample_movie_session()
+
+    def test_create_order_through_pipeline(self):
+        res = self.client.post(
+            ORDER_URL,
+            {
+                "tickets": [
+                    {"row": 1, "seat": 1, "movie_session": self.movie_session.id}
+                ]
+            },
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["tickets"][0]["row"], 1)
+        self.assertEqual(Ticket.objects.get().order_id, res.data["id"])
+
+    def test_conflict_is_a_bad_request(self):
+        with mock.patch.object(
+            OrderPipeline,
+            "submit",
+            side_effect=SeatConflict([(self.movie_session.id, 1, 1)]),
+        ):
+            res = self.client.post(
+                ORDER_URL,
+                {
+                    "tickets": [
+                        {
+                            "row": 1,
+                            "seat": 1,
+                            "movie_session": self.movie_session.id,
+                        }
+                    ]
+                },
+                format="json",
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data["tickets"],
+            [
+                f"Seats already taken: session {self.movie_session.id} "
+                "row 1 seat 1."
+            ],
+        )
+
+
+    def test_withdrawn_order_is_a_retryable_error(self):
+        with mock.patch.object(
+            OrderPipeline, "submit", side_effect=OrderTimeout()
+        ):
+            res = self.client.post(
+                ORDER_URL,
+                {
+                    "tickets": [
+                        {
+                            "row": 1,
+                            "seat": 1,
+                            "movie_session": self.movie_session.id,
+                        }
+                    ]
+                },
+                format="json",
+            )
+
+        self.assertEqual(
+            res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+        self.assertEqual(res["Retry-After"], "1")
+
+
+class BenchmarkOrdersCommandTests(TestCase):
+    def test_reports_both_modes(self):
+        out = StringIO()
+
+        call_command("benchmark_orders", clients=2, orders=5, stdout=out)
+
+        self.assertIn("per-request", out.getvalue())
+        self.assertIn("pipeline", out.getvalue())
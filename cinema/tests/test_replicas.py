@@ -0,0 +1,129 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from cinema.models import ReplicaHeartbeat
+from cinema.replicas import ReplicaRouter, _request, beat, replicas
+from cinema.tests.test_movie_session_api import sample_movie_session
+from user.tests.test_user_api import create_user
+
+GENRE_URL = reverse("cinema:genre-list")
+MOVIE_URL = reverse("cinema:movie-list")
+ORDER_URL = reverse("cinema:order-list")
+
+
+# the primary stands in for the replica, so a read routed to the replica
+# shows up as "default" instead of None
+@override_settings(REPLICA_DATABASES=["default"])
+class ReplicaRoutingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        replicas.reset()
+        self.user = create_user(username="user", password="testpass")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def tearDown(self):
+        replicas.reset()
+
+    def read_alias(self, url=MOVIE_URL):
+        res = self.client.get(url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.wsgi_request._replica_alias
+
+    def test_reads_from_fresh_replica(self):
+        beat()
+
+        self.assertEqual(self.read_alias(), "default")
+
+    def test_lagging_replica_falls_back_to_primary(self):
+        ReplicaHeartbeat.objects.create(
+            pk=1, beat_at=timezone.now() - timedelta(minutes=1)
+        )
+
+        self.assertIsNone(self.read_alias())
+
+    def test_unknown_lag_falls_back_to_primary(self):
+        self.assertIsNone(self.read_alias())
+
+    def test_reads_own_writes_after_order(self):
+        beat()
+        movie_session = sample_movie_session()
+
+        res = self.client.post(
+            ORDER_URL,
+            {"tickets": [
+                {"row": 1, "seat": 1, "movie_session": movie_session.id}
+            ]},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertIsNone(self.read_alias(ORDER_URL))
+
+        other = APIClient()
+        other.force_authenticate(create_user(username="other", password="x"))
+        res = other.get(ORDER_URL)
+        self.assertEqual(res.wsgi_request._replica_alias, "default")
+
+    def test_failed_write_does_not_pin(self):
+        beat()
+
+        res = self.client.post(ORDER_URL, {}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.read_alias(ORDER_URL), "default")
+
+    def test_unsafe_requests_read_primary(self):
+        beat()
+        movie_session = sample_movie_session()
+
+        res = self.client.post(
+            ORDER_URL,
+            {"tickets": [
+                {"row": 1, "seat": 1, "movie_session": movie_session.id}
+            ]},
+            format="json",
+        )
+
+        self.assertFalse(hasattr(res.wsgi_request, "_replica_alias"))
+
+    @override_settings(CATALOGUE_CACHE_TIMEOUT=60)
+    def test_cached_catalogue_lists_are_read_from_primary(self):
+        beat()
+
+        res = self.client.get(GENRE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(hasattr(res.wsgi_request, "_replica_alias"))
+
+    def test_accounts_and_tokens_read_primary(self):
+        beat()
+        router = ReplicaRouter()
+        request = self.client.get(MOVIE_URL).wsgi_request
+
+        token = _request.set(request)
+        try:
+            self.assertIsNone(router.db_for_read(Token))
+            self.assertIsNone(router.db_for_read(type(self.user)))
+        finally:
+            _request.reset(token)
+
+
+class NoReplicaTests(TestCase):
+    def test_reads_primary_without_replicas(self):
+        client = APIClient()
+        client.force_authenticate(
+            create_user(username="user", password="testpass")
+        )
+
+        res = client.get(MOVIE_URL)
+
+        self.assertIsNone(res.wsgi_request._replica_alias)
@@ -0,0 +1,347 @@
+import asyncio
+import pickle
+import threading
+from multiprocessing.connection import Client, Listener
+
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from django.core import signals
+from django.core.management import CommandError, call_command
+from django.contrib import admin
+from django.db import close_old_connections
+from django.db.models.signals import post_delete, pre_delete
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from cinema.admin import OrderAdmin, TicketAdmin
+from cinema.cancellation import release_tickets
+from cinema.management.commands.seat_events_broker import (
+    Command as BrokerCommand,
+)
+from cinema.models import Order, Ticket
+from cinema.seat_events import (
+    BrokerSeatEvents,
+    LocalSeatEvents,
+    SeatEventsApplication,
+    publish_seats,
+    seat_events,
+)
+from cinema.tests.test_movie_session_api import sample_movie_session
+from user.authentication import issue_token
+from user.tests.test_user_api import create_user
+
+ORDER_URL = reverse("cinema:order-list")
+
+
+class RecordingSeatEvents(LocalSeatEvents):
+    def __init__(self):
+        super().__init__()
+        self.published = []
+
+    def publish(self, movie_session_id, event):
+        self.published.append((movie_session_id, event))
+        super().publish(movie_session_id, event)
+
+
+@override_settings(
+    SEAT_EVENTS_BACKEND="cinema.tests.test_seat_events.RecordingSeatEvents"
+)
+class SeatEventsPublishingTests(TestCase):
+    def setUp(self):
+        seat_events().published.clear()
+        self.user = create_user(username="user", password="testpass")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.movie_session = sample_movie_session()
+
+    def order(self, *seats):
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(
+                ORDER_URL,
+                {
+                    "tickets": [
+                        {
+                            "row": row,
+                            "seat": seat,
+                            "movie_session": self.movie_session.id,
+                        }
+                        for row, seat in seats
+                    ]
+                },
+                format="json",
+            )
+        return res
+
+    def test_order_publishes_taken_seats(self):
+        self.order((1, 1), (1, 2))
+
+        self.assertEqual(
+            seat_events().published,
+            [
+                (
+                    self.movie_session.id,
+                    {"type": "taken", "seats": [[1, 1], [1, 2]]},
+                )
+            ],
+        )
+
+    def test_nothing_is_published_before_commit(self):
+        self.client.post(
+            ORDER_URL,
+            {
+                "tickets": [
+                    {"row": 1, "seat": 1, "movie_session": self.movie_session.id}
+                ]
+            },
+            format="json",
+        )
+
+        self.assertEqual(seat_events().published, [])
+
+    def released(self, *seats):
+        return [
+            (
+                self.movie_session.id,
+                {"type": "released", "seats": [list(seat) for seat in seats]},
+            )
+        ]
+
+    def test_released_tickets_are_published(self):
+        self.order((2, 3), (2, 4))
+        seat_events().published.clear()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            release_tickets(Ticket.objects.filter(seat=3))
+
+        self.assertEqual(seat_events().published, self.released((2, 3)))
+        self.assertEqual(Ticket.objects.get().seat, 4)
+
+    def test_admin_deletions_release_seats(self):
+        self.order((2, 3))
+        self.order((4, 5))
+        seat_events().published.clear()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            OrderAdmin(Order, admin.site).delete_model(
+                None, Order.objects.get(tickets__seat=3)
+            )
+            TicketAdmin(Ticket, admin.site).delete_queryset(
+                None, Ticket.objects.all()
+            )
+
+        self.assertEqual(
+            seat_events().published,
+            self.released((2, 3)) + self.released((4, 5)),
+        )
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_deleting_the_session_releases_its_seats(self):
+        self.order((2, 3))
+        seat_events().published.clear()
+        self.client.force_authenticate(
+            create_user(username="admin", password="testpass", is_staff=True)
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.delete(
+                reverse(
+                    "cinema:moviesession-detail", args=[self.movie_session.id]
+                )
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(seat_events().published, self.released((2, 3)))
+
+    def test_cascades_delete_tickets_in_bulk(self):
+        self.order((2, 3), (2, 4))
+        order = Order.objects.get(user=self.user)
+
+        # no Ticket receivers, so the collector deletes the order's
+        # tickets with one statement instead of loading them
+        self.assertFalse(post_delete.has_listeners(Ticket))
+        self.assertFalse(pre_delete.has_listeners(Ticket))
+        with self.assertNumQueries(2):
+            order.delete()
+
+
+class LocalSeatEventsTests(TestCase):
+    def test_events_from_other_threads_reach_subscribers(self):
+        events = LocalSeatEvents()
+
+        async def receive():
+            subscription = events.subscribe(7)
+            other = events.subscribe(8)
+            thread = threading.Thread(
+                target=events.publish, args=(7, {"type": "taken"})
+            )
+            thread.start()
+            event = await asyncio.wait_for(subscription.get(), 1)
+            thread.join()
+            events.unsubscribe(subscription)
+            events.unsubscribe(other)
+            return event, other.queue.empty()
+
+        self.assertEqual(
+            async_to_sync(receive)(), ({"type": "taken"}, True)
+        )
+
+
+BROKER_KEY = "broker-test-key"
+
+
+@override_settings(SEAT_EVENTS_BROKER_KEY=BROKER_KEY)
+class BrokerSeatEventsTests(TestCase):
+    def setUp(self):
+        self.listener = Listener(
+            ("127.0.0.1", 0), authkey=BROKER_KEY.encode()
+        )
+        self.addCleanup(self.listener.close)
+        threading.Thread(
+            target=BrokerCommand().serve, args=(self.listener,), daemon=True
+        ).start()
+
+    def test_events_travel_through_the_broker(self):
+        with override_settings(SEAT_EVENTS_BROKER=self.listener.address):
+            publisher = BrokerSeatEvents()
+            subscriber = BrokerSeatEvents()
+
+            async def receive():
+                subscription = subscriber.subscribe(3)
+                # the broker relays to connections it has accepted
+                await asyncio.sleep(0.2)
+                publisher.publish(3, {"type": "released"})
+                return await asyncio.wait_for(subscription.get(), 5)
+
+            self.assertEqual(async_to_sync(receive)(), {"type": "released"})
+
+    def test_only_json_messages_are_delivered(self):
+        with override_settings(SEAT_EVENTS_BROKER=self.listener.address):
+            subscriber = BrokerSeatEvents()
+            peer = Client(self.listener.address, authkey=BROKER_KEY.encode())
+            self.addCleanup(peer.close)
+
+            async def receive():
+                subscription = subscriber.subscribe(3)
+                await asyncio.sleep(0.2)
+                # a pickle would run code when loaded
+                peer.send_bytes(pickle.dumps((3, {"type": "pickled"})))
+                peer.send_bytes(b'[3, {"type": "released"}]')
+                return await asyncio.wait_for(subscription.get(), 5)
+
+            self.assertEqual(async_to_sync(receive)(), {"type": "released"})
+
+    @override_settings(SEAT_EVENTS_BROKER_KEY=None)
+    def test_command_requires_a_key(self):
+        with self.assertRaises(CommandError):
+            call_command("seat_events_broker", port=0)
+
+    def test_unreachable_broker_delivers_locally(self):
+        address = self.listener.address
+        self.listener.close()
+
+        with override_settings(SEAT_EVENTS_BROKER=address):
+            events = BrokerSeatEvents()
+
+            async def receive():
+                subscription = events.subscribe(3)
+                events.publish(3, {"type": "taken"})
+                return await asyncio.wait_for(subscription.get(), 1)
+
+            self.assertEqual(async_to_sync(receive)(), {"type": "taken"})
+
+
+async def passthrough(scope, receive, send):
+    await send({"type": "http.response.start", "status": 204})
+    await send({"type": "http.response.body", "body": b""})
+
+
+class SeatEventsApplicationTests(TestCase):
+    def setUp(self):
+        # the stream opens and closes a request like Django's handlers,
+        # which must not close the connection holding the test data
+        for signal in (signals.request_started, signals.request_finished):
+            signal.disconnect(close_old_connections)
+            self.addCleanup(signal.connect, close_old_connections)
+
+        self.user = create_user(username="user", password="testpass")
+        self.movie_session = sample_movie_session()
+        self.application = SeatEventsApplication(passthrough)
+
+    def scope(self, movie_session_id, token=None):
+        headers = []
+        if token:
+            headers.append((b"authorization", f"Token {token}".encode()))
+        return {
+            "type": "http",
+            "method": "GET",
+            "path": (
+                f"/api/cinema/movie_sessions/{movie_session_id}/seat_events/"
+            ),
+            "query_string": b"",
+            "headers": headers,
+        }
+
+    def test_stream_starts_with_snapshot_then_deltas(self):
+        order = Order.objects.create(user=self.user)
+        order.tickets.create(movie_session=self.movie_session, row=1, seat=1)
+        token = issue_token(self.user).key
+
+        async def stream():
+            communicator = ApplicationCommunicator(
+                self.application, self.scope(self.movie_session.id, token)
+            )
+            await communicator.send_input({"type": "http.request"})
+            start = await communicator.receive_output(1)
+            snapshot = await communicator.receive_output(1)
+
+            publish_seats("taken", [
+                order.tickets.model(
+                    movie_session_id=self.movie_session.id, row=1, seat=2
+                )
+            ])
+            delta = await communicator.receive_output(1)
+
+            await communicator.send_input({"type": "http.disconnect"})
+            end = await communicator.receive_output(1)
+            return start, snapshot, delta, end
+
+        start, snapshot, delta, end = async_to_sync(stream)()
+
+        self.assertEqual(start["status"], 200)
+        self.assertIn((b"content-type", b"text/event-stream"), start["headers"])
+        self.assertIn(
+            b'event: snapshot\ndata: {"taken": [[1, 1]]}\n\n', snapshot["body"]
+        )
+        self.assertEqual(delta["body"], b"event: taken\ndata: [[1, 2]]\n\n")
+        self.assertEqual(end["body"], b"")
+        self.assertEqual(seat_events()._subscriptions, {})
+
+    def open(self, scope):
+        async def respond():
+            communicator = ApplicationCommunicator(self.application, scope)
+            await communicator.send_input({"type": "http.request"})
+            return await communicator.receive_output(1)
+
+        return async_to_sync(respond)()
+
+    def test_requires_authentication(self):
+        start = self.open(self.scope(self.movie_session.id))
+
+        self.assertEqual(start["status"], 401)
+
+    def test_unknown_session(self):
+        token = issue_token(self.user).key
+
+        start = self.open(self.scope(self.movie_session.id + 1, token))
+
+        self.assertEqual(start["status"], 404)
+
+    def test_other_paths_pass_through(self):
+        scope = self.scope(self.movie_session.id)
+        scope["path"] = "/api/cinema/movie_sessions/"
+
+        start = self.open(scope)
+
+        self.assertEqual(start["status"], 204)
@@ -0,0 +1,123 @@
+import os
+import subprocess
+import sys
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from cinema_service.checks import check_shared_cache
+
+KEY_VARIABLES = (
+    "DJANGO_SECRET_KEY",
+    "DJANGO_SIGNED_TOKEN_KEY",
+    "DJANGO_SEAT_EVENTS_BROKER_KEY",
+)
+
+
+class BenchmarkProfilesCommandTests(TestCase):
+    def test_reports_every_profile(self):
+        out = StringIO()
+
+        call_command("benchmark_profiles", requests=5, stdout=out)
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual(
+            [line.split(":")[0].strip() for line in lines],
+            ["development", "production", "api"],
+        )
+        # the api profile keeps only security, compression, common and
+        # replica routing
+        self.assertIn("4 middleware", lines[2])
+
+    @override_settings(ALLOWED_HOSTS=["cinema.example.com"])
+    def test_requests_run_under_any_allowed_hosts(self):
+        out = StringIO()
+
+        call_command("benchmark_requests", requests=5, stdout=out)
+
+        self.assertIn(f"{settings.PROFILE}:", out.getvalue())
+
+    def test_failed_request_is_a_command_error(self):
+        with self.assertRaisesMessage(CommandError, "not 200"):
+            call_command(
+                "benchmark_requests",
+                requests=1,
+                url="/api/cinema/missing/",
+                stdout=StringIO(),
+            )
+
+
+class RequiredKeysTests(SimpleTestCase):
+    def check(self, profile, **keys):
+        env = {
+            name: value
+            for name, value in os.environ.items()
+            if name not in KEY_VARIABLES
+        }
+        return subprocess.run(
+            [
+                sys.executable,
+                os.path.join(settings.BASE_DIR, "manage.py"),
+                "check",
+            ],
+            env={**env, **keys, "DJANGO_PROFILE": profile},
+            capture_output=True,
+            text=True,
+        )
+
+    def test_production_refuses_the_development_keys(self):
+        for keys, missing in (
+            ({}, "DJANGO_SECRET_KEY"),
+            ({"DJANGO_SECRET_KEY": "secret"}, "DJANGO_SIGNED_TOKEN_KEY"),
+        ):
+            with self.subTest(missing=missing):
+                result = self.check("production", **keys)
+
+                self.assertNotEqual(result.returncode, 0)
+                self.assertIn(
+                    f"{missing} must be set in the production profile",
+                    result.stderr,
+                )
+
+    def test_development_falls_back_to_its_keys(self):
+        self.assertEqual(self.check("development").returncode, 0)
+
+    def test_broker_needs_its_own_key(self):
+        result = self.check(
+            "development", DJANGO_SEAT_EVENTS_BROKER="127.0.0.1:7655"
+        )
+
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("DJANGO_SEAT_EVENTS_BROKER_KEY", result.stderr)
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    def caches(self, backend):
+        return {"default": {"BACKEND": backend}}
+
+    def test_production_refuses_per_process_caches(self):
+        for backend in ("locmem.LocMemCache", "dummy.DummyCache"):
+            with self.subTest(backend=backend), override_settings(
+                PROFILE="production",
+                CACHES=self.caches(f"django.core.cache.backends.{backend}"),
+            ):
+                errors = check_shared_cache(None)
+
+                self.assertEqual(
+                    [error.id for error in errors], ["cinema_service.E001"]
+                )
+
+    @override_settings(PROFILE="production")
+    def test_production_accepts_shared_caches(self):
+        with override_settings(
+            CACHES=self.caches(
+                "django.core.cache.backends.redis.RedisCache"
+            )
+        ):
+            self.assertEqual(check_shared_cache(None), [])
+
+    @override_settings(PROFILE="development")
+    def test_development_keeps_its_local_cache(self):
+        self.assertEqual(check_shared_cache(None), [])
@@ -0,0 +1,134 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from cinema.tests.test_movie_session_api import (
+    sample_movie_session,
+    detail_url,
+)
+from user.tests.test_user_api import create_user
+
+MOVIE_URL = reverse("cinema:movie-list")
+MOVIE_SESSION_URL = reverse("cinema:moviesession-list")
+ACTOR_URL = reverse("cinema:actor-list")
+
+
+class SparseFieldsApiTests(TestCase):
+    def setUp(self):
+        self.user = create_user(
+            username="test_user",
+            email="test@test.com",
+            password="testpass",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.movie_session = sample_movie_session()
+
+    def get(self, url, params):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url, params)
+        return res, [query["sql"] for query in queries]
+
+    def test_session_times_skip_availability_and_joins(self):
+        res, queries = self.get(MOVIE_SESSION_URL, {"fields": "id,show_time"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(res.data[0]), {"id", "show_time"})
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("COUNT", queries[0])
+        self.assertNotIn("JOIN", queries[0])
+
+    def test_omit_availability(self):
+        res, queries = self.get(
+            MOVIE_SESSION_URL, {"omit": "tickets_available"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            set(res.data[0]),
+            {
+                "id",
+                "show_time",
+                "movie_title",
+                "cinema_hall_name",
+                "cinema_hall_capacity",
+            },
+        )
+        self.assertEqual(res.data[0]["cinema_hall_capacity"], 300)
+        self.assertNotIn("COUNT", queries[0])
+        self.assertNotIn('"cinema_movie"."description"', queries[0])
+
+    def test_full_session_list_is_unchanged(self):
+        res, queries = self.get(MOVIE_SESSION_URL, {})
+
+        self.assertEqual(res.data[0]["tickets_available"], 300)
+        self.assertIn("COUNT", queries[0])
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('"cinema_movie"."description"', queries[0])
+
+    def test_movie_list_without_description(self):
+        res, queries = self.get(MOVIE_URL, {"omit": "description"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn("description", res.data[0])
+        self.assertEqual(len(res.data[0]["genres"]), 1)
+        self.assertNotIn("description", queries[0])
+
+    def test_movie_titles_skip_prefetches(self):
+        res, queries = self.get(MOVIE_URL, {"fields": "id,title"})
+
+        self.assertEqual(
+            res.data,
+            [{"id": self.movie_session.movie_id, "title": "Sample movie"}],
+        )
+        self.assertEqual(len(queries), 1)
+
+    def test_retrieve_with_fields(self):
+        res, queries = self.get(
+            detail_url(self.movie_session.id), {"fields": "show_time"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(res.data), {"show_time"})
+        self.assertEqual(len(queries), 1)
+
+    def test_property_fields_load_their_columns(self):
+        res, queries = self.get(ACTOR_URL, {"fields": "full_name"})
+
+        self.assertEqual(res.data, [{"full_name": "test_name test_last"}])
+        self.assertEqual(len(queries), 1)
+
+    def test_unknown_field(self):
+        res = self.client.get(MOVIE_SESSION_URL, {"fields": "id,price"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_fields_and_omit_together(self):
+        res = self.client.get(
+            MOVIE_SESSION_URL, {"fields": "id", "omit": "show_time"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class BenchmarkSessionListCommandTests(TestCase):
+    def test_reports_both_queries(self):
+        out = StringIO()
+
+        call_command(
+            "benchmark_session_list",
+            sessions=10,
+            movies=2,
+            description_length=100,
+            repeat=1,
+            stdout=out,
+        )
+
+        self.assertIn("whole rows", out.getvalue())
+        self.assertIn("pruned", out.getvalue())
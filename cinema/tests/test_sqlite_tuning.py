@@ -0,0 +1,34 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+
+class SqliteTuningTests(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_connection_is_tuned(self):
+        self.assertEqual(self.pragma("busy_timeout"), 5000)
+        self.assertEqual(self.pragma("cache_size"), -64 * 1024)
+        # NORMAL
+        self.assertEqual(self.pragma("synchronous"), 1)
+
+
+class BenchmarkSqliteCommandTests(TestCase):
+    def test_reports_both_profiles(self):
+        out = StringIO()
+
+        call_command(
+            "benchmark_sqlite",
+            readers=2,
+            writers=2,
+            operations=5,
+            stdout=out,
+        )
+
+        self.assertIn("defaults", out.getvalue())
+        self.assertIn("tuned", out.getvalue())
@@ -0,0 +1,37 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from cinema.management.commands.profile_startup import measure_startup
+
+# modules of the project and DRF a production worker may load by its
+# first request; importing the views and serializers eagerly takes it
+# past 90
+STARTUP_MODULE_BUDGET = 80
+
+
+class StartupImportsTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.report = measure_startup("production")
+
+    def test_views_and_serializers_are_deferred(self):
+        self.assertEqual(self.report["imported"], [])
+
+    def test_startup_stays_within_the_module_budget(self):
+        self.assertLessEqual(
+            sum(self.report["loaded"].values()), STARTUP_MODULE_BUDGET
+        )
+
+
+class ProfileStartupCommandTests(SimpleTestCase):
+    def test_reports_ready_and_imports(self):
+        out = StringIO()
+
+        call_command("profile_startup", profile="production", stdout=out)
+
+        self.assertIn("AppConfig.ready()", out.getvalue())
+        self.assertIn("import time by package", out.getvalue())
+        self.assertIn("modules loaded by the first request", out.getvalue())
@@ -0,0 +1,120 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from cinema.models import Genre, Actor
+from cinema.sync import changes_since
+from cinema.tests.test_movie_api import sample_movie
+from user.tests.test_user_api import create_user
+
+SYNC_URL = reverse("cinema:sync")
+GENRE_URL = reverse("cinema:genre-list")
+
+
+class PublicSyncApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        res = self.client.get(SYNC_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateSyncApiTests(TestCase):
+    def setUp(self):
+        self.user = create_user(username="user", password="testpass")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def sync(self, since):
+        response = self.client.get(SYNC_URL, {"since": since})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_full_sync(self):
+        genre = Genre.objects.create(name="Drama")
+        movie = sample_movie()
+        movie.genres.add(genre)
+
+        feed = self.sync(0)
+
+        self.assertFalse(feed["has_more"])
+        self.assertEqual(feed["genres"]["upserted"][0]["name"], "Drama")
+        self.assertEqual(feed["movies"]["upserted"][0]["genres"], ["Drama"])
+        self.assertEqual(feed["actors"], {"upserted": [], "deleted": []})
+
+    def test_only_changes_after_cursor(self):
+        Genre.objects.create(name="Drama")
+        cursor = self.sync(0)["cursor"]
+
+        actor = Actor.objects.create(first_name="Tom", last_name="Hanks")
+        feed = self.sync(cursor)
+
+        self.assertEqual(feed["genres"]["upserted"], [])
+        self.assertEqual(feed["actors"]["upserted"][0]["id"], actor.id)
+        self.assertEqual(self.sync(feed["cursor"])["cursor"], feed["cursor"])
+
+    def test_deleted_objects(self):
+        genre = Genre.objects.create(name="Drama")
+        movie = sample_movie()
+        movie.genres.add(genre)
+        cursor = self.sync(0)["cursor"]
+
+        genre_id = genre.id
+        genre.delete()
+        feed = self.sync(cursor)
+
+        self.assertEqual(feed["genres"]["deleted"], [genre_id])
+        self.assertEqual(feed["movies"]["upserted"][0]["genres"], [])
+
+    def test_rename_updates_linked_movies(self):
+        genre = Genre.objects.create(name="Drama")
+        movie = sample_movie()
+        movie.genres.add(genre)
+        cursor = self.sync(0)["cursor"]
+
+        genre.name = "Thriller"
+        genre.save()
+        feed = self.sync(cursor)
+
+        self.assertEqual(
+            feed["movies"]["upserted"][0]["genres"], ["Thriller"]
+        )
+
+    def test_page_size(self):
+        for i in range(3):
+            Genre.objects.create(name=f"Genre {i}")
+
+        feed = changes_since(0, limit=2)
+
+        self.assertTrue(feed["has_more"])
+        self.assertEqual(len(feed["genres"]["upserted"]), 2)
+        self.assertFalse(changes_since(feed["cursor"], limit=2)["has_more"])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(SYNC_URL, {"since": "abc"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class AdminSyncApiTests(TestCase):
+    def setUp(self):
+        self.user = create_user(
+            username="test_admin", password="testpass", is_staff=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_bulk_created_objects_are_logged(self):
+        self.client.post(
+            GENRE_URL, [{"name": "Drama"}, {"name": "Comedy"}], format="json"
+        )
+
+        feed = self.client.get(SYNC_URL).data
+
+        self.assertEqual(
+            [genre["name"] for genre in feed["genres"]["upserted"]],
+            ["Drama", "Comedy"],
+        )
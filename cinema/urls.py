@@ -1,23 +1,106 @@
-from django.urls import path, include
-from rest_framework import routers
-
-from cinema.views import (
-    GenreViewSet,
-    ActorViewSet,
-    CinemaHallViewSet,
-    MovieViewSet,
-    MovieSessionViewSet,
-    OrderViewSet,
-)
-
-router = routers.DefaultRouter()
-router.register("genres", GenreViewSet, basename="genre")
-router.register("actors", ActorViewSet, basename="actor")
-router.register("cinema_halls", CinemaHallViewSet, basename="cinemahall")
-router.register("movies", MovieViewSet, basename="movie")
-router.register("movie_sessions", MovieSessionViewSet, basename="moviesession")
-router.register("orders", OrderViewSet, basename="order")
-
-urlpatterns = [path("", include(router.urls))]
+from django.urls import path, re_path
+from rest_framework.routers import APIRootView
+from rest_framework.urlpatterns import format_suffix_patterns
+
+from cinema_service.lazy import LazyView
+
+LIST = {"get": "list", "post": "create"}
+DETAIL = {"get": "retrieve"}
+EDITABLE_DETAIL = {
+    "get": "retrieve",
+    "put": "update",
+    "patch": "partial_update",
+    "delete": "destroy",
+}
+LOOKUP = r"(?P<pk>[^/.]+)"
+
+
+def route(regex, viewset, basename, url_name, actions, detail, **initkwargs):
+    """The pattern ``DefaultRouter`` would build, without the viewset.
+
+    The router derives its routes from the viewset classes, which would
+    import cinema.views and its serializers with the URLconf. Spelled
+    out here, they are imported by the first request instead.
+    """
+    return re_path(
+        regex,
+        LazyView(
+            f"cinema.views.{viewset}",
+            actions=actions,
+            basename=basename,
+            detail=detail,
+            **initkwargs,
+        ),
+        name=f"{basename}-{url_name}",
+    )
+
+
+def collection(prefix, viewset, basename):
+    return route(
+        rf"^{prefix}/$", viewset, basename, "list", LIST, False, suffix="List"
+    )
+
+
+def instance(prefix, viewset, basename, actions=DETAIL):
+    return route(
+        rf"^{prefix}/{LOOKUP}/$",
+        viewset,
+        basename,
+        "detail",
+        actions,
+        True,
+        suffix="Instance",
+    )
+
+
+urlpatterns = format_suffix_patterns(
+    [
+        collection("genres", "GenreViewSet", "genre"),
+        collection("actors", "ActorViewSet", "actor"),
+        collection("cinema_halls", "CinemaHallViewSet", "cinemahall"),
+        collection("movies", "MovieViewSet", "movie"),
+        instance("movies", "MovieViewSet", "movie"),
+        collection("movie_sessions", "MovieSessionViewSet", "moviesession"),
+        route(
+            r"^movie_sessions/schedule/$",
+            "MovieSessionViewSet",
+            "moviesession",
+            "schedule",
+            {"post": "schedule"},
+            False,
+        ),
+        instance(
+            "movie_sessions",
+            "MovieSessionViewSet",
+            "moviesession",
+            EDITABLE_DETAIL,
+        ),
+        route(
+            rf"^movie_sessions/{LOOKUP}/cancel/$",
+            "MovieSessionViewSet",
+            "moviesession",
+            "cancel",
+            {"post": "cancel"},
+            True,
+        ),
+        collection("orders", "OrderViewSet", "order"),
+        re_path(
+            r"^$",
+            APIRootView.as_view(
+                api_root_dict={
+                    "genres": "genre-list",
+                    "actors": "actor-list",
+                    "cinema_halls": "cinemahall-list",
+                    "movies": "movie-list",
+                    "movie_sessions": "moviesession-list",
+                    "orders": "order-list",
+                }
+            ),
+            name="api-root",
+        ),
+    ]
+) + [
+    path("sync/", LazyView("cinema.views.CatalogueSyncView"), name="sync"),
+]
 
 app_name = "cinema"
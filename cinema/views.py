@@ -1,14 +1,44 @@
 from datetime import datetime
 
+from django.conf import settings
+from django.db import transaction
 from django.db.models import F, Count
-from rest_framework import viewsets, mixins
-from rest_framework.authentication import TokenAuthentication
+from django.http import StreamingHttpResponse
+from rest_framework import viewsets, mixins, views
+from rest_framework.decorators import action
 from rest_framework.exceptions import ParseError
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
-
-from cinema.models import Genre, Actor, CinemaHall, Movie, MovieSession, Order
+from rest_framework.response import Response
+
+from cinema.cancellation import cancellation_report, release_tickets
+from cinema.mixins import (
+    ArchiveListMixin,
+    BulkCreateModelMixin,
+    CachedCatalogueListMixin,
+    ColumnarListMixin,
+    IdempotentCreateMixin,
+    SparseFieldsMixin,
+)
+from cinema.models import (
+    ArchivedOrder,
+    Genre,
+    Actor,
+    CinemaHall,
+    Movie,
+    MovieSession,
+    Order,
+    Ticket,
+)
+from cinema.movie_index import actor_index, genre_index
 from cinema.permissions import IsAdminOrIfAuthenticatedReadOnly
+from cinema.scheduling import lock_halls, validate_programme
+from cinema.sync import changes_since
+from user.authentication import (
+    ExpiringTokenAuthentication,
+    SignedTokenAuthentication,
+)
+from user.throttling import IPBucketThrottle, UserBucketThrottle
 
 from cinema.serializers import (
     GenreSerializer,
@@ -26,39 +56,59 @@ from cinema.serializers import (
 
 
 class GenreViewSet(
+    CachedCatalogueListMixin,
+    SparseFieldsMixin,
+    BulkCreateModelMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     viewsets.GenericViewSet
 ):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (
+        ExpiringTokenAuthentication,
+        SignedTokenAuthentication,
+    )
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
 
 class ActorViewSet(
+    CachedCatalogueListMixin,
+    SparseFieldsMixin,
+    BulkCreateModelMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     viewsets.GenericViewSet
 ):
     queryset = Actor.objects.all()
     serializer_class = ActorSerializer
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (
+        ExpiringTokenAuthentication,
+        SignedTokenAuthentication,
+    )
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
 
 class CinemaHallViewSet(
+    SparseFieldsMixin,
+    BulkCreateModelMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     viewsets.GenericViewSet
 ):
     queryset = CinemaHall.objects.all()
     serializer_class = CinemaHallSerializer
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (
+        ExpiringTokenAuthentication,
+        SignedTokenAuthentication,
+    )
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
 
 class MovieViewSet(
+    CachedCatalogueListMixin,
+    SparseFieldsMixin,
+    BulkCreateModelMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     mixins.CreateModelMixin,
@@ -66,7 +116,10 @@ class MovieViewSet(
 ):
     queryset = Movie.objects.prefetch_related("genres", "actors")
     serializer_class = MovieSerializer
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (
+        ExpiringTokenAuthentication,
+        SignedTokenAuthentication,
+    )
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
     @staticmethod
@@ -85,20 +138,32 @@ class MovieViewSet(
         genres = self.request.query_params.get("genres")
         actors = self.request.query_params.get("actors")
 
-        queryset = self.queryset
+        queryset = self.queryset.all()
 
         if title:
             queryset = queryset.filter(title__icontains=title)
 
+        # genre and actor filters are intersected in the inverted
+        # indexes, so the movies are fetched by pk without M2M joins
+        movie_ids = None
+
         if genres:
             genres_ids = self._params_to_ints(genres)
-            queryset = queryset.filter(genres__id__in=genres_ids)
+            movie_ids = genre_index.movie_ids(genres_ids)
 
         if actors:
             actors_ids = self._params_to_ints(actors)
-            queryset = queryset.filter(actors__id__in=actors_ids)
+            actor_movie_ids = actor_index.movie_ids(actors_ids)
+            movie_ids = (
+                actor_movie_ids
+                if movie_ids is None
+                else movie_ids & actor_movie_ids
+            )
 
-        return queryset.distinct()
+        if movie_ids is not None:
+            queryset = queryset.filter(pk__in=sorted(movie_ids))
+
+        return queryset
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -110,25 +175,41 @@ class MovieViewSet(
         return MovieSerializer
 
 
-class MovieSessionViewSet(viewsets.ModelViewSet):
-    queryset = (
-        MovieSession.objects.all()
-        .select_related("movie", "cinema_hall")
-        .annotate(
-            tickets_available=F("cinema_hall__rows")
-            * F("cinema_hall__seats_in_row")
-            - Count("tickets")
-        )
+class MovieSessionViewSet(
+    ColumnarListMixin,
+    SparseFieldsMixin,
+    BulkCreateModelMixin,
+    viewsets.ModelViewSet,
+):
+    queryset = MovieSession.objects.all().select_related(
+        "movie", "cinema_hall"
     )
+    field_annotations = {
+        "tickets_available": F("cinema_hall__rows")
+        * F("cinema_hall__seats_in_row")
+        - Count("tickets"),
+    }
+    columns = {
+        "id": "id",
+        "show_time": "show_time",
+        "movie_title": "movie__title",
+        "cinema_hall_name": "cinema_hall__name",
+        "cinema_hall_capacity": F("cinema_hall__rows")
+        * F("cinema_hall__seats_in_row"),
+        "tickets_available": "tickets_available",
+    }
     serializer_class = MovieSessionSerializer
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (
+        ExpiringTokenAuthentication,
+        SignedTokenAuthentication,
+    )
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
     def get_queryset(self):
         date = self.request.query_params.get("date")
         movie_id_str = self.request.query_params.get("movie")
 
-        queryset = self.queryset
+        queryset = self.queryset.all()
 
         if date:
             try:
@@ -146,6 +227,31 @@ class MovieSessionViewSet(viewsets.ModelViewSet):
 
         return queryset
 
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            release_tickets(Ticket.objects.filter(movie_session=instance))
+            instance.delete()
+
+    def validate_bulk(self, validated_data):
+        lock_halls({attrs["cinema_hall"].id for attrs in validated_data})
+        return validate_programme(validated_data)
+
+    @action(detail=False, methods=["post"])
+    def schedule(self, request):
+        """Create a whole programme of sessions checked in one pass"""
+        return self.bulk_create(request)
+
+    @action(detail=True, methods=["post"])
+    def cancel(self, request, pk=None):
+        """Delete the session and stream a report of the orders it hit"""
+        movie_session = self.get_object()
+        report = cancellation_report(
+            movie_session.id, settings.CANCELLATION_BATCH_SIZE
+        )
+        return StreamingHttpResponse(
+            report, content_type="application/x-ndjson"
+        )
+
     def get_serializer_class(self):
         if self.action == "list":
             return MovieSessionListSerializer
@@ -158,10 +264,18 @@ class MovieSessionViewSet(viewsets.ModelViewSet):
 
 class OrderPagination(PageNumberPagination):
     page_size = 10
+    page_size_query_param = "page_size"
     max_page_size = 100
 
 
+CREATE_ORDER_PERMISSIONS = (IsAuthenticated(),)
+ORDER_PERMISSIONS = (IsAdminOrIfAuthenticatedReadOnly(),)
+
+
 class OrderViewSet(
+    ArchiveListMixin,
+    ColumnarListMixin,
+    IdempotentCreateMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     viewsets.GenericViewSet
@@ -169,13 +283,38 @@ class OrderViewSet(
     queryset = Order.objects.prefetch_related(
         "tickets__movie_session__movie", "tickets__movie_session__cinema_hall"
     )
+    # orders of long past sessions, moved there by archive_orders
+    archive_queryset = ArchivedOrder.objects.prefetch_related(
+        "tickets__movie_session__movie", "tickets__movie_session__cinema_hall"
+    )
+    archive_ordering = ("-created_at",)
+    # one row per ticket
+    columns = {
+        "id": "id",
+        "created_at": "created_at",
+        "ticket_id": "tickets__id",
+        "row": "tickets__row",
+        "seat": "tickets__seat",
+        "movie_session": "tickets__movie_session_id",
+        "show_time": "tickets__movie_session__show_time",
+        "movie_title": "tickets__movie_session__movie__title",
+        "cinema_hall_name": "tickets__movie_session__cinema_hall__name",
+    }
     serializer_class = OrderSerializer
     pagination_class = OrderPagination
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (
+        ExpiringTokenAuthentication,
+        SignedTokenAuthentication,
+    )
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    throttle_classes = (UserBucketThrottle, IPBucketThrottle)
+    throttle_scope = "order"
 
     def get_queryset(self):
-        return self.queryset.filter(user=self.request.user)
+        return self.queryset.filter(user_id=self.request.user.id)
+
+    def get_archive_queryset(self):
+        return self.archive_queryset.filter(user_id=self.request.user.id)
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -184,9 +323,35 @@ class OrderViewSet(
         return OrderSerializer
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        serializer.save(user_id=self.request.user.id)
 
     def get_permissions(self):
+        # permissions are stateless, so the instances are shared
+        if self.action == "create":
+            return CREATE_ORDER_PERMISSIONS
+        return ORDER_PERMISSIONS
+
+    def get_throttles(self):
         if self.action == "create":
-            return [IsAuthenticated()]
-        return [IsAdminOrIfAuthenticatedReadOnly()]
+            return super().get_throttles()
+        return []
+
+
+class CatalogueSyncView(views.APIView):
+    """Genres, actors and movies changed since the given cursor"""
+
+    authentication_classes = (
+        ExpiringTokenAuthentication,
+        SignedTokenAuthentication,
+    )
+    permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+
+    def get(self, request):
+        since = request.query_params.get("since", "0")
+
+        try:
+            cursor = int(since)
+        except ValueError:
+            raise ParseError(f"Invalid cursor: {since}")
+
+        return Response(changes_since(cursor))
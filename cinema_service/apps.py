@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+from django.core import checks
+from django.db.backends.signals import connection_created
+
+
+class CinemaServiceConfig(AppConfig):
+    name = "cinema_service"
+
+    def ready(self):
+        from cinema_service.checks import check_shared_cache
+        from cinema_service.db import tune_sqlite
+
+        connection_created.connect(tune_sqlite, dispatch_uid="tune_sqlite")
+        checks.register(check_shared_cache, checks.Tags.caches)
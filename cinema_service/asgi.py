@@ -13,4 +13,9 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "cinema_service.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# imported once the apps are set up
+from cinema.seat_events import SeatEventsApplication  # noqa: E402
+
+application = SeatEventsApplication(django_application)
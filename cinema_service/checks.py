@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.checks import Error
+
+# backends whose entries only the process that wrote them can see
+PER_PROCESS_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def check_shared_cache(app_configs, **kwargs):
+    """Outside development every worker must see the same cache.
+
+    Idempotency keys, replica pins and the movie index generations are
+    kept there; with a per-process cache a retry, a read after a write
+    or an index change reaching another worker would go unnoticed.
+    """
+    backend = settings.CACHES["default"]["BACKEND"]
+    if settings.PROFILE == "development" or backend not in PER_PROCESS_CACHES:
+        return []
+
+    return [
+        Error(
+            f"The {settings.PROFILE} profile needs a cache shared by every "
+            f"worker, {backend} is private to each process.",
+            hint=(
+                "Set DJANGO_CACHE_BACKEND and DJANGO_CACHE_LOCATION to a "
+                "shared cache such as Redis, Memcached or the database."
+            ),
+            id="cinema_service.E001",
+        )
+    ]
@@ -0,0 +1,11 @@
+from django.conf import settings
+
+
+def tune_sqlite(sender, connection, **kwargs):
+    """Apply the ``SQLITE_PRAGMAS`` profile to every new connection"""
+    if connection.vendor != "sqlite":
+        return
+
+    with connection.cursor() as cursor:
+        for pragma, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {pragma} = {value}")
@@ -0,0 +1,41 @@
+from django.utils.module_loading import import_string
+
+
+class LazyView:
+    """A DRF view for a URL pattern, imported on its first request.
+
+    Keeps the view module and everything it imports out of worker
+    start-up. Like every ``APIView``, the view is exempt from CSRF.
+    For a viewset, ``actions`` maps HTTP methods to its actions, as a
+    router would; the ``@action`` options of an extra action are
+    applied when the class is imported, as the router does.
+    """
+
+    csrf_exempt = True
+
+    def __init__(self, view_path, actions=None, **initkwargs):
+        self.view_path = view_path
+        self.actions = actions
+        self.initkwargs = initkwargs
+        self.view = None
+
+    def __call__(self, request, *args, **kwargs):
+        if self.view is None:
+            self.view = self.load()
+        return self.view(request, *args, **kwargs)
+
+    def load(self):
+        view_class = import_string(self.view_path)
+        if self.actions is None:
+            return view_class.as_view(**self.initkwargs)
+
+        initkwargs = {}
+        for action in self.actions.values():
+            handler = getattr(view_class, action)
+            if getattr(handler, "mapping", None) is not None:
+                initkwargs.update(handler.kwargs)
+        initkwargs.update(self.initkwargs)
+        return view_class.as_view(self.actions, **initkwargs)
+
+    def __repr__(self):
+        return f"<LazyView: {self.view_path}>"
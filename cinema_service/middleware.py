@@ -0,0 +1,150 @@
+import gzip
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.handlers.exception import convert_exception_to_response
+from django.utils.cache import patch_vary_headers
+from django.utils.module_loading import import_string
+
+
+def is_compressible(content_type):
+    media_type = content_type.partition(";")[0].strip()
+    return media_type.startswith("text/") or media_type.endswith("json")
+
+
+def gzip_compress(content, level=6):
+    # a fixed mtime keeps the output of equal bodies identical
+    return gzip.compress(content, compresslevel=level, mtime=0)
+
+
+def accepts_gzip(accept_encoding):
+    """Whether an ``Accept-Encoding`` header admits gzip"""
+    qualities = {}
+    for coding in accept_encoding.split(","):
+        name, *params = coding.split(";")
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.strip().lower()] = quality
+
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
+
+class BrowserMiddleware:
+    """Run ``BROWSER_MIDDLEWARE`` for every path outside the API.
+
+    Sessions, CSRF, session authentication and messages only serve the
+    admin site; token-authenticated requests under ``API_PATH_PREFIX``
+    skip them. The wrapped middleware is chained and hooked up the way
+    Django's handler would do it, at this position in ``MIDDLEWARE``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.view_hooks = []
+        self.template_response_hooks = []
+        self.exception_hooks = []
+
+        handler = get_response
+        for middleware_path in reversed(settings.BROWSER_MIDDLEWARE):
+            try:
+                middleware = import_string(middleware_path)(handler)
+            except MiddlewareNotUsed:
+                continue
+
+            if hasattr(middleware, "process_view"):
+                self.view_hooks.insert(0, middleware.process_view)
+            if hasattr(middleware, "process_template_response"):
+                self.template_response_hooks.append(
+                    middleware.process_template_response
+                )
+            if hasattr(middleware, "process_exception"):
+                self.exception_hooks.append(middleware.process_exception)
+
+            handler = convert_exception_to_response(middleware)
+
+        self.browser_chain = handler
+
+    @staticmethod
+    def is_api(request):
+        return request.path_info.startswith(settings.API_PATH_PREFIX)
+
+    def __call__(self, request):
+        if self.is_api(request):
+            return self.get_response(request)
+        return self.browser_chain(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if self.is_api(request):
+            return None
+
+        for hook in self.view_hooks:
+            response = hook(request, view_func, view_args, view_kwargs)
+            if response is not None:
+                return response
+        return None
+
+    def process_template_response(self, request, response):
+        if not self.is_api(request):
+            for hook in self.template_response_hooks:
+                response = hook(request, response)
+        return response
+
+    def process_exception(self, request, exception):
+        if self.is_api(request):
+            return None
+
+        for hook in self.exception_hooks:
+            response = hook(request, exception)
+            if response is not None:
+                return response
+        return None
+
+
+class CompressionMiddleware:
+    """Gzip API responses for the clients that accept it.
+
+    Only responses under ``API_PATH_PREFIX`` of at least
+    ``COMPRESSION_MIN_SIZE`` bytes are compressed. A response carrying
+    its body compressed already in ``gzip_content``, like a cached
+    catalogue list, is sent with that body instead of compressing again.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        if (
+            not request.path_info.startswith(settings.API_PATH_PREFIX)
+            or response.streaming
+            or response.has_header("Content-Encoding")
+            or not is_compressible(response.get("Content-Type", ""))
+            or len(response.content) < settings.COMPRESSION_MIN_SIZE
+        ):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if not accepts_gzip(request.META.get("HTTP_ACCEPT_ENCODING", "")):
+            return response
+
+        content = getattr(response, "gzip_content", None)
+        if content is None:
+            content = gzip_compress(response.content)
+        if len(content) >= len(response.content):
+            return response
+
+        response.content = content
+        response["Content-Length"] = str(len(content))
+        response["Content-Encoding"] = "gzip"
+        # a strong ETag names the uncompressed bytes
+        etag = response.get("ETag", "")
+        if etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        return response
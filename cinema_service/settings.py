@@ -10,24 +10,50 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.0/ref/settings/
 """
 
+import os
+from datetime import timedelta
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 
-# Quick-start development settings - unsuitable for production
-# See https://docs.djangoproject.com/en/4.0/howto/deployment/checklist/
+# DJANGO_PROFILE picks the deployment profile:
+#   development - debug mode with the debug toolbar (the default)
+#   production  - no debug toolbar, cached templates, admin included
+#   api         - production without the admin site, sessions and
+#                 messages, for workers that only serve the token API
+PROFILE = os.environ.get("DJANGO_PROFILE", "development")
+if PROFILE not in ("development", "production", "api"):
+    raise ValueError(f"Unknown DJANGO_PROFILE: {PROFILE}")
+
+
+def secret(name, development_default):
+    """The key in environment variable ``name``, optional in development"""
+    key = os.environ.get(name)
+    if key:
+        return key
+    if PROFILE != "development":
+        raise ImproperlyConfigured(
+            f"{name} must be set in the {PROFILE} profile"
+        )
+    return development_default
+
 
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = (
-    "django-insecure-6vubhk2$++agnctay_4pxy_8cq)mosmn(*-#2b^v4cgsh-^!i3"
+SECRET_KEY = secret(
+    "DJANGO_SECRET_KEY",
+    "django-insecure-6vubhk2$++agnctay_4pxy_8cq)mosmn(*-#2b^v4cgsh-^!i3",
 )
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = PROFILE == "development"
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = list(
+    filter(None, os.environ.get("DJANGO_ALLOWED_HOSTS", "").split(","))
+)
 
 INTERNAL_IPS = [
     "127.0.0.1",
@@ -36,6 +62,8 @@ INTERNAL_IPS = [
 # Application definition
 
 INSTALLED_APPS = [
+    # first, so its connection tuning applies to the others' queries too
+    "cinema_service",
     "django.contrib.admin",
     "django.contrib.auth",
     "django.contrib.contenttypes",
@@ -44,22 +72,46 @@ INSTALLED_APPS = [
     "django.contrib.staticfiles",
     "rest_framework",
     "rest_framework.authtoken",
-    "debug_toolbar",
     "cinema",
     "user",
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
+    "cinema_service.middleware.CompressionMiddleware",
     "django.middleware.common.CommonMiddleware",
+    "cinema_service.middleware.BrowserMiddleware",
+    "cinema.replicas.ReplicaMiddleware",
+]
+
+# Run by BrowserMiddleware for the admin site only; requests under
+# API_PATH_PREFIX authenticate with tokens and skip them.
+API_PATH_PREFIX = "/api/"
+BROWSER_MIDDLEWARE = [
+    "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# the admin looks for these in MIDDLEWARE; BrowserMiddleware runs them
+SILENCED_SYSTEM_CHECKS = ["admin.E408", "admin.E409", "admin.E410"]
+
+# API responses smaller than this are sent uncompressed
+COMPRESSION_MIN_SIZE = 1024
+
+if PROFILE == "development":
+    INSTALLED_APPS.append("debug_toolbar")
+    # inside the compression, so the toolbar sees plain HTML
+    MIDDLEWARE.insert(2, "debug_toolbar.middleware.DebugToolbarMiddleware")
+
+if PROFILE == "api":
+    # token authentication needs none of the browser machinery
+    for app in ("admin", "sessions", "messages"):
+        INSTALLED_APPS.remove(f"django.contrib.{app}")
+    MIDDLEWARE.remove("cinema_service.middleware.BrowserMiddleware")
+
 ROOT_URLCONF = "cinema_service.urls"
 
 TEMPLATES = [
@@ -78,6 +130,18 @@ TEMPLATES = [
     },
 ]
 
+if not DEBUG:
+    TEMPLATES[0]["APP_DIRS"] = False
+    TEMPLATES[0]["OPTIONS"]["loaders"] = [
+        (
+            "django.template.loaders.cached.Loader",
+            [
+                "django.template.loaders.filesystem.Loader",
+                "django.template.loaders.app_directories.Loader",
+            ],
+        ),
+    ]
+
 WSGI_APPLICATION = "cinema_service.wsgi.application"
 
 
@@ -87,7 +151,64 @@ WSGI_APPLICATION = "cinema_service.wsgi.application"
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "NAME": os.environ.get(
+            "DJANGO_DATABASE_NAME", BASE_DIR / "db.sqlite3"
+        ),
+        "CONN_MAX_AGE": 60,
+        "CONN_HEALTH_CHECKS": True,
+    }
+}
+
+# Applied to every new SQLite connection. WAL lets readers run alongside
+# the writer, NORMAL sync is durable in WAL mode except on power loss,
+# and writers wait up to busy_timeout ms for the lock instead of failing
+# with "database is locked".
+SQLITE_PRAGMAS = {
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "busy_timeout": 5000,
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,  # in KiB when negative
+}
+
+# Read replicas as a comma separated list of database files. Locally,
+# DATABASE_REPLICAS=db.replica.sqlite3 with "manage.py sync_replica"
+# standing in for replication.
+REPLICA_DATABASES = []
+for number, name in enumerate(
+    filter(None, os.environ.get("DATABASE_REPLICAS", "").split(",")),
+    start=1,
+):
+    DATABASES[f"replica{number}"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": name,
+        "CONN_MAX_AGE": 60,
+        "CONN_HEALTH_CHECKS": True,
+        "TEST": {"MIRROR": "default"},
+    }
+    REPLICA_DATABASES.append(f"replica{number}")
+
+DATABASE_ROUTERS = ["cinema.replicas.ReplicaRouter"]
+
+# Safe-method requests read from a replica while the heartbeat kept by
+# "manage.py replica_heartbeat" shows it at most REPLICA_MAX_LAG behind.
+# Users who just wrote read from the primary for REPLICA_STICKY_FOR.
+REPLICA_MAX_LAG = timedelta(seconds=5)
+REPLICA_LAG_CHECK_INTERVAL = timedelta(seconds=1)
+REPLICA_STICKY_FOR = timedelta(seconds=30)
+
+
+# Holds idempotency keys, replica pins and movie index generations, so
+# outside development it must be one cache shared by every worker, e.g.
+# Redis, Memcached or the database; a system check refuses per-process
+# backends there. Development's LocMemCache is private to its process.
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "DJANGO_CACHE_BACKEND",
+            "django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": os.environ.get("DJANGO_CACHE_LOCATION", ""),
     }
 }
 
@@ -140,9 +261,101 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "user.authentication.ExpiringTokenAuthentication",
+        "user.authentication.SignedTokenAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    # reverse proxies in front of the app; X-Forwarded-For is trusted
+    # only as far as they append to it, so with none clients are told
+    # apart, and throttled, by REMOTE_ADDR alone
+    "NUM_PROXIES": int(os.environ.get("DJANGO_NUM_PROXIES", 0)),
+    # budgets of user.throttling, named "<throttle_scope>_<user|ip>"
+    "DEFAULT_THROTTLE_RATES": {
+        "login_ip": "20/min",
+        "register_ip": "10/hour",
+        "order_user": "30/min",
+        "order_ip": "60/min",
+    },
+}
+
+# Seconds rendered genre, actor and movie lists stay cached, 0 to turn
+# the cache off; any catalogue change retires the cached lists at once.
+CATALOGUE_CACHE_TIMEOUT = 0 if DEBUG else 300
+
+# Seat map events reach only the subscribers of the publishing process
+# unless DJANGO_SEAT_EVENTS_BROKER ("host:port") names the address of
+# the seat_events_broker command, which relays them to every worker.
+# The broker and its workers authenticate each other with
+# DJANGO_SEAT_EVENTS_BROKER_KEY, which both must be given.
+SEAT_EVENTS_BACKEND = "cinema.seat_events.LocalSeatEvents"
+SEAT_EVENTS_BROKER_KEY = os.environ.get("DJANGO_SEAT_EVENTS_BROKER_KEY")
+if os.environ.get("DJANGO_SEAT_EVENTS_BROKER"):
+    if not SEAT_EVENTS_BROKER_KEY:
+        raise ImproperlyConfigured(
+            "DJANGO_SEAT_EVENTS_BROKER_KEY must be set to use the broker"
+        )
+    SEAT_EVENTS_BACKEND = "cinema.seat_events.BrokerSeatEvents"
+    broker_host, broker_port = os.environ[
+        "DJANGO_SEAT_EVENTS_BROKER"
+    ].rsplit(":", 1)
+    SEAT_EVENTS_BROKER = (broker_host, int(broker_port))
+SEAT_EVENTS_KEEPALIVE = timedelta(seconds=15)
+
+# How long the response to an order created with an Idempotency-Key is
+# replayed to retries of the same request. While the first request runs
+# its key is claimed for at most IDEMPOTENCY_CLAIM_TTL, longer than any
+# request takes, so a worker dying mid-request blocks the key only that
+# long.
+IDEMPOTENCY_KEY_TTL = timedelta(hours=24)
+IDEMPOTENCY_CLAIM_TTL = timedelta(minutes=1)
+
+# "manage.py archive_orders" moves orders whose sessions were all shown
+# longer ago than this to the archive tables
+ARCHIVE_ORDERS_AFTER = timedelta(days=30)
+
+# A session cancellation deletes the tickets of this many orders per
+# batch, each batch in a transaction of its own
+CANCELLATION_BATCH_SIZE = 200
+
+# With DJANGO_ORDER_PIPELINE=1 orders are committed in batches by one
+# thread per process instead of a transaction per request. It pays off
+# under WSGI with threaded workers only: the ASGI entry point runs sync
+# views on a single thread, so no batch would hold more than one order.
+# Orders still queued after the timeout are withdrawn with a 503.
+ORDER_PIPELINE = os.environ.get("DJANGO_ORDER_PIPELINE") == "1"
+ORDER_PIPELINE_BATCH_SIZE = 50
+ORDER_PIPELINE_TIMEOUT = timedelta(seconds=30)
+
+# Size of the in-memory token bucket sketches used for throttling
+THROTTLE_SKETCH_WIDTH = 16384
+THROTTLE_SKETCH_DEPTH = 4
+
+# Tokens expire after being idle this long; every use slides the window.
+# Uses are recorded in memory and written at most once per flush interval.
+TOKEN_EXPIRE_AFTER = timedelta(days=1)
+TOKEN_USAGE_RESOLUTION = timedelta(minutes=1)
+TOKEN_USAGE_FLUSH_INTERVAL = timedelta(seconds=30)
+
+# Stateless signed tokens, issued by the login view on request. To rotate,
+# add a new key id, make it active and drop the old one once every token
+# it signed has expired. Kept apart from SECRET_KEY, so neither can be
+# used to forge what the other signs.
+SIGNED_TOKEN_KEYS = {
+    "default": secret(
+        "DJANGO_SIGNED_TOKEN_KEY",
+        "django-insecure-e5!q0w#x8n@tokens-only-for-development",
+    ),
 }
+SIGNED_TOKEN_ACTIVE_KEY = "default"
+SIGNED_TOKEN_EXPIRE_AFTER = timedelta(hours=1)
+SIGNED_TOKEN_REVOCATION_REFRESH = timedelta(seconds=30)
+
+# Bulk user provisioning hashes passwords across this many processes and
+# inserts users and their tokens this many rows at a time. The API takes
+# at most USER_PROVISIONING_MAX_REQUEST users per request; larger lists
+# go through "manage.py provision_users".
+USER_PROVISIONING_WORKERS = os.cpu_count() or 1
+USER_PROVISIONING_BATCH_SIZE = 1000
+USER_PROVISIONING_MAX_REQUEST = 1000
@@ -1,6 +1,18 @@
 from django.apps import AppConfig
+from django.core.signals import request_finished
 
 
 class UserConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "user"
+
+    def ready(self):
+        from user.authentication import flush_token_usage
+        from user.signed_tokens import refresh_revocations
+
+        request_finished.connect(
+            flush_token_usage, dispatch_uid="flush_token_usage"
+        )
+        request_finished.connect(
+            refresh_revocations, dispatch_uid="refresh_revocations"
+        )
@@ -0,0 +1,183 @@
+from threading import Lock
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import (
+    BaseAuthentication,
+    TokenAuthentication,
+    get_authorization_header,
+)
+from rest_framework.authtoken.models import Token
+
+from user.models import TokenUsage
+from user.principal import TokenUser
+from user.signed_tokens import InvalidSignedToken, verify_signed_token
+
+
+class TokenUsageRecorder:
+    """Coalesces token ``last_used`` timestamps in memory.
+
+    Authentication only records the time here; the pending timestamps
+    are written with one upsert per flush interval, after a response
+    has been sent, so validating a token never writes to the database.
+    """
+
+    def __init__(self):
+        self._pending = {}
+        self._lock = Lock()
+        self._flushed_at = timezone.now()
+
+    def last_used(self, key):
+        return self._pending.get(key)
+
+    def record(self, key, when):
+        with self._lock:
+            self._pending[key] = when
+
+    def flush_due(self):
+        return bool(self._pending) and (
+            timezone.now() - self._flushed_at
+            >= settings.TOKEN_USAGE_FLUSH_INTERVAL
+        )
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._flushed_at = timezone.now()
+
+        if not pending:
+            return
+
+        # tokens may have been deleted since they were used
+        existing = Token.objects.filter(key__in=pending).values_list(
+            "key", flat=True
+        )
+        TokenUsage.objects.bulk_create(
+            [
+                TokenUsage(token_id=key, last_used=pending[key])
+                for key in existing
+            ],
+            update_conflicts=True,
+            unique_fields=["token_id"],
+            update_fields=["last_used"],
+        )
+
+    def forget(self, key):
+        with self._lock:
+            self._pending.pop(key, None)
+
+
+token_usage = TokenUsageRecorder()
+
+
+def flush_token_usage(**kwargs):
+    """``request_finished`` receiver writing the coalesced timestamps"""
+    if token_usage.flush_due():
+        token_usage.flush()
+
+
+def token_last_used(token):
+    """Latest known use of ``token``, pending or stored"""
+    try:
+        stored = token.usage.last_used
+    except TokenUsage.DoesNotExist:
+        stored = token.created
+
+    return _latest_use(token.key, stored)
+
+
+def _latest_use(key, stored):
+    pending = token_usage.last_used(key)
+    return max(pending, stored) if pending else stored
+
+
+def is_token_expired(token, now=None):
+    now = now or timezone.now()
+    return now - token_last_used(token) > settings.TOKEN_EXPIRE_AFTER
+
+
+def issue_token(user):
+    """Return the user's token, replacing it when it has expired"""
+    token, created = Token.objects.get_or_create(user=user)
+
+    if not created and is_token_expired(token):
+        token_usage.forget(token.key)
+        token.delete()
+        token = Token.objects.create(user=user)
+
+    return token
+
+
+class ExpiringTokenAuthentication(TokenAuthentication):
+    """Token authentication with an idle timeout that slides on use.
+
+    Only the columns needed to validate the token and to check
+    permissions are read; the request user is a lazy ``TokenUser``.
+    """
+
+    def authenticate_credentials(self, key):
+        model = self.get_model()
+        rows = model.objects.filter(key=key).values_list(
+            "created",
+            "user_id",
+            "user__is_staff",
+            "user__is_active",
+            "usage__last_used",
+        )[:1]
+        if not rows:
+            raise exceptions.AuthenticationFailed(_("Invalid token."))
+        created, user_id, is_staff, is_active, stored_last_used = rows[0]
+
+        if not is_active:
+            raise exceptions.AuthenticationFailed(
+                _("User inactive or deleted.")
+            )
+
+        now = timezone.now()
+        last_used = _latest_use(key, stored_last_used or created)
+        if now - last_used > settings.TOKEN_EXPIRE_AFTER:
+            raise exceptions.AuthenticationFailed(_("Token has expired."))
+
+        # coalesce: timestamps finer than the resolution are not kept
+        if now - last_used >= settings.TOKEN_USAGE_RESOLUTION:
+            token_usage.record(key, now)
+
+        token = model.from_db(
+            None, ["key", "user_id", "created"], (key, user_id, created)
+        )
+        return TokenUser(user_id, is_staff, is_active), token
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """Stateless authentication with ``Bearer <signed token>``.
+
+    The user id and staff flag are taken from the verified token, so
+    no query runs unless a view needs the full user. Deactivating or
+    demoting the user raises their token version, which retires the
+    token, so it is only ever held by an active user.
+    """
+
+    keyword = "Bearer"
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed(
+                _("Invalid token header.")
+            )
+
+        try:
+            claims = verify_signed_token(auth[1].decode())
+        except (UnicodeError, InvalidSignedToken) as error:
+            raise exceptions.AuthenticationFailed(str(error))
+
+        return TokenUser(claims["user_id"], claims["is_staff"]), claims
+
+    def authenticate_header(self, request):
+        return self.keyword
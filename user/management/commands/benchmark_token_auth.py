@@ -0,0 +1,67 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory
+
+from user.authentication import (
+    ExpiringTokenAuthentication,
+    SignedTokenAuthentication,
+)
+from user.signed_tokens import issue_signed_token
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Compare the per-request cost of DB-backed and signed token "
+        "authentication. Benchmark data is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = get_user_model().objects.create_user(
+                username="benchmark-token-auth", password="benchmark"
+            )
+            cases = (
+                (
+                    "db token",
+                    ExpiringTokenAuthentication(),
+                    f"Token {Token.objects.create(user=user).key}",
+                ),
+                (
+                    "signed token",
+                    SignedTokenAuthentication(),
+                    f"Bearer {issue_signed_token(user)}",
+                ),
+            )
+
+            for name, authentication, header in cases:
+                self.run_case(
+                    name, authentication, header, options["requests"]
+                )
+
+            transaction.set_rollback(True)
+
+    def run_case(self, name, authentication, header, requests):
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=header)
+        # warm up caches and the revocation list
+        authentication.authenticate(request)
+
+        started = time.perf_counter()
+        for _ in range(requests):
+            authentication.authenticate(request)
+        elapsed = time.perf_counter() - started
+
+        with CaptureQueriesContext(connection) as queries:
+            authentication.authenticate(request)
+
+        self.stdout.write(
+            f"{name:>12}: {elapsed / requests * 1e6:8.1f} us/request, "
+            f"{len(queries)} queries/request"
+        )
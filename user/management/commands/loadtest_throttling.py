@@ -0,0 +1,77 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework.throttling import ScopedRateThrottle
+
+from user.throttling import IPBucketThrottle, reset_throttles, get_sketch
+
+
+RATES = {"login": "20/min", "login_ip": "20/min"}
+
+
+def client_address(i):
+    return f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"
+
+
+class ThrottledView:
+    throttle_scope = "login"
+
+
+class CacheThrottle(ScopedRateThrottle):
+    THROTTLE_RATES = RATES
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Replay login throttle checks from many client IPs and compare "
+        "the in-memory bucket sketch with DRF's cache-based throttle."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=50000)
+        parser.add_argument("--clients", type=int, default=100000)
+
+    def handle(self, *args, **options):
+        factory = APIRequestFactory()
+        requests = [
+            Request(
+                factory.post("/", REMOTE_ADDR=client_address(i)),
+                authenticators=(),
+            )
+            for i in range(min(options["requests"], options["clients"]))
+        ]
+        view = ThrottledView()
+
+        with override_settings(
+            REST_FRAMEWORK={"DEFAULT_THROTTLE_RATES": RATES}
+        ):
+            reset_throttles()
+            for name, throttle_class in (
+                ("bucket sketch", IPBucketThrottle),
+                ("drf cache", CacheThrottle),
+            ):
+                self.run_case(
+                    name, throttle_class, view, requests, options["requests"]
+                )
+            self.stdout.write(
+                f"sketch memory: {get_sketch('login_ip').memory} bytes "
+                f"for {options['clients']} clients"
+            )
+            reset_throttles()
+
+    def run_case(self, name, throttle_class, view, requests, total):
+        started = time.perf_counter()
+        allowed = 0
+        for i in range(total):
+            allowed += throttle_class().allow_request(
+                requests[i % len(requests)], view
+            )
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"{name:>14}: {elapsed / total * 1e6:6.1f} us/check, "
+            f"{allowed} of {total} allowed"
+        )
@@ -0,0 +1,56 @@
+import csv
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from user.provisioning import provision_users
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Create users and their tokens from a CSV file with username, "
+        "email and password columns. Rejected rows are reported and "
+        "skipped; every other row is created."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--batch-size", type=int)
+        parser.add_argument("--workers", type=int)
+        parser.add_argument(
+            "--tokens",
+            help="write the username and token of created users here",
+        )
+
+    def handle(self, *args, **options):
+        with open(options["path"], newline="") as source:
+            rows = list(csv.DictReader(source))
+
+        started = time.perf_counter()
+        reports = provision_users(
+            rows,
+            batch_size=options["batch_size"],
+            workers=options["workers"],
+        )
+        elapsed = time.perf_counter() - started
+
+        created = [report for report in reports if "errors" not in report]
+        for line, report in enumerate(reports, start=2):
+            if "errors" in report:
+                errors = json.dumps(report["errors"])
+                self.stderr.write(f"line {line}: {errors}")
+
+        if options["tokens"]:
+            with open(options["tokens"], "w", newline="") as target:
+                writer = csv.writer(target)
+                writer.writerow(["username", "token"])
+                writer.writerows(
+                    (report["username"], report["token"])
+                    for report in created
+                )
+
+        self.stdout.write(
+            f"created {len(created)} of {len(rows)} users "
+            f"in {elapsed:.1f} s"
+        )
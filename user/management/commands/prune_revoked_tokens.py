@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from user.models import RevokedToken
+
+
+class Command(BaseCommand):
+    help = (  # noqa: VNE003
+        "Delete the revocations of signed tokens that have expired, "
+        "which no longer verify anyway. Run periodically, e.g. hourly."
+    )
+
+    def handle(self, *args, **options):
+        deleted, _ = RevokedToken.objects.filter(
+            expires_at__lte=timezone.now()
+        ).delete()
+        self.stdout.write(f"deleted {deleted} expired revocations")
@@ -0,0 +1,31 @@
+# Generated by Django 4.1 on 2026-10-19 14:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authtoken", "0003_tokenproxy"),
+        ("user", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TokenUsage",
+            fields=[
+                (
+                    "token",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="usage",
+                        serialize=False,
+                        to="authtoken.token",
+                    ),
+                ),
+                ("last_used", models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -1,5 +1,46 @@
 from django.contrib.auth.models import AbstractUser
+from django.db import models
+from rest_framework.authtoken.models import Token
 
 
 class User(AbstractUser):
-    pass
+    # signed tokens carry the version they were issued at, so raising it
+    # retires them; it goes up whenever is_active or is_staff change
+    token_version = models.PositiveIntegerField(default=0)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        if "is_active" in user.__dict__ and "is_staff" in user.__dict__:
+            user._saved_flags = (user.is_active, user.is_staff)
+        return user
+
+    def save(self, *args, **kwargs):
+        saved_flags = getattr(self, "_saved_flags", None)
+        if saved_flags not in (None, (self.is_active, self.is_staff)):
+            self.token_version += 1
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {
+                    *kwargs["update_fields"],
+                    "token_version",
+                }
+        super().save(*args, **kwargs)
+        self._saved_flags = (self.is_active, self.is_staff)
+
+
+class TokenUsage(models.Model):
+    token = models.OneToOneField(
+        Token, on_delete=models.CASCADE, primary_key=True, related_name="usage"
+    )
+    last_used = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.token_id} {self.last_used}"
+
+
+class RevokedToken(models.Model):
+    jti = models.CharField(max_length=32, primary_key=True)
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return self.jti
@@ -0,0 +1,53 @@
+from django.contrib.auth import get_user_model
+from django.utils.functional import LazyObject, empty
+
+
+class TokenUser(LazyObject):
+    """The user a token was issued to, loaded only when needed.
+
+    ``id``, ``pk``, ``is_staff`` and ``is_active`` come from the
+    token itself, so permission checks never query the user table.
+    Any other attribute loads the full ``User`` on first access.
+    """
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, user_id, is_staff, is_active=True):
+        super().__init__()
+        self.__dict__["_principal"] = (user_id, is_staff, is_active)
+
+    def _setup(self):
+        self._wrapped = get_user_model().objects.get(pk=self.id)
+
+    @property
+    def id(self):
+        return self.__dict__["_principal"][0]
+
+    @property
+    def pk(self):
+        return self.id
+
+    @property
+    def is_staff(self):
+        return self.__dict__["_principal"][1]
+
+    @property
+    def is_active(self):
+        return self.__dict__["_principal"][2]
+
+    def __bool__(self):
+        return True
+
+    def __repr__(self):
+        return f"<TokenUser: {self.id}>"
+
+
+def resolve_user(user):
+    """The ``User`` instance behind ``request.user``"""
+    if not isinstance(user, TokenUser):
+        return user
+
+    if user._wrapped is empty:
+        user._setup()
+    return user._wrapped
@@ -0,0 +1,142 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.db import IntegrityError, transaction
+from rest_framework import serializers
+from rest_framework.authtoken.models import Token
+
+
+User = get_user_model()
+
+DUPLICATE_USERNAME = {
+    "username": ["A user with that username already exists."]
+}
+
+
+class ProvisionUserSerializer(serializers.Serializer):
+    """Checks a single row; username uniqueness is checked per batch"""
+
+    username = serializers.CharField(
+        max_length=150, validators=[UnicodeUsernameValidator()]
+    )
+    email = serializers.EmailField(required=False, allow_blank=True)
+    password = serializers.CharField(min_length=5, write_only=True)
+
+
+_pools = {}
+_pools_lock = Lock()
+
+
+def hashing_pool(workers):
+    """A pool of ``workers`` processes kept for the life of the process.
+
+    Started on first use and shared by every later call, so provisioning
+    requests neither pay for starting the workers nor multiply them. By
+    then a web worker runs other threads, which a forked child could
+    deadlock on, so the workers are spawned and set Django up afresh.
+    """
+    with _pools_lock:
+        if workers not in _pools:
+            _pools[workers] = ProcessPoolExecutor(
+                workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=django.setup,
+            )
+        return _pools[workers]
+
+
+def hash_passwords(passwords, pool=None, workers=1):
+    if pool is None:
+        return [make_password(password) for password in passwords]
+
+    chunksize = max(1, len(passwords) // (4 * workers))
+    return list(pool.map(make_password, passwords, chunksize=chunksize))
+
+
+def provision_users(rows, batch_size=None, workers=None):
+    """Create a user and a token for every valid row.
+
+    Returns one report per row, in order: ``{"id", "username",
+    "token"}`` for created users and ``{"errors": {...}}`` for rejected
+    rows. Invalid rows never stop the others from being created.
+    """
+    batch_size = batch_size or settings.USER_PROVISIONING_BATCH_SIZE
+    if workers is None:
+        workers = settings.USER_PROVISIONING_WORKERS
+    reports = [None] * len(rows)
+    pool = hashing_pool(workers) if workers > 1 else None
+
+    for start in range(0, len(rows), batch_size):
+        batch = range(start, min(start + batch_size, len(rows)))
+        _provision_batch(rows, batch, reports, pool, workers)
+
+    return reports
+
+
+def _provision_batch(rows, batch, reports, pool, workers):
+    valid = {}
+    for i in batch:
+        serializer = ProvisionUserSerializer(data=rows[i])
+        if serializer.is_valid():
+            valid[i] = serializer.validated_data
+        else:
+            reports[i] = {"errors": serializer.errors}
+
+    seen = set(
+        User.objects.filter(
+            username__in=[data["username"] for data in valid.values()]
+        ).values_list("username", flat=True)
+    )
+    for i, data in list(valid.items()):
+        if data["username"] in seen:
+            reports[i] = {"errors": DUPLICATE_USERNAME}
+            del valid[i]
+        seen.add(data["username"])
+
+    hashes = hash_passwords(
+        [data["password"] for data in valid.values()], pool, workers
+    )
+    users = {
+        i: User(
+            username=data["username"],
+            email=User.objects.normalize_email(data.get("email", "")),
+            password=password,
+        )
+        for (i, data), password in zip(valid.items(), hashes)
+    }
+
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create(users.values())
+            tokens = Token.objects.bulk_create(
+                Token(key=Token.generate_key(), user=user)
+                for user in users.values()
+            )
+    except IntegrityError:
+        # a username was taken concurrently, retry row by row
+        for i, user in users.items():
+            reports[i] = _provision_one(user)
+        return
+
+    for (i, user), token in zip(users.items(), tokens):
+        reports[i] = {
+            "id": user.id, "username": user.username, "token": token.key
+        }
+
+
+def _provision_one(user):
+    try:
+        with transaction.atomic():
+            user.save(force_insert=True)
+            token = Token.objects.create(user=user)
+    except IntegrityError:
+        user.pk = None
+        return {"errors": DUPLICATE_USERNAME}
+
+    return {"id": user.id, "username": user.username, "token": token.key}
@@ -19,10 +19,18 @@ class UserSerializer(serializers.ModelSerializer):
 
     def update(self, instance, validated_data):
         password = validated_data.pop("password", None)
-        user = super().update(instance, validated_data)
+        changed = []
+
+        for field, value in validated_data.items():
+            if getattr(instance, field) != value:
+                setattr(instance, field, value)
+                changed.append(field)
 
         if password:
-            user.set_password(password)
-            user.save()
+            instance.set_password(password)
+            changed.append("password")
+
+        if changed:
+            instance.save(update_fields=changed)
 
-        return user
+        return instance
@@ -0,0 +1,152 @@
+import hmac
+import secrets
+import time
+from base64 import urlsafe_b64encode
+from datetime import datetime, timezone as dt_timezone
+from threading import Lock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.utils.crypto import salted_hmac
+
+from user.models import RevokedToken
+
+# keeps signatures apart from any other HMAC made with the same key
+KEY_SALT = "user.signed_tokens"
+
+
+class InvalidSignedToken(Exception):
+    pass
+
+
+def _signature(kid, message):
+    digest = salted_hmac(
+        KEY_SALT,
+        message,
+        secret=settings.SIGNED_TOKEN_KEYS[kid],
+        algorithm="sha256",
+    ).digest()
+    return urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def issue_signed_token(user, now=None):
+    """Sign ``kid.user_id.is_staff.version.expires.jti`` with the active key"""
+    now = now if now is not None else time.time()
+    kid = settings.SIGNED_TOKEN_ACTIVE_KEY
+    expires = int(now + settings.SIGNED_TOKEN_EXPIRE_AFTER.total_seconds())
+    message = ".".join(
+        (
+            kid,
+            str(user.id),
+            str(int(user.is_staff)),
+            str(user.token_version),
+            str(expires),
+            secrets.token_urlsafe(9),
+        )
+    )
+    return f"{message}.{_signature(kid, message)}"
+
+
+def verify_signed_token(token, now=None):
+    """Claims of a valid token; raises ``InvalidSignedToken`` otherwise.
+
+    Verification is pure computation: the key ring comes from settings,
+    revocations and token versions from the in-memory list.
+    """
+    try:
+        message, signature = token.rsplit(".", 1)
+        kid, user_id, is_staff, version, expires, jti = message.split(".")
+        user_id, version, expires = int(user_id), int(version), int(expires)
+    except ValueError:
+        raise InvalidSignedToken("Malformed token.")
+
+    if kid not in settings.SIGNED_TOKEN_KEYS:
+        raise InvalidSignedToken("Unknown signing key.")
+    if not hmac.compare_digest(signature, _signature(kid, message)):
+        raise InvalidSignedToken("Invalid signature.")
+    if expires <= (now if now is not None else time.time()):
+        raise InvalidSignedToken("Token has expired.")
+    if not revocations.loaded:
+        # the only I/O, once per process
+        revocations.refresh()
+    if jti in revocations or version < revocations.version_of(user_id):
+        raise InvalidSignedToken("Token has been revoked.")
+
+    return {
+        "user_id": user_id,
+        "is_staff": is_staff == "1",
+        "expires": expires,
+        "jti": jti,
+    }
+
+
+class RevocationList:
+    """Revoked signed tokens and current token versions held in memory.
+
+    Holds the ids of revoked, unexpired tokens and the token version of
+    every user whose version was ever raised. Both are reloaded at most
+    once per refresh interval, after a response has been sent, so a
+    deactivated or demoted user's tokens stop working within it.
+    Expired revocations are deleted by ``prune_revoked_tokens``.
+    """
+
+    def __init__(self):
+        self._revoked = frozenset()
+        self._versions = {}
+        self._lock = Lock()
+        self._refreshed_at = None
+
+    @property
+    def loaded(self):
+        return self._refreshed_at is not None
+
+    def __contains__(self, jti):
+        return jti in self._revoked
+
+    def version_of(self, user_id):
+        return self._versions.get(user_id, 0)
+
+    def revoke(self, claims):
+        RevokedToken.objects.get_or_create(
+            jti=claims["jti"],
+            defaults={
+                "expires_at": datetime.fromtimestamp(
+                    claims["expires"], tz=dt_timezone.utc
+                )
+            },
+        )
+        with self._lock:
+            self._revoked = self._revoked | {claims["jti"]}
+
+    def refresh_due(self):
+        return not self.loaded or (
+            timezone.now() - self._refreshed_at
+            >= settings.SIGNED_TOKEN_REVOCATION_REFRESH
+        )
+
+    def refresh(self):
+        now = timezone.now()
+        revoked = frozenset(
+            RevokedToken.objects.filter(expires_at__gt=now).values_list(
+                "jti", flat=True
+            )
+        )
+        versions = dict(
+            get_user_model()
+            .objects.filter(token_version__gt=0)
+            .values_list("id", "token_version")
+        )
+        with self._lock:
+            self._revoked = revoked
+            self._versions = versions
+            self._refreshed_at = now
+
+
+revocations = RevocationList()
+
+
+def refresh_revocations(**kwargs):
+    """``request_finished`` receiver reloading the revocation list"""
+    if revocations.refresh_due():
+        revocations.refresh()
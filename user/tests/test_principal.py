@@ -0,0 +1,102 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.functional import empty
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework import status
+
+from cinema.models import Order
+from cinema.permissions import IsAdminOrIfAuthenticatedReadOnly
+from cinema.tests.test_movie_session_api import sample_movie_session
+from user.authentication import ExpiringTokenAuthentication
+from user.principal import TokenUser, resolve_user
+from user.tests.test_user_api import create_user
+
+ME_URL = reverse("user:manage")
+ORDER_URL = reverse("cinema:order-list")
+
+
+class TokenUserTests(TestCase):
+    def setUp(self):
+        self.user = create_user(
+            username="user", password="testpass", is_staff=True
+        )
+        self.token = Token.objects.create(user=self.user)
+
+    def authenticate(self, method="get"):
+        request = getattr(APIRequestFactory(), method)(
+            "/", HTTP_AUTHORIZATION=f"Token {self.token.key}"
+        )
+        request.user, request.auth = (
+            ExpiringTokenAuthentication().authenticate(request)
+        )
+        return request
+
+    def test_permission_check_does_not_load_user(self):
+        request = self.authenticate(method="post")
+
+        with self.assertNumQueries(0):
+            allowed = IsAdminOrIfAuthenticatedReadOnly().has_permission(
+                request, None
+            )
+
+        self.assertTrue(allowed)
+        self.assertIsInstance(request.user, TokenUser)
+        self.assertIs(request.user._wrapped, empty)
+
+    def test_full_user_loaded_on_demand(self):
+        request = self.authenticate()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(request.user.username, "user")
+            self.assertEqual(resolve_user(request.user), self.user)
+
+
+class PrincipalApiTests(TestCase):
+    def setUp(self):
+        self.user = create_user(username="user", password="testpass")
+        token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def test_update_profile(self):
+        res = self.client.patch(ME_URL, {"email": "new@test.com"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.email, "new@test.com")
+
+    def test_create_order(self):
+        movie_session = sample_movie_session()
+        payload = {
+            "tickets": [
+                {"row": 1, "seat": 1, "movie_session": movie_session.id}
+            ]
+        }
+
+        res = self.client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Order.objects.get().user, self.user)
+
+
+class BenchmarkPermissionsCommandTests(TestCase):
+    def test_reports_every_case(self):
+        out = StringIO()
+
+        call_command("benchmark_permissions", requests=10, stdout=out)
+
+        for case in ("full user", "principal", "signed"):
+            self.assertIn(case, out.getvalue())
+
+    @override_settings(DEBUG=True)
+    def test_counts_queries_past_the_query_log_limit(self):
+        out = StringIO()
+
+        call_command("benchmark_permissions", requests=5000, stdout=out)
+
+        self.assertRegex(out.getvalue(), r"principal: .* 1 queries/request")
@@ -0,0 +1,91 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from user.tests.test_user_api import create_user
+
+ME_URL = reverse("user:manage")
+
+
+class ProfileUpdateTests(TestCase):
+    def setUp(self):
+        self.user = create_user(
+            username="user", email="user@test.com", password="testpass"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def patch(self, payload, **headers):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.patch(ME_URL, payload, **headers)
+        updates = [
+            query["sql"] for query in queries
+            if query["sql"].startswith("UPDATE")
+        ]
+        return res, updates
+
+    def test_unchanged_patch_does_not_write(self):
+        res, updates = self.patch({"email": "user@test.com"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(updates, [])
+
+    def test_writes_only_changed_columns(self):
+        res, updates = self.patch(
+            {"username": "user", "email": "new@test.com"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"email"', updates[0])
+        self.assertNotIn('"username"', updates[0])
+        self.assertNotIn('"password"', updates[0])
+
+    def test_password_change_is_single_update(self):
+        res, updates = self.patch({"password": "newpass"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(updates), 1)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("newpass"))
+
+
+class ProfileETagTests(TestCase):
+    def setUp(self):
+        self.user = create_user(username="user", password="testpass")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_not_modified(self):
+        etag = self.client.get(ME_URL)["ETag"]
+
+        res = self.client.get(ME_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_etag_changes_with_profile(self):
+        etag = self.client.get(ME_URL)["ETag"]
+
+        res = self.client.patch(ME_URL, {"email": "new@test.com"})
+
+        self.assertNotEqual(res["ETag"], etag)
+        res = self.client.get(ME_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_stale_if_match_rejected(self):
+        etag = self.client.get(ME_URL)["ETag"]
+        self.client.patch(ME_URL, {"email": "new@test.com"})
+
+        res = self.client.patch(
+            ME_URL, {"email": "other@test.com"}, HTTP_IF_MATCH=etag
+        )
+
+        self.assertEqual(
+            res.status_code, status.HTTP_412_PRECONDITION_FAILED
+        )
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.email, "new@test.com")
@@ -0,0 +1,157 @@
+import csv
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from user.provisioning import hashing_pool, provision_users
+from user.tests.test_user_api import create_user
+
+PROVISION_URL = reverse("user:provision")
+
+
+class ProvisionUsersTests(TestCase):
+    def test_creates_users_and_tokens(self):
+        rows = [
+            {"username": f"user{i}", "email": "", "password": "testpass"}
+            for i in range(5)
+        ]
+
+        reports = provision_users(rows, batch_size=2, workers=1)
+
+        self.assertEqual(
+            [report["username"] for report in reports],
+            [row["username"] for row in rows],
+        )
+        user = get_user_model().objects.get(username="user3")
+        self.assertTrue(user.check_password("testpass"))
+        self.assertEqual(Token.objects.get(user=user).key, reports[3]["token"])
+
+    def test_bad_rows_do_not_abort_batch(self):
+        create_user(username="taken", password="testpass")
+        rows = [
+            {"username": "good", "password": "testpass"},
+            {"username": "taken", "password": "testpass"},
+            {"username": "short", "password": "abc"},
+            {"username": "good", "password": "testpass"},
+            {"username": "bad name!", "password": "testpass"},
+        ]
+
+        reports = provision_users(rows, workers=1)
+
+        self.assertNotIn("errors", reports[0])
+        for report in reports[1:]:
+            self.assertIn("errors", report)
+        self.assertIn("password", reports[2]["errors"])
+        self.assertEqual(get_user_model().objects.count(), 2)
+
+    def test_hashes_in_process_pool(self):
+        rows = [
+            {"username": f"user{i}", "password": f"testpass{i}"}
+            for i in range(4)
+        ]
+
+        provision_users(rows, workers=2)
+
+        user = get_user_model().objects.get(username="user2")
+        self.assertTrue(user.check_password("testpass2"))
+
+    def test_pool_is_shared_between_calls(self):
+        self.assertIs(hashing_pool(2), hashing_pool(2))
+
+    def test_inserts_per_batch(self):
+        rows = [
+            {"username": f"user{i}", "password": "testpass"}
+            for i in range(10)
+        ]
+
+        # lookup of taken usernames, savepoint, users, tokens, release
+        with self.assertNumQueries(5):
+            provision_users(rows, workers=1)
+
+
+class ProvisionApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            create_user(username="admin", password="testpass", is_staff=True)
+        )
+
+    def test_provision_users(self):
+        payload = [
+            {"username": "user1", "password": "testpass"},
+            {"username": "user2", "password": "testpass"},
+        ]
+
+        res = self.client.post(PROVISION_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["created"], 2)
+
+    def test_partial_failure(self):
+        payload = [
+            {"username": "user1", "password": "testpass"},
+            {"username": "admin", "password": "testpass"},
+        ]
+
+        res = self.client.post(PROVISION_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(res.data["created"], 1)
+        self.assertIn("username", res.data["results"][1]["errors"])
+
+    @override_settings(USER_PROVISIONING_MAX_REQUEST=1)
+    def test_oversized_request_rejected(self):
+        payload = [
+            {"username": "user1", "password": "testpass"},
+            {"username": "user2", "password": "testpass"},
+        ]
+
+        res = self.client.post(PROVISION_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(
+            get_user_model().objects.filter(username="user1").exists()
+        )
+
+    def test_staff_only(self):
+        self.client.force_authenticate(
+            create_user(username="user", password="testpass")
+        )
+
+        res = self.client.post(PROVISION_URL, [], format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ProvisionUsersCommandTests(TestCase):
+    def test_creates_users_from_csv(self):
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, "users.csv")
+            tokens = os.path.join(directory, "tokens.csv")
+            with open(source, "w", newline="") as file:
+                writer = csv.writer(file)
+                writer.writerow(["username", "email", "password"])
+                writer.writerow(["user1", "user1@test.com", "testpass"])
+                writer.writerow(["user2", "", "abc"])
+
+            out, err = StringIO(), StringIO()
+            call_command(
+                "provision_users", source, workers=1, tokens=tokens,
+                stdout=out, stderr=err,
+            )
+
+            with open(tokens, newline="") as file:
+                written = list(csv.DictReader(file))
+
+        self.assertIn("created 1 of 2 users", out.getvalue())
+        self.assertIn("line 3", err.getvalue())
+        self.assertEqual(written[0]["username"], "user1")
@@ -0,0 +1,221 @@
+import hashlib
+import hmac
+import time
+from base64 import urlsafe_b64encode
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from user.models import RevokedToken
+from user.signed_tokens import (
+    InvalidSignedToken,
+    issue_signed_token,
+    revocations,
+    verify_signed_token,
+)
+from user.tests.test_user_api import create_user
+
+TOKEN_URL = reverse("user:login")
+LOGOUT_URL = reverse("user:logout")
+ME_URL = reverse("user:manage")
+GENRE_URL = reverse("cinema:genre-list")
+ORDER_URL = reverse("cinema:order-list")
+
+
+class SignedTokenTests(TestCase):
+    def setUp(self):
+        revocations.refresh()
+        self.user = create_user(
+            username="user", password="testpass", is_staff=True
+        )
+
+    def test_verify_round_trip(self):
+        claims = verify_signed_token(issue_signed_token(self.user))
+
+        self.assertEqual(claims["user_id"], self.user.id)
+        self.assertTrue(claims["is_staff"])
+
+    def test_verify_needs_no_queries(self):
+        token = issue_signed_token(self.user)
+
+        with self.assertNumQueries(0):
+            verify_signed_token(token)
+
+    def test_tampered_token_rejected(self):
+        kid, user_id, *rest = issue_signed_token(self.user).split(".")
+        tampered = ".".join([kid, str(user_id + "0"), *rest])
+
+        with self.assertRaises(InvalidSignedToken):
+            verify_signed_token(tampered)
+
+    def test_signature_is_not_a_plain_hmac_of_the_key(self):
+        with override_settings(SIGNED_TOKEN_KEYS={"default": "secret"}):
+            token = issue_signed_token(self.user)
+        message, signature = token.rsplit(".", 1)
+        plain = hmac.new(b"secret", message.encode(), hashlib.sha256)
+
+        self.assertNotEqual(
+            signature,
+            urlsafe_b64encode(plain.digest()).rstrip(b"=").decode(),
+        )
+
+    def test_changing_flags_retires_issued_tokens(self):
+        for field in ("is_staff", "is_active"):
+            with self.subTest(field=field):
+                user = create_user(
+                    username=field, password="testpass", is_staff=True
+                )
+                token = issue_signed_token(user)
+                setattr(user, field, False)
+                user.save()
+                revocations.refresh()
+
+                with self.assertRaises(InvalidSignedToken):
+                    verify_signed_token(token)
+
+    def test_other_changes_keep_tokens(self):
+        token = issue_signed_token(self.user)
+        self.user.email = "new@test.com"
+        self.user.save()
+        revocations.refresh()
+
+        self.assertEqual(verify_signed_token(token)["user_id"], self.user.id)
+
+    def test_expired_token_rejected(self):
+        token = issue_signed_token(self.user, now=time.time() - 7200)
+
+        with self.assertRaises(InvalidSignedToken):
+            verify_signed_token(token)
+
+    def test_key_rotation(self):
+        old_keys = {"old": "old-secret"}
+        with override_settings(
+            SIGNED_TOKEN_KEYS=old_keys, SIGNED_TOKEN_ACTIVE_KEY="old"
+        ):
+            token = issue_signed_token(self.user)
+
+        with override_settings(
+            SIGNED_TOKEN_KEYS={**old_keys, "new": "new-secret"},
+            SIGNED_TOKEN_ACTIVE_KEY="new",
+        ):
+            claims = verify_signed_token(token)
+            self.assertEqual(claims["user_id"], self.user.id)
+            self.assertTrue(
+                issue_signed_token(self.user).startswith("new.")
+            )
+
+        with override_settings(
+            SIGNED_TOKEN_KEYS={"new": "new-secret"},
+            SIGNED_TOKEN_ACTIVE_KEY="new",
+        ):
+            with self.assertRaises(InvalidSignedToken):
+                verify_signed_token(token)
+
+
+class SignedTokenApiTests(TestCase):
+    def setUp(self):
+        revocations.refresh()
+        self.user = create_user(username="user", password="testpass")
+        self.client = APIClient()
+
+    def login(self):
+        res = self.client.post(
+            TOKEN_URL,
+            {
+                "username": "user",
+                "password": "testpass",
+                "token_type": "signed",
+            },
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {res.data['token']}"
+        )
+
+    def test_login_issues_signed_token(self):
+        self.login()
+
+        # only the genre list itself is queried
+        with self.assertNumQueries(1):
+            res = self.client.get(GENRE_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_staff_flag_from_token(self):
+        self.login()
+
+        res = self.client.post(GENRE_URL, {"name": "Drama"})
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_profile_loads_full_user(self):
+        self.login()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["username"], "user")
+
+    def test_orders_of_token_user(self):
+        self.login()
+
+        res = self.client.get(ORDER_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["count"], 0)
+
+    def test_logout_revokes_token(self):
+        self.login()
+
+        res = self.client.post(LOGOUT_URL)
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_invalid_signed_token(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer not.a.token")
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PruneRevokedTokensCommandTests(TestCase):
+    def test_deletes_expired_revocations_only(self):
+        now = timezone.now()
+        RevokedToken.objects.create(
+            jti="expired", expires_at=now - timedelta(minutes=1)
+        )
+        RevokedToken.objects.create(
+            jti="live", expires_at=now + timedelta(minutes=1)
+        )
+        out = StringIO()
+
+        call_command("prune_revoked_tokens", stdout=out)
+
+        self.assertIn("deleted 1 expired revocations", out.getvalue())
+        self.assertEqual(
+            list(RevokedToken.objects.values_list("jti", flat=True)),
+            ["live"],
+        )
+
+    def test_refresh_does_not_write(self):
+        with self.assertNumQueries(2):
+            revocations.refresh()
+
+
+class BenchmarkTokenAuthCommandTests(TestCase):
+    def test_reports_both_backends(self):
+        out = StringIO()
+
+        call_command("benchmark_token_auth", requests=10, stdout=out)
+
+        self.assertIn("db token", out.getvalue())
+        self.assertIn("signed token", out.getvalue())
@@ -0,0 +1,161 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from user.tests.test_user_api import create_user
+from user.throttling import TokenBucketSketch, reset_throttles
+
+TOKEN_URL = reverse("user:login")
+CREATE_USER_URL = reverse("user:create")
+ORDER_URL = reverse("cinema:order-list")
+
+RATES = {
+    "REST_FRAMEWORK": {
+        "DEFAULT_THROTTLE_RATES": {
+            "login_ip": "3/min",
+            "register_ip": "2/hour",
+            "order_user": "2/min",
+        }
+    }
+}
+
+
+class TokenBucketSketchTests(TestCase):
+    def test_burst_then_refill(self):
+        sketch = TokenBucketSketch(capacity=2, refill_rate=1.0, width=64)
+
+        self.assertEqual(sketch.consume("a", now=100.0), 0)
+        self.assertEqual(sketch.consume("a", now=100.0), 0)
+        self.assertAlmostEqual(sketch.consume("a", now=100.0), 1.0)
+        self.assertEqual(sketch.consume("a", now=101.0), 0)
+
+    def test_keys_are_independent(self):
+        sketch = TokenBucketSketch(capacity=1, refill_rate=0.1)
+
+        self.assertEqual(sketch.consume("a", now=100.0), 0)
+        self.assertEqual(sketch.consume("b", now=100.0), 0)
+        self.assertGreater(sketch.consume("a", now=100.0), 0)
+
+    def test_collisions_never_raise_budget(self):
+        sketch = TokenBucketSketch(
+            capacity=5, refill_rate=0.001, width=8, depth=2
+        )
+
+        for key in range(100):
+            allowed = sum(
+                sketch.consume(key, now=100.0) == 0 for _ in range(10)
+            )
+            self.assertLessEqual(allowed, 5)
+
+    def test_fixed_memory(self):
+        sketch = TokenBucketSketch(capacity=5, refill_rate=1, width=128)
+        memory = sketch.memory
+
+        for key in range(10000):
+            sketch.consume(key)
+
+        self.assertEqual(sketch.memory, memory)
+
+
+@override_settings(**RATES)
+class ThrottledEndpointTests(TestCase):
+    def setUp(self):
+        reset_throttles()
+        self.client = APIClient()
+
+    def tearDown(self):
+        reset_throttles()
+
+    def test_login_throttled_per_ip(self):
+        create_user(username="user", password="testpass")
+        payload = {"username": "user", "password": "wrong"}
+
+        for _ in range(3):
+            res = self.client.post(TOKEN_URL, payload)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.post(TOKEN_URL, payload)
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        res = self.client.post(
+            TOKEN_URL, payload, REMOTE_ADDR="10.0.0.2"
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_forwarded_for_header_does_not_reset_the_bucket(self):
+        payload = {"username": "user", "password": "wrong"}
+
+        for number in range(3):
+            self.client.post(
+                TOKEN_URL,
+                payload,
+                HTTP_X_FORWARDED_FOR=f"203.0.113.{number}",
+            )
+
+        res = self.client.post(
+            TOKEN_URL, payload, HTTP_X_FORWARDED_FOR="203.0.113.99"
+        )
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(
+        REST_FRAMEWORK={**RATES["REST_FRAMEWORK"], "NUM_PROXIES": 1}
+    )
+    def test_client_address_from_trusted_proxy(self):
+        payload = {"username": "user", "password": "wrong"}
+
+        for _ in range(3):
+            self.client.post(
+                TOKEN_URL,
+                payload,
+                HTTP_X_FORWARDED_FOR="198.51.100.7, 203.0.113.1",
+            )
+
+        res = self.client.post(
+            TOKEN_URL, payload, HTTP_X_FORWARDED_FOR="203.0.113.2"
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_registration_throttled(self):
+        for i in range(2):
+            res = self.client.post(
+                CREATE_USER_URL,
+                {"username": f"user{i}", "password": "testpass"},
+            )
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        res = self.client.post(
+            CREATE_USER_URL, {"username": "user3", "password": "testpass"}
+        )
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_order_creation_throttled_per_user(self):
+        self.client.force_authenticate(
+            create_user(username="user", password="testpass")
+        )
+
+        for _ in range(2):
+            res = self.client.post(ORDER_URL, {}, format="json")
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.post(ORDER_URL, {}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        res = self.client.get(ORDER_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+
+class LoadtestThrottlingCommandTests(TestCase):
+    def test_reports_both_throttles(self):
+        out = StringIO()
+
+        call_command(
+            "loadtest_throttling", requests=100, clients=50, stdout=out
+        )
+
+        self.assertIn("bucket sketch", out.getvalue())
+        self.assertIn("drf cache", out.getvalue())
@@ -0,0 +1,101 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from user.authentication import token_usage
+from user.models import TokenUsage
+from user.tests.test_user_api import create_user
+
+TOKEN_URL = reverse("user:login")
+ME_URL = reverse("user:manage")
+GENRE_URL = reverse("cinema:genre-list")
+
+
+class TokenExpiryTests(TestCase):
+    def setUp(self):
+        token_usage.flush()
+        self.user = create_user(username="user", password="testpass")
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def age_token(self, age):
+        Token.objects.filter(pk=self.token.pk).update(
+            created=timezone.now() - age
+        )
+
+    def test_fresh_token_accepted(self):
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    @override_settings(TOKEN_EXPIRE_AFTER=timedelta(hours=1))
+    def test_idle_token_rejected(self):
+        self.age_token(timedelta(hours=2))
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(TOKEN_EXPIRE_AFTER=timedelta(hours=1))
+    def test_use_slides_expiry(self):
+        self.age_token(timedelta(minutes=50))
+        TokenUsage.objects.create(
+            token=self.token, last_used=timezone.now() - timedelta(minutes=30)
+        )
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    @override_settings(
+        TOKEN_USAGE_FLUSH_INTERVAL=timedelta(hours=1),
+        TOKEN_USAGE_RESOLUTION=timedelta(0),
+    )
+    def test_authentication_does_not_write(self):
+        self.client.get(GENRE_URL)
+
+        # the token lookup and the genre list, nothing else
+        with self.assertNumQueries(2):
+            res = self.client.get(GENRE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(TokenUsage.objects.exists())
+        self.assertIsNotNone(token_usage.last_used(self.token.key))
+
+    @override_settings(TOKEN_USAGE_RESOLUTION=timedelta(0))
+    def test_flush_stores_last_used(self):
+        self.client.get(ME_URL)
+        used_at = token_usage.last_used(self.token.key)
+
+        token_usage.flush()
+
+        self.assertEqual(
+            TokenUsage.objects.get(token=self.token).last_used, used_at
+        )
+        self.assertIsNone(token_usage.last_used(self.token.key))
+
+    @override_settings(TOKEN_EXPIRE_AFTER=timedelta(hours=1))
+    def test_login_replaces_expired_token(self):
+        self.age_token(timedelta(hours=2))
+
+        res = APIClient().post(
+            TOKEN_URL, {"username": "user", "password": "testpass"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res.data["token"], self.token.key)
+        self.assertFalse(Token.objects.filter(key=self.token.key).exists())
+
+    def test_login_keeps_live_token(self):
+        res = APIClient().post(
+            TOKEN_URL, {"username": "user", "password": "testpass"}
+        )
+
+        self.assertEqual(res.data["token"], self.token.key)
@@ -0,0 +1,150 @@
+import time
+from array import array
+from hashlib import blake2b
+from threading import Lock
+
+from django.conf import settings
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+
+class TokenBucketSketch:
+    """Token buckets for any number of keys in a fixed amount of memory.
+
+    Keys are hashed into ``depth`` rows of ``width`` buckets, like a
+    count-min sketch: the fullest bucket of a key is its estimated
+    balance, and a request lowers every bucket to at most that minus one.
+    Collisions can only make a key's budget smaller, never larger, and
+    the error shrinks as the width grows.
+    """
+
+    def __init__(self, capacity, refill_rate, width=4096, depth=4):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.width = width
+        self.depth = depth
+        self._tokens = array("d", [float(capacity)]) * (width * depth)
+        self._stamps = array("d", [0.0]) * (width * depth)
+        self._lock = Lock()
+
+    @property
+    def memory(self):
+        return (
+            self._tokens.itemsize * len(self._tokens)
+            + self._stamps.itemsize * len(self._stamps)
+        )
+
+    def _cells(self, key):
+        # one independent 32-bit hash per row
+        digest = blake2b(
+            str(key).encode(), digest_size=4 * self.depth
+        ).digest()
+        return [
+            row * self.width
+            + int.from_bytes(digest[4 * row:4 * row + 4], "little")
+            % self.width
+            for row in range(self.depth)
+        ]
+
+    def consume(self, key, now=None):
+        """Take a token for ``key``; seconds to wait if there is none"""
+        now = time.monotonic() if now is None else now
+        cells = self._cells(key)
+
+        with self._lock:
+            available = 0.0
+            for cell in cells:
+                tokens = min(
+                    self.capacity,
+                    self._tokens[cell]
+                    + (now - self._stamps[cell]) * self.refill_rate,
+                )
+                self._tokens[cell] = tokens
+                self._stamps[cell] = now
+                available = max(available, tokens)
+
+            if available < 1:
+                return (1 - available) / self.refill_rate
+
+            # conservative update: lower a bucket only as far as needed
+            for cell in cells:
+                self._tokens[cell] = min(self._tokens[cell], available - 1)
+            return 0.0
+
+
+def parse_rate(rate):
+    """``"10/min"`` -> (10, 10 / 60) as capacity and tokens per second"""
+    num, period = rate.split("/")
+    duration = {"s": 1, "m": 60, "h": 3600, "d": 86400}[period[0]]
+    return int(num), int(num) / duration
+
+
+_sketches = {}
+_sketches_lock = Lock()
+
+
+def get_sketch(rate_name):
+    rate = api_settings.DEFAULT_THROTTLE_RATES.get(rate_name)
+    if rate is None:
+        return None
+
+    with _sketches_lock:
+        if (rate_name, rate) not in _sketches:
+            _sketches[rate_name, rate] = TokenBucketSketch(
+                *parse_rate(rate),
+                width=settings.THROTTLE_SKETCH_WIDTH,
+                depth=settings.THROTTLE_SKETCH_DEPTH,
+            )
+        return _sketches[rate_name, rate]
+
+
+def reset_throttles():
+    with _sketches_lock:
+        _sketches.clear()
+
+
+class BucketThrottle(BaseThrottle):
+    """Throttle on the view's ``throttle_scope`` with in-memory buckets.
+
+    The budget is the ``<scope>_<kind>`` entry of
+    ``DEFAULT_THROTTLE_RATES``; scopes without a rate are not limited.
+    """
+
+    kind = None
+
+    def get_key(self, request):
+        raise NotImplementedError(".get_key() must be overridden")
+
+    def allow_request(self, request, view):
+        scope = getattr(view, "throttle_scope", None)
+        sketch = get_sketch(f"{scope}_{self.kind}") if scope else None
+        key = self.get_key(request)
+
+        if sketch is None or key is None:
+            return True
+
+        self._wait = sketch.consume(key)
+        return self._wait == 0
+
+    def wait(self):
+        return getattr(self, "_wait", None)
+
+
+class UserBucketThrottle(BucketThrottle):
+    kind = "user"
+
+    def get_key(self, request):
+        if request.user and request.user.is_authenticated:
+            return request.user.id
+        return None
+
+
+class IPBucketThrottle(BucketThrottle):
+    kind = "ip"
+
+    def get_key(self, request):
+        # without NUM_PROXIES DRF takes X-Forwarded-For as sent, which
+        # would let a client pick a fresh bucket for every request
+        if api_settings.NUM_PROXIES is None:
+            return request.META.get("REMOTE_ADDR")
+        return self.get_ident(request)
@@ -1,12 +1,20 @@
 from django.urls import path
 
-from user.views import UserCreateView, UserLoginView, UserManageView
+from cinema_service.lazy import LazyView
 
 
 app_name = "user"
 
 urlpatterns = [
-    path("register/", UserCreateView.as_view(), name="create"),
-    path("login/", UserLoginView.as_view(), name="login"),
-    path("me/", UserManageView.as_view(), name="manage"),
+    path(
+        "register/", LazyView("user.views.UserCreateView"), name="create"
+    ),
+    path(
+        "provision/",
+        LazyView("user.views.UserProvisionView"),
+        name="provision",
+    ),
+    path("login/", LazyView("user.views.UserLoginView"), name="login"),
+    path("logout/", LazyView("user.views.UserLogoutView"), name="logout"),
+    path("me/", LazyView("user.views.UserManageView"), name="manage"),
 ]
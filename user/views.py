@@ -1,25 +1,148 @@
-from rest_framework import generics
-from rest_framework.authentication import TokenAuthentication
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from hashlib import md5
+
+from django.conf import settings
+from django.utils.http import parse_etags
+from rest_framework import generics, status, views
+from rest_framework.authtoken.models import Token
+from rest_framework.permissions import (
+    AllowAny,
+    IsAdminUser,
+    IsAuthenticated,
+)
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.response import Response
 from rest_framework.settings import api_settings
 
+from user.authentication import (
+    ExpiringTokenAuthentication,
+    SignedTokenAuthentication,
+    issue_token,
+)
+from user.principal import resolve_user
 from user.serializers import UserSerializer
+from user.signed_tokens import issue_signed_token, revocations
+from user.throttling import IPBucketThrottle
 
 
 class UserCreateView(generics.CreateAPIView):
     permission_classes = (AllowAny,)
     serializer_class = UserSerializer
+    throttle_classes = (IPBucketThrottle,)
+    throttle_scope = "register"
+
+
+class UserProvisionView(views.APIView):
+    """Create many users at once from a list of username/email/password"""
+
+    authentication_classes = [
+        ExpiringTokenAuthentication,
+        SignedTokenAuthentication,
+    ]
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        # process pools are only needed here, keep them out of start-up
+        from user.provisioning import provision_users
+
+        if not isinstance(request.data, list):
+            return Response(
+                {"non_field_errors": ["Expected a list of users."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        limit = settings.USER_PROVISIONING_MAX_REQUEST
+        if len(request.data) > limit:
+            return Response(
+                {
+                    "non_field_errors": [
+                        f"At most {limit} users per request, use the "
+                        f"provision_users command for more."
+                    ]
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        reports = provision_users(request.data)
+        created = sum("errors" not in report for report in reports)
+
+        return Response(
+            {"created": created, "results": reports},
+            status=(
+                status.HTTP_201_CREATED
+                if created == len(reports)
+                else status.HTTP_207_MULTI_STATUS
+            ),
+        )
 
 
 class UserLoginView(ObtainAuthToken):
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    throttle_classes = (IPBucketThrottle,)
+    throttle_scope = "login"
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = serializer.validated_data["user"]
+
+        if request.data.get("token_type") == "signed":
+            return Response({"token": issue_signed_token(user)})
+
+        return Response({"token": issue_token(user).key})
+
+
+class UserLogoutView(views.APIView):
+    authentication_classes = [
+        ExpiringTokenAuthentication,
+        SignedTokenAuthentication,
+    ]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        if isinstance(request.auth, Token):
+            request.auth.delete()
+        else:
+            revocations.revoke(request.auth)
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+def profile_etag(user):
+    """Changes whenever any field of the profile representation does"""
+    fields = (user.id, user.username, user.email, user.is_staff)
+    # a change marker, not a security hash: allowed on FIPS builds too
+    digest = md5(repr(fields).encode(), usedforsecurity=False)
+    return '"%s"' % digest.hexdigest()
 
 
 class UserManageView(generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [
+        ExpiringTokenAuthentication,
+        SignedTokenAuthentication,
+    ]
     permission_classes = [IsAuthenticated]
 
     def get_object(self):
-        return self.request.user
+        return resolve_user(self.request.user)
+
+    def retrieve(self, request, *args, **kwargs):
+        user = self.get_object()
+        etag = profile_etag(user)
+
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+            )
+
+        serializer = self.get_serializer(user)
+        return Response(serializer.data, headers={"ETag": etag})
+
+    def update(self, request, *args, **kwargs):
+        if_match = request.headers.get("If-Match")
+        if if_match and if_match != "*":
+            if profile_etag(self.get_object()) not in parse_etags(if_match):
+                return Response(status=status.HTTP_412_PRECONDITION_FAILED)
+
+        response = super().update(request, *args, **kwargs)
+        response["ETag"] = profile_etag(self.get_object())
+        return response